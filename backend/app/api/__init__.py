@@ -1,3 +1,5 @@
 from .user_router import router as user_router      
 from .pipeline_router import router as pipeline_router
-from .interview_router import router as interview_router
\ No newline at end of file
+from .interview_router import router as interview_router
+from .analytics_router import router as analytics_router
+from .admin_router import router as admin_router
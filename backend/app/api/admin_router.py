@@ -0,0 +1,61 @@
+# File: backend/app/api/admin_router.py
+
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.config import settings
+from app.db.database import get_sync_db
+from app.core.registry import ResourceRegistry, get_registry
+from app.services.job_role_service import JobRoleService
+from app.schemas import JobRoleCreate, JobRoleOut
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Guard semua endpoint admin: header X-Admin-Token harus sama dengan settings.ADMIN_TOKEN.
+    Logic: Tanpa ADMIN_TOKEN di konfigurasi, endpoint admin ditolak (fail closed).
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Endpoint admin tidak diaktifkan.")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token admin tidak valid.")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# ---------------------------------------------------
+# ENDPOINT 1: TAMBAH JOB ROLE
+# ---------------------------------------------------
+@router.post("/job-roles", response_model=JobRoleOut, status_code=status.HTTP_201_CREATED)
+def create_job_role(role: JobRoleCreate, db: Session = Depends(get_sync_db), registry: ResourceRegistry = Depends(get_registry)):
+    """Menambah Job Role baru; cache Job Role (dan ETag /pipeline/job-roles) langsung diperbarui."""
+    role_service = JobRoleService(db, registry)
+    try:
+        return role_service.create_job_role(role)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nama Job Role sudah ada.")
+
+# ---------------------------------------------------
+# ENDPOINT 2: UBAH JOB ROLE
+# ---------------------------------------------------
+@router.put("/job-roles/{role_id}", response_model=JobRoleOut)
+def update_job_role(role_id: int, role: JobRoleCreate, db: Session = Depends(get_sync_db), registry: ResourceRegistry = Depends(get_registry)):
+    """Mengubah nama/deskripsi Job Role; embedding kueri RAG untuk nama baru ikut dihitung ulang."""
+    role_service = JobRoleService(db, registry)
+    try:
+        updated = role_service.update_job_role(role_id, role)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nama Job Role sudah ada.")
+    if updated is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job Role tidak ditemukan.")
+    return updated
+
+# ---------------------------------------------------
+# ENDPOINT 3: MUAT ULANG CACHE JOB ROLE
+# ---------------------------------------------------
+@router.post("/job-roles/reload", response_model=List[JobRoleOut])
+def reload_job_roles(db: Session = Depends(get_sync_db), registry: ResourceRegistry = Depends(get_registry)):
+    """Memuat ulang cache setelah Job Role diubah langsung di DB (seed/SQL manual)."""
+    return JobRoleService(db, registry).refresh_cache()
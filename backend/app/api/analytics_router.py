@@ -0,0 +1,39 @@
+# File: backend/app/api/analytics_router.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_sync_db
+from app.schemas import StudentRoleStatsOut, SessionTrendPointOut, RolePercentilesOut
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter()
+
+# ---------------------------------------------------
+# ENDPOINT 1: RINGKASAN PROGRES PER ROLE
+# ---------------------------------------------------
+@router.get("/students/{mahasiswa_id}/roles", response_model=List[StudentRoleStatsOut], tags=["Analytics"])
+def get_student_role_summary(mahasiswa_id: int, db: Session = Depends(get_sync_db)):
+    """Rata-rata skor dan per rubrik mahasiswa untuk setiap role, beserta persentil kohortnya."""
+    return AnalyticsService(db).get_student_role_summary(mahasiswa_id)
+
+# ---------------------------------------------------
+# ENDPOINT 2: TREN PER RUBRIK ANTAR SESI
+# ---------------------------------------------------
+@router.get("/students/{mahasiswa_id}/trends", response_model=List[SessionTrendPointOut], tags=["Analytics"])
+def get_student_trends(
+    mahasiswa_id: int,
+    role_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_sync_db)
+):
+    """Tren skor per rubrik dari sesi-sesi terakhir mahasiswa (urut lama -> baru)."""
+    return AnalyticsService(db).get_student_trends(mahasiswa_id, role_id, limit)
+
+# ---------------------------------------------------
+# ENDPOINT 3: PERSENTIL KOHORT PER ROLE
+# ---------------------------------------------------
+@router.get("/roles/{role_id}/percentiles", response_model=RolePercentilesOut, tags=["Analytics"])
+def get_role_percentiles(role_id: int, db: Session = Depends(get_sync_db)):
+    """Sebaran skor rata-rata mahasiswa pada satu role."""
+    return AnalyticsService(db).get_role_percentiles(role_id)
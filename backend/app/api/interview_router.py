@@ -1,16 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.schemas import InterviewStart, QuestionGenerateOut, AnswerInput # Import AnswerInput
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db, SessionLocal
+from app.core.registry import ResourceRegistry, get_registry
+from app.schemas import InterviewStart, QuestionGenerateOut, AnswerInput, EvaluationStatusOut, SessionScoreOut, InterviewSessionOut, LiveAnswerInput # Import AnswerInput
 from app.services.interview_service import InterviewService
-from typing import Union, Dict, Any
+from app.services.live_interview import LiveInterviewSession
+from app.services.transcript_export import TranscriptExportService
+from app.services.ingestion_jobs import CvNotReadyError
+from app.services.llm_service import LLMError
+from typing import Union, Dict, Any, AsyncIterator, Optional
+from datetime import datetime
+import json
 
 router = APIRouter()
 
+def _llm_error_to_http(e: LLMError) -> HTTPException:
+    """Memetakan LLMError terstruktur ke respons HTTP (504 untuk timeout, 503 jika dibatasi, 502 selain itu)."""
+    if e.code == "timeout":
+        status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    elif e.code in ("rate_limited", "not_configured"):
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    else:
+        status_code = status.HTTP_502_BAD_GATEWAY
+    return HTTPException(status_code=status_code, detail=e.to_dict())
+
+def _format_sse(event: str, data: Any) -> str:
+    """Satu event Server-Sent Events (event + data JSON)."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _open_event_stream(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Membungkus generator event service menjadi respons SSE.
+    Logic: Event pertama ditunggu SEBELUM respons dibuka, sehingga error validasi/LLM awal masih
+    dikembalikan sebagai status HTTP biasa; error setelah stream terbuka dikirim sebagai event 'error'.
+    """
+    try:
+        first_event = await events.__anext__()
+    except LLMError as e:
+        raise _llm_error_to_http(e)
+    except CvNotReadyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    async def body():
+        yield _format_sse(first_event["event"], first_event["data"])
+        try:
+            async for event in events:
+                yield _format_sse(event["event"], event["data"])
+        except LLMError as e:
+            print(f"LLM ERROR IN STREAM: {e.code} - {e.message}")
+            yield _format_sse("error", e.to_dict())
+        except Exception as e:
+            print(f"ERROR IN STREAM: {e}")
+            yield _format_sse("error", {"code": "internal_error", "message": "Stream gagal karena kesalahan internal.", "retryable": False})
+
+    # Logic: X-Accel-Buffering mematikan buffering proxy (nginx) agar kalimat pertama langsung terkirim.
+    return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.post("/start", response_model=QuestionGenerateOut, tags=["Interview"])
-def start_interview_session(
+async def start_interview_session(
     session_data: InterviewStart, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    registry: ResourceRegistry = Depends(get_registry)
 ):
     """
     Memulai sesi wawancara baru. 
@@ -18,12 +73,18 @@ def start_interview_session(
     """
     
     # 1. Inisialisasi Service (Dependency Injection)
-    interview_service = InterviewService(db)
+    interview_service = InterviewService(db, registry)
 
     # 2. Logika Pemanggilan dan Penanganan Error
     try:
         # Panggil fungsi inti yang melakukan RAG dan LLM di service layer
-        return interview_service.start_new_interview(session_data)
+        return await interview_service.start_new_interview(session_data)
+    except LLMError as e:
+        print(f"LLM ERROR IN INTERVIEW START: {e.code} - {e.message}")
+        raise _llm_error_to_http(e)
+    except CvNotReadyError as e:
+        # Contoh: CV masih dalam antrean ingestion atau gagal diproses
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
         # Contoh: Jika Mahasiswa ID atau Role ID tidak ditemukan
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -32,28 +93,201 @@ def start_interview_session(
         print(f"FATAL ERROR IN INTERVIEW START: {e}") # Log error di server
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Gagal memulai sesi karena kesalahan internal.")
 
+@router.post("/start/stream", tags=["Interview"])
+async def start_interview_session_stream(
+    session_data: InterviewStart,
+    db: AsyncSession = Depends(get_db),
+    registry: ResourceRegistry = Depends(get_registry)
+):
+    """
+    Versi streaming (SSE) dari /start untuk TTS.
+    Event: 'sentence' ({index, text}) per kalimat, lalu 'done' (QuestionGenerateOut) setelah pertanyaan tersimpan,
+    atau 'error' ({code, message, retryable}).
+    """
+    interview_service = InterviewService(db, registry)
+    return await _open_event_stream(interview_service.stream_new_interview(session_data))
+
 # ---------------------------------------------------
 # ENDPOINT BARU: SUBMIT JAWABAN DAN LANJUTKAN
 # ---------------------------------------------------
 @router.post("/answer", tags=["Interview"])
-def submit_answer(
+async def submit_answer(
     answer_data: AnswerInput, 
     is_final: bool = False, # Query parameter untuk memaksa sesi berakhir
-    db: Session = Depends(get_db)
+    defer_evaluation: bool = False, # Kembalikan pertanyaan lanjutan dulu, skor diambil lewat GET /answer/{qa_id}/evaluation
+    db: AsyncSession = Depends(get_db),
+    registry: ResourceRegistry = Depends(get_registry)
 ) -> Union[QuestionGenerateOut, Dict[str, str]]:
     """
     Menerima jawaban mahasiswa, mengevaluasi, menyimpan skor, dan menghasilkan pertanyaan lanjutan
     atau mengakhiri sesi.
+    Evaluasi dan pembuatan pertanyaan lanjutan berjalan bersamaan; dengan defer_evaluation=true,
+    evaluasi diselesaikan di background.
+    Aman diulang (retry) per qa_id: duplikat yang masih diproses mendapat hasil yang sama, dan giliran
+    yang sudah selesai diputar ulang dari DB tanpa memanggil LLM lagi.
     """
     
-    interview_service = InterviewService(db)
+    interview_service = InterviewService(db, registry)
     
     try:
         # Panggil fungsi inti di service
-        result = interview_service.submit_answer_and_continue(answer_data, is_final_question=is_final)
+        result = await interview_service.submit_answer_and_continue(
+            answer_data, is_final_question=is_final, defer_evaluation=defer_evaluation
+        )
         return result
+    except LLMError as e:
+        print(f"LLM ERROR processing answer: {e.code} - {e.message}")
+        raise _llm_error_to_http(e)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         print(f"ERROR processing answer: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Gagal memproses jawaban atau LLM gagal merespons.")
+
+
+@router.post("/answer/stream", tags=["Interview"])
+async def submit_answer_stream(
+    answer_data: AnswerInput,
+    is_final: bool = False,
+    defer_evaluation: bool = False,
+    db: AsyncSession = Depends(get_db),
+    registry: ResourceRegistry = Depends(get_registry)
+):
+    """
+    Versi streaming (SSE) dari /answer. Kalimat pertanyaan lanjutan dikirim sebagai event 'sentence';
+    event 'done' berisi QuestionGenerateOut (atau status akhir sesi) setelah semuanya tersimpan.
+    """
+    interview_service = InterviewService(db, registry)
+    return await _open_event_stream(interview_service.stream_answer_and_continue(
+        answer_data, is_final_question=is_final, defer_evaluation=defer_evaluation
+    ))
+
+# ---------------------------------------------------
+# ENDPOINT BARU: STATUS EVALUASI JAWABAN
+# ---------------------------------------------------
+@router.get("/answer/{qa_id}/evaluation", response_model=EvaluationStatusOut, tags=["Interview"])
+async def get_answer_evaluation(
+    qa_id: int,
+    db: AsyncSession = Depends(get_db),
+    registry: ResourceRegistry = Depends(get_registry)
+):
+    """
+    Mengambil skor dan feedback sebuah jawaban. Dipakai bersama defer_evaluation=true:
+    status 'pending' berarti evaluasi masih berjalan, coba lagi sebentar.
+    """
+    interview_service = InterviewService(db, registry)
+    try:
+        return await interview_service.get_evaluation_status(qa_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+# ---------------------------------------------------
+# ENDPOINT BARU: EKSPOR TRANSKRIP (NDJSON / CSV)
+# ---------------------------------------------------
+@router.get("/sessions/export", tags=["Interview"])
+def export_sessions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    mahasiswa_id: Optional[int] = None,
+    role_id: Optional[int] = None,
+    dari: Optional[datetime] = None,
+    sampai: Optional[datetime] = None
+):
+    """
+    Mengekspor transkrip banyak sesi secara streaming (memori konstan).
+    NDJSON: satu sesi per baris beserta tanya-jawabnya. CSV: satu baris per tanya-jawab.
+    """
+    filters = {"mahasiswa_id": mahasiswa_id, "role_id": role_id, "dari": dari, "sampai": sampai}
+
+    def body():
+        # Logic: Session DB milik stream sendiri, ditutup saat stream selesai atau klien memutus.
+        with SessionLocal() as db:
+            exporter = TranscriptExportService(db)
+            yield from (exporter.iter_csv(**filters) if format == "csv" else exporter.iter_ndjson(**filters))
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"transkrip_wawancara.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(body(), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+# ---------------------------------------------------
+# ENDPOINT BARU: DETAIL SESI (LAPORAN)
+# ---------------------------------------------------
+@router.get("/session/{session_id}", response_model=InterviewSessionOut, tags=["Interview"])
+async def get_session_detail(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    registry: ResourceRegistry = Depends(get_registry)
+):
+    """Transkrip lengkap satu sesi: pertanyaan, jawaban, skor rubrik, dan feedback."""
+    interview_service = InterviewService(db, registry)
+    try:
+        return await interview_service.get_session_detail(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+# ---------------------------------------------------
+# ENDPOINT BARU: SKOR LIVE SESI
+# ---------------------------------------------------
+@router.get("/session/{session_id}/score", response_model=SessionScoreOut, tags=["Interview"])
+async def get_session_score(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    registry: ResourceRegistry = Depends(get_registry)
+):
+    """Skor berjalan sesi (jumlah terjawab, rata-rata gabungan, rata-rata per rubrik) tanpa menunggu sesi berakhir."""
+    interview_service = InterviewService(db, registry)
+    try:
+        return await interview_service.get_session_score(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+# ---------------------------------------------------
+# ENDPOINT BARU: SESI WAWANCARA LIVE (WEBSOCKET)
+# ---------------------------------------------------
+@router.websocket("/ws")
+async def interview_websocket(
+    websocket: WebSocket,
+    registry: ResourceRegistry = Depends(get_registry)
+):
+    """
+    Sesi wawancara live. Pesan klien (JSON):
+      {"action": "start", "mahasiswa_id", "role_id", "cv_id"} | {"action": "resume", "session_id"}
+      {"action": "answer", "jawaban_mentah", "waktu_respon", "is_final"} | {"action": "end"}
+    Pesan server: 'sentence', 'question', 'evaluation', 'session', 'session_ended', 'error'.
+    Setelah koneksi terputus, klien membuka koneksi baru dan mengirim 'resume' dengan session_id.
+    """
+    await websocket.accept()
+    live_session = LiveInterviewSession(registry)
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action")
+            try:
+                if action == "start":
+                    async for event in live_session.start(InterviewStart(**message)):
+                        await websocket.send_json(jsonable_encoder(event))
+                elif action == "resume":
+                    await websocket.send_json(jsonable_encoder(await live_session.resume(int(message["session_id"]))))
+                elif action == "answer":
+                    answer = LiveAnswerInput(**message)
+                    async for event in live_session.answer(answer.jawaban_mentah, answer.waktu_respon, answer.is_final):
+                        await websocket.send_json(jsonable_encoder(event))
+                elif action == "end":
+                    await websocket.send_json(jsonable_encoder(await live_session.end()))
+                else:
+                    await websocket.send_json({"type": "error", "code": "invalid_action", "message": f"Aksi tidak dikenal: {action}"})
+            except LLMError as e:
+                print(f"LLM ERROR IN LIVE INTERVIEW: {e.code} - {e.message}")
+                await websocket.send_json({"type": "error", **e.to_dict()})
+            except CvNotReadyError as e:
+                await websocket.send_json({"type": "error", "code": "cv_not_ready", "message": str(e), "retryable": True})
+            except (ValueError, KeyError, ValidationError) as e:
+                await websocket.send_json({"type": "error", "code": "invalid_request", "message": str(e), "retryable": False})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                print(f"ERROR IN LIVE INTERVIEW: {e}")
+                await websocket.send_json({"type": "error", "code": "internal_error", "message": "Giliran gagal diproses. Silakan kirim ulang.", "retryable": True})
+    except WebSocketDisconnect:
+        # Logic: Semua giliran yang selesai sudah tersimpan; sesi bisa dilanjutkan lewat 'resume'.
+        pass
@@ -1,12 +1,15 @@
 # File: backend/app/api/pipeline_router.py
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
+from typing import List, Optional
+from app.db.database import get_sync_db
+from app.db.pagination import InvalidCursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.registry import ResourceRegistry, get_registry
 from app.services.job_role_service import JobRoleService
 from app.services.cv_service import CvService
-from app.schemas import JobRoleOut, CvDataOut
+from app.services.ingestion_jobs import IngestionBusyError, CV_STATUS_INDEXED
+from app.schemas import JobRoleOut, CvDataOut, CvUploadAccepted, IngestionJobOut
 
 router = APIRouter()
 
@@ -14,26 +17,40 @@ router = APIRouter()
 # ENDPOINT 1: GET SEMUA JOB ROLES
 # ---------------------------------------------------
 @router.get("/job-roles", response_model=List[JobRoleOut], tags=["Pipeline"])
-def get_job_roles(db: Session = Depends(get_db)):
-    """Mengambil daftar semua peran pekerjaan yang tersedia."""
-    # Logic: Memanggil service yang bertanggung jawab atas data Role.
-    role_service = JobRoleService(db)
-    roles = role_service.get_all_job_roles()
+def get_job_roles(request: Request, response: Response, db: Session = Depends(get_sync_db), registry: ResourceRegistry = Depends(get_registry)):
+    """
+    Mengambil daftar semua peran pekerjaan yang tersedia (dari cache Job Role).
+    Logic: ETag = hash isi daftar role; jika If-None-Match cocok, dijawab 304 tanpa body.
+    """
+    role_service = JobRoleService(db, registry)
+    roles, etag = role_service.get_all_job_roles()
     
     if not roles:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job Roles belum tersedia.")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    client_etags = _parse_if_none_match(request.headers.get("if-none-match"))
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
     return roles
 
+def _parse_if_none_match(header: Optional[str]) -> List[str]:
+    """Daftar ETag dari header If-None-Match (awalan weak 'W/' diabaikan)."""
+    if not header:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
 # ---------------------------------------------------
 # ENDPOINT 2: UPLOAD CV
 # ---------------------------------------------------
-@router.post("/upload-cv/{mahasiswa_id}", response_model=CvDataOut, tags=["Pipeline"])
+@router.post("/upload-cv/{mahasiswa_id}", response_model=CvUploadAccepted, status_code=status.HTTP_202_ACCEPTED, tags=["Pipeline"])
 async def upload_cv(
     mahasiswa_id: int, 
     file: UploadFile = File(...), 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_sync_db),
+    registry: ResourceRegistry = Depends(get_registry)
 ):
-    """Menerima file CV (PDF) dan memulai proses parsing."""
+    """Menerima file CV (PDF) dan menjadwalkan proses parsing di background (cek status via /ingestion-jobs)."""
     # Logic: Memastikan file yang diupload adalah PDF sebelum diproses.
     if file.content_type != 'application/pdf':
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File harus berformat PDF.")
@@ -45,25 +62,58 @@ async def upload_cv(
     file_content = await file.read()
     
     # Logic: Memanggil service yang bertanggung jawab menyimpan dan memproses CV.
-    cv_service = CvService(db)
+    cv_service = CvService(db, registry)
     
     try:
-        db_cv = cv_service.save_cv_data(
+        # Logic: Request hanya menyimpan file + baris CV; ekstraksi, embedding, dan indexing dijalankan job background.
+        db_cv, job = await cv_service.accept_cv_upload(
             mahasiswa_id=mahasiswa_id,
             file_name=file.filename,
             file_content=file_content
         )
-        return db_cv
+        return CvUploadAccepted(
+            cv_id=db_cv.cv_id,
+            job_id=job.job_id if job else None,
+            status_proses=db_cv.status_proses or CV_STATUS_INDEXED
+        )
+    except IngestionBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         print(f"Error saving CV: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Gagal memproses CV.")
 
 # ---------------------------------------------------
-# ENDPOINT 3: GET RIWAYAT CV (untuk halaman Profil)
+# ENDPOINT 3: STATUS JOB INGESTION CV (Polling)
+# ---------------------------------------------------
+@router.get("/ingestion-jobs/{job_id}", response_model=IngestionJobOut, tags=["Pipeline"])
+def get_ingestion_job(job_id: str, registry: ResourceRegistry = Depends(get_registry)):
+    """Mengambil status dan progres job ingestion CV."""
+    job = registry.ingestion_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job ingestion tidak ditemukan.")
+    return job.to_dict()
+
+# ---------------------------------------------------
+# ENDPOINT 4: GET RIWAYAT CV (untuk halaman Profil)
 # ---------------------------------------------------
 @router.get("/cv-history/{mahasiswa_id}", response_model=List[CvDataOut], tags=["Pipeline"])
-def get_cv_history(mahasiswa_id: int, db: Session = Depends(get_db)):
-    """Mengambil riwayat CV yang pernah diunggah oleh mahasiswa."""
-    cv_service = CvService(db)
-    history = cv_service.get_cv_history(mahasiswa_id)
-    return history
\ No newline at end of file
+def get_cv_history(
+    mahasiswa_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_sync_db),
+    registry: ResourceRegistry = Depends(get_registry)
+):
+    """
+    Mengambil riwayat CV yang pernah diunggah oleh mahasiswa (terbaru dulu).
+    Halaman berikutnya: kirim ulang nilai header X-Next-Cursor sebagai parameter ?cursor=.
+    """
+    cv_service = CvService(db, registry)
+    try:
+        history, next_cursor = cv_service.get_cv_history(mahasiswa_id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return history
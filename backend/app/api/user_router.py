@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_sync_db
+from app.core.registry import ResourceRegistry, get_registry
 from app.schemas import MahasiswaCreate, MahasiswaOut # Import skema Mahasiswa
 from app.services.user_service import UserService # Import User Service
 
@@ -10,12 +11,12 @@ router = APIRouter()
 # ENDPOINT 1: REGISTRASI PENGGUNA BARU
 # ---------------------------------------------------
 @router.post("/register", response_model=MahasiswaOut, status_code=status.HTTP_201_CREATED)
-def register_user(user: MahasiswaCreate, db: Session = Depends(get_db)):
+def register_user(user: MahasiswaCreate, db: Session = Depends(get_sync_db), registry: ResourceRegistry = Depends(get_registry)):
     """
     Mendaftarkan mahasiswa baru ke dalam sistem.
     """
     # 1. Inisialisasi Service (Dependency Injection)
-    user_service = UserService(db)
+    user_service = UserService(db, registry)
     
     # 2. Cek duplikasi email
     db_user = user_service.get_mahasiswa_by_email(user.email)
@@ -0,0 +1,57 @@
+# File: backend/app/core/metrics.py
+
+import threading
+from typing import Dict, Any
+
+
+class MetricsRegistry:
+    """
+    Pencatat metrik in-process yang aman untuk multi-thread.
+    Tanggung jawab tunggal: menyimpan counter, gauge, dan ringkasan (count/sum/min/max)
+    yang kemudian ditampilkan oleh endpoint /metrics.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, Dict[str, float]] = {}
+
+    def inc(self, name: str, value: float = 1):
+        """Menambah nilai counter (monoton naik)."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        """Menyimpan nilai sesaat (misalnya panjang antrean)."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        """Mencatat satu observasi ke ringkasan (misalnya latensi atau rasio)."""
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = {"count": 1, "sum": value, "min": value, "max": value}
+                return
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["min"] = min(summary["min"], value)
+            summary["max"] = max(summary["max"], value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Salinan semua metrik beserta rata-rata tiap ringkasan."""
+        with self._lock:
+            summaries = {
+                name: {**s, "avg": s["sum"] / s["count"] if s["count"] else 0.0}
+                for name, s in self._summaries.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": summaries,
+            }
+
+
+# Instansiasi objek metrik
+# Logic: Satu instance per proses, dipakai bersama oleh semua modul (seperti settings).
+metrics = MetricsRegistry()
@@ -0,0 +1,189 @@
+# File: backend/app/core/registry.py
+
+from starlette.requests import HTTPConnection
+from chromadb import PersistentClient
+from sentence_transformers import SentenceTransformer
+from google import genai
+from passlib.context import CryptContext
+from app.core.config import settings
+from app.services.embedding_executor import EmbeddingExecutor
+from app.services.query_embedding_cache import QueryEmbeddingCache
+from app.services.cv_vector_index import CvVectorIndex
+from app.services.job_role_cache import JobRoleCache
+from app.services.llm_response_cache import LLMResponseCache, create_llm_response_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple
+import asyncio
+import httpx
+import multiprocessing
+import time
+
+
+class ResourceRegistry:
+    """
+    Wadah sumber daya berat yang dipakai bersama oleh seluruh request dalam satu proses.
+    Tanggung jawab tunggal: memuat model embedding, koleksi ChromaDB, klien Gemini, dan
+    CryptContext SEKALI saat startup, lalu membagikannya ke service lewat Dependency Injection.
+    """
+    CHROMA_COLLECTION_NAME = "cv_kompetensi_collection"
+
+    def __init__(self):
+        self.embedding_model: Optional[SentenceTransformer] = None
+        self.embedder: Optional[EmbeddingExecutor] = None
+        self.query_cache = QueryEmbeddingCache(max_entries=settings.QUERY_EMBEDDING_CACHE_SIZE)
+        self.cv_index = CvVectorIndex(max_cvs=settings.RAG_EXACT_INDEX_MAX_CVS)
+        # Data referensi Job Role (dimuat di lifespan, lihat main.py)
+        self.job_roles = JobRoleCache(
+            ttl_seconds=settings.JOB_ROLE_CACHE_TTL_SECONDS, miss_reload_seconds=settings.JOB_ROLE_CACHE_MISS_RELOAD_SECONDS
+        )
+        self.chroma_client: Optional[PersistentClient] = None
+        self.collection = None
+        self.llm_client: Optional[genai.Client] = None
+        self.llm_http_client: Optional[httpx.AsyncClient] = None
+        # Batas konkurensi LLM Gateway (global + per model, lihat LLMService)
+        self.llm_semaphore: Optional[asyncio.Semaphore] = None
+        self.llm_model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Cache respons LLM per use case (None jika LLM_CACHE_BACKEND="none")
+        self.llm_cache: Optional[LLMResponseCache] = create_llm_response_cache()
+        self.pwd_context: Optional[CryptContext] = None
+
+        # Pool eksekusi untuk ingestion CV (dibuat saat startup)
+        self.pdf_process_pool: Optional[ProcessPoolExecutor] = None
+        self.ingest_thread_pool: Optional[ThreadPoolExecutor] = None
+        self.ingest_admission: Optional[asyncio.Semaphore] = None
+        self.ingestion_jobs = None # IngestionJobManager, dipasang di lifespan (main.py)
+        self.opening_questions = None # OpeningQuestionBank, dipasang di lifespan (main.py)
+
+        # Evaluasi jawaban yang sedang berjalan di background: qa_id -> (session_id, asyncio.Task)
+        self.deferred_evaluations: Dict[int, Tuple[int, asyncio.Task]] = {}
+        # Jawaban yang sedang diproses (idempotensi /answer): qa_id -> Future hasil giliran
+        self.inflight_answers: Dict[int, asyncio.Future] = {}
+
+        # Status kesiapan per komponen (dilaporkan oleh endpoint /health)
+        self.component_status: Dict[str, str] = {}
+        self.startup_seconds: Optional[float] = None
+
+    def startup(self):
+        """
+        Memuat semua sumber daya dan melakukan warm-up.
+        Logic: Kegagalan satu komponen dicatat (bukan dilempar) agar /health bisa melaporkannya.
+        """
+        started_at = time.perf_counter()
+
+        # 1. Konteks Hashing Password (bcrypt)
+        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.component_status["pwd_context"] = "ok"
+
+        # 2. ChromaDB Client & Koleksi
+        try:
+            self.chroma_client = PersistentClient(path=settings.CHROMA_DB_PATH)
+            self.collection = self.chroma_client.get_or_create_collection(name=self.CHROMA_COLLECTION_NAME)
+            self.component_status["vector_db"] = "ok"
+        except Exception as e:
+            print(f"Registry: Gagal membuka ChromaDB: {e}")
+            self.component_status["vector_db"] = f"error: {e}"
+
+        # 3. Model Embedding + Eksekutor Micro-batching + Warm-up
+        # Logic: Encode pertama kali memicu alokasi memori/kernel, jadi dilakukan sebelum request pertama.
+        try:
+            if settings.EMBEDDING_TORCH_THREADS > 0:
+                import torch
+                torch.set_num_threads(settings.EMBEDDING_TORCH_THREADS)
+            self.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+            self.embedder = EmbeddingExecutor(
+                self.embedding_model,
+                max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+                max_wait_ms=settings.EMBEDDING_BATCH_WAIT_MS,
+                num_workers=settings.EMBEDDING_WORKER_THREADS
+            )
+            self.embedder.encode(["warm-up"])
+            self.component_status["embedding_model"] = "ok"
+        except Exception as e:
+            print(f"Registry: Gagal memuat model embedding: {e}")
+            self.component_status["embedding_model"] = f"error: {e}"
+
+        # 4. Klien Gemini (asinkron, satu pool koneksi HTTP untuk seluruh proses)
+        # Logic: Pool koneksi keep-alive seukuran batas konkurensi, sehingga ratusan panggilan
+        # bersamaan tidak membuka koneksi TLS baru setiap kali.
+        self.llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        if settings.GEMINI_API_KEY:
+            try:
+                self.llm_http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.LLM_MAX_CONCURRENCY,
+                        max_keepalive_connections=settings.LLM_MAX_CONCURRENCY
+                    ),
+                    timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS)
+                )
+                self.llm_client = genai.Client(
+                    api_key=settings.GEMINI_API_KEY,
+                    http_options=genai.types.HttpOptions(httpx_async_client=self.llm_http_client)
+                )
+                self.component_status["llm_client"] = "ok"
+            except Exception as e:
+                print(f"Registry: Gagal membuat klien Gemini: {e}")
+                self.component_status["llm_client"] = f"error: {e}"
+        else:
+            self.component_status["llm_client"] = "error: GEMINI_API_KEY kosong"
+
+        # 5. Pool Ingestion CV
+        # Logic: Context "spawn" dipakai agar worker tidak mewarisi state PyTorch/thread dari proses induk.
+        self.pdf_process_pool = ProcessPoolExecutor(
+            max_workers=settings.CV_PDF_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.ingest_thread_pool = ThreadPoolExecutor(
+            max_workers=settings.CV_INGEST_THREADS, thread_name_prefix="cv-ingest"
+        )
+        self.ingest_admission = asyncio.Semaphore(settings.CV_INGEST_MAX_INFLIGHT)
+
+        self.startup_seconds = round(time.perf_counter() - started_at, 3)
+        print(f"Registry: Startup selesai dalam {self.startup_seconds} detik. Status: {self.component_status}")
+
+    async def aclose(self):
+        """Menutup sumber daya asinkron (pool koneksi HTTP LLM)."""
+        if self.llm_http_client is not None:
+            await self.llm_http_client.aclose()
+            self.llm_http_client = None
+
+    def shutdown(self):
+        """Melepaskan referensi sumber daya saat aplikasi berhenti."""
+        if self.embedder is not None:
+            self.embedder.shutdown()
+            self.embedder = None
+        if self.pdf_process_pool is not None:
+            self.pdf_process_pool.shutdown(wait=False, cancel_futures=True)
+            self.pdf_process_pool = None
+        if self.ingest_thread_pool is not None:
+            self.ingest_thread_pool.shutdown(wait=True)
+            self.ingest_thread_pool = None
+        self.embedding_model = None
+        self.collection = None
+        self.chroma_client = None
+        self.llm_client = None
+        if self.llm_cache is not None:
+            self.llm_cache.close()
+        self.component_status = {}
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.component_status) and all(v == "ok" for v in self.component_status.values())
+
+    def health(self) -> Dict[str, Any]:
+        """Ringkasan kesiapan untuk endpoint /health."""
+        return {
+            "ready": self.ready,
+            "components": self.component_status,
+            "startup_seconds": self.startup_seconds,
+            "query_embedding_cache": self.query_cache.stats(),
+            "job_role_cache": self.job_roles.stats(),
+            "llm_response_cache": self.llm_cache.stats() if self.llm_cache is not None else None,
+            "opening_question_bank": self.opening_questions.stats() if self.opening_questions is not None else None,
+        }
+
+
+# Fungsi Dependency untuk mendapatkan Registry
+# Logic: Registry dibuat di lifespan (main.py) dan disimpan di app.state.
+def get_registry(connection: HTTPConnection) -> ResourceRegistry:
+    # Logic: HTTPConnection (bukan Request) agar dependency ini juga bisa dipakai endpoint WebSocket.
+    return connection.app.state.registry
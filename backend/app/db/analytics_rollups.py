@@ -0,0 +1,132 @@
+# File: backend/app/db/analytics_rollups.py
+
+# Pemeliharaan tabel rollup analitik (student_role_stats, role_score_histogram).
+# Logic: Dipanggil oleh InterviewRepository.add_evaluation di transaksi yang sama dengan INSERT
+# evaluation_metrics; biaya per jawaban konstan (1 baris stats + maksimal 2 baris histogram).
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.models import StudentRoleStats, RoleScoreHistogram, EvaluationMetrics, EVALUATION_RUBRICS
+
+
+def score_bucket(score: Optional[Decimal]) -> Optional[int]:
+    """Bucket histogram (0-100, lebar 1 poin) dari skor rata-rata."""
+    if score is None:
+        return None
+    return max(0, min(100, int(score)))
+
+
+def _upsert(db: Session, model, values: Dict[str, Any], index_elements: List[str], increments: Optional[Dict[str, int]] = None):
+    """
+    INSERT satu baris rollup; jika kunci sudah ada -> kolom `increments` ditambah (atau dibiarkan jika None).
+    Logic: PostgreSQL/SQLite memakai INSERT ... ON CONFLICT (atomik terhadap transaksi lain);
+    dialek lain memakai SAVEPOINT di sekitar INSERT dan menangkap IntegrityError, sehingga transaksi
+    jawaban tidak ikut gagal.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(model).values(**values)
+        if increments:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: getattr(model, column) + delta for column, delta in increments.items()}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        db.execute(stmt)
+        return
+
+    try:
+        with db.begin_nested():
+            db.execute(insert(model).values(**values))
+    except IntegrityError:
+        if increments:
+            db.execute(update(model).where(*[getattr(model, column) == values[column] for column in index_elements]).values(
+                {column: getattr(model, column) + delta for column, delta in increments.items()}
+            ))
+
+
+def _shift_histogram(db: Session, role_id: int, bucket: Optional[int], delta: int):
+    if bucket is None:
+        return
+    if delta > 0:
+        # Logic: Dua evaluasi bersamaan untuk (role_id, bucket) baru tidak sama-sama INSERT (primary key violation).
+        _upsert(
+            db, RoleScoreHistogram, {"role_id": role_id, "bucket": bucket, "jumlah_mahasiswa": delta},
+            ["role_id", "bucket"], increments={"jumlah_mahasiswa": delta}
+        )
+        return
+    db.query(RoleScoreHistogram).filter(
+        RoleScoreHistogram.role_id == role_id, RoleScoreHistogram.bucket == bucket
+    ).update({RoleScoreHistogram.jumlah_mahasiswa: RoleScoreHistogram.jumlah_mahasiswa + delta}, synchronize_session=False)
+
+
+def _ensure_stats_row(db: Session, mahasiswa_id: int, role_id: int):
+    # Kolom total/jumlah memakai server_default 0
+    _upsert(db, StudentRoleStats, {"mahasiswa_id": mahasiswa_id, "role_id": role_id}, ["mahasiswa_id", "role_id"])
+
+
+def apply_evaluation(db: Session, mahasiswa_id: int, role_id: int, db_metrics: EvaluationMetrics, first_answer_in_session: bool):
+    """Menambahkan satu jawaban yang dinilai ke rollup mahasiswa-role dan histogram kohort role."""
+    # 1. Baris stats dipastikan ada (INSERT tanpa konflik, lihat _upsert), lalu dikunci (FOR UPDATE)
+    # Logic: Dua jawaban pertama mahasiswa-role yang dinilai bersamaan tidak lagi sama-sama INSERT (unique violation),
+    # dan evaluasi bersamaan tidak saling menimpa.
+    _ensure_stats_row(db, mahasiswa_id, role_id)
+    stats = db.query(StudentRoleStats).filter(
+        StudentRoleStats.mahasiswa_id == mahasiswa_id, StudentRoleStats.role_id == role_id
+    ).with_for_update().populate_existing().one()
+    old_bucket = score_bucket(stats.skor_rata_rata)
+
+    # 2. Akumulasi
+    stats.jumlah_terjawab += 1
+    if first_answer_in_session:
+        stats.jumlah_sesi += 1
+    stats.total_skor_gabungan += Decimal(db_metrics.skor_gabungan or 0)
+    for rubric in EVALUATION_RUBRICS:
+        score = getattr(db_metrics, rubric)
+        if score is None:
+            continue # Logic: Rubrik yang tidak dinilai tidak ikut pembagi rata-rata rubrik
+        setattr(stats, f"total_{rubric}", getattr(stats, f"total_{rubric}") + Decimal(score))
+        setattr(stats, f"jumlah_{rubric}", getattr(stats, f"jumlah_{rubric}") + 1)
+    stats.skor_rata_rata = Decimal(f"{stats.total_skor_gabungan / stats.jumlah_terjawab:.2f}")
+    stats.tgl_terakhir = datetime.now()
+
+    # 3. Pindahkan mahasiswa ke bucket histogram yang baru (jika berubah)
+    new_bucket = score_bucket(stats.skor_rata_rata)
+    if new_bucket != old_bucket:
+        _shift_histogram(db, role_id, old_bucket, -1)
+        _shift_histogram(db, role_id, new_bucket, +1)
+
+
+def percentile_of(histogram: Dict[int, int], score: Optional[Decimal]) -> Optional[Decimal]:
+    """Persentil (0-100) sebuah skor di dalam histogram {bucket: jumlah} (setengah bucket sendiri dihitung)."""
+    bucket = score_bucket(score)
+    total = sum(histogram.values())
+    if bucket is None or not total:
+        return None
+    below = sum(count for b, count in histogram.items() if b < bucket)
+    rank = below + histogram.get(bucket, 0) / 2
+    return Decimal(f"{rank * 100 / total:.2f}")
+
+
+def score_at_percentiles(histogram: Dict[int, int], points: List[int]) -> Dict[int, Optional[int]]:
+    """Bucket skor pada titik persentil tertentu (mis. 25, 50, 75, 90)."""
+    total = sum(histogram.values())
+    result: Dict[int, Optional[int]] = {point: None for point in points}
+    if not total:
+        return result
+    cumulative = 0
+    pending = sorted(points)
+    for bucket in sorted(histogram):
+        cumulative += histogram[bucket]
+        while pending and cumulative * 100 >= pending[0] * total:
+            result[pending.pop(0)] = bucket
+    return result
@@ -0,0 +1,57 @@
+# File: backend/app/db/backfill_session_aggregates.py
+# Perintah sekali jalan: mengisi agregat berjalan INTERVIEW_SESSIONS untuk sesi yang dibuat sebelum
+# kolom agregat ada. Aman dijalankan ulang (nilai dihitung ulang penuh dari EVALUATION_METRICS).
+#   python -m app.db.backfill_session_aggregates
+
+from decimal import Decimal
+from sqlalchemy import func
+from app.db.database import SessionLocal
+from app.db.models import InterviewSession, PerQuestions, EvaluationMetrics, EVALUATION_RUBRICS
+
+BATCH_SIZE = 500
+
+
+def backfill_session_aggregates() -> int:
+    with SessionLocal() as db:
+        # 1. Satu query GROUP BY untuk semua sesi (COUNT + SUM per rubrik)
+        # Logic: COUNT(kolom) mengabaikan NULL -> jumlah_<rubrik> hanya menghitung jawaban yang dinilai pada rubrik itu.
+        rows = db.query(
+            PerQuestions.session_id,
+            func.count(EvaluationMetrics.metrics_id),
+            func.coalesce(func.sum(EvaluationMetrics.skor_gabungan), 0),
+            *[func.coalesce(func.sum(getattr(EvaluationMetrics, rubric)), 0) for rubric in EVALUATION_RUBRICS],
+            *[func.count(getattr(EvaluationMetrics, rubric)) for rubric in EVALUATION_RUBRICS]
+        ).join(EvaluationMetrics, EvaluationMetrics.qa_id == PerQuestions.qa_id).group_by(PerQuestions.session_id).all()
+
+        # 2. Sesi tanpa skor direset ke nol, sesi lain diisi dari hasil agregasi
+        db.query(InterviewSession).update({
+            InterviewSession.jumlah_terjawab: 0,
+            InterviewSession.total_skor_gabungan: 0,
+            **{getattr(InterviewSession, f"total_{rubric}"): 0 for rubric in EVALUATION_RUBRICS},
+            **{getattr(InterviewSession, f"jumlah_{rubric}"): 0 for rubric in EVALUATION_RUBRICS}
+        }, synchronize_session=False)
+
+        updates = []
+        for session_id, count, total, *rubric_aggregates in rows:
+            rubric_totals, rubric_counts = rubric_aggregates[:len(EVALUATION_RUBRICS)], rubric_aggregates[len(EVALUATION_RUBRICS):]
+            values = {
+                "session_id": session_id,
+                "jumlah_terjawab": count,
+                "total_skor_gabungan": total,
+                "skor_total_rata_rata": Decimal(f"{Decimal(total) / count:.2f}") if count else None,
+            }
+            for rubric, rubric_total, rubric_count in zip(EVALUATION_RUBRICS, rubric_totals, rubric_counts):
+                values[f"total_{rubric}"] = rubric_total
+                values[f"jumlah_{rubric}"] = rubric_count
+            updates.append(values)
+
+        # 3. Bulk UPDATE per primary key, per batch
+        for start in range(0, len(updates), BATCH_SIZE):
+            db.bulk_update_mappings(InterviewSession, updates[start:start + BATCH_SIZE])
+        db.commit()
+        return len(updates)
+
+
+if __name__ == "__main__":
+    updated = backfill_session_aggregates()
+    print(f"Agregat {updated} sesi wawancara berhasil diisi ulang.")
@@ -1,30 +1,134 @@
 # File: backend/app/db/database.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.metrics import metrics
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import time
+
+# 0. Pool Koneksi Terinstrumentasi
+# Logic: Waktu tunggu checkout dan tingkat kejenuhan pool dicatat ke metrics, sehingga kekurangan koneksi
+# (pool starvation) terlihat di /metrics sebelum berubah menjadi timeout di sisi klien.
+class _PoolMetricsMixin:
+    metrics_label = "db"
+
+    def _publish_usage(self):
+        capacity = self.size() + max(self._max_overflow, 0)
+        checked_out = self.checkedout()
+        metrics.set_gauge(f"{self.metrics_label}_pool_checked_out", checked_out)
+        metrics.set_gauge(f"{self.metrics_label}_pool_saturation", round(checked_out / capacity, 3) if capacity else 0)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            metrics.inc(f"{self.metrics_label}_pool_checkout_errors")
+            raise
+        finally:
+            metrics.observe(f"{self.metrics_label}_pool_checkout_wait_ms", (time.perf_counter() - started) * 1000)
+            self._publish_usage()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._publish_usage()
+
+    def status(self) -> Dict[str, Any]:
+        capacity = self.size() + max(self._max_overflow, 0)
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "saturation": round(self.checkedout() / capacity, 3) if capacity else 0,
+        }
+
+
+class InstrumentedQueuePool(_PoolMetricsMixin, QueuePool):
+    metrics_label = "db_sync"
+
+
+class InstrumentedAsyncQueuePool(_PoolMetricsMixin, AsyncAdaptedQueuePool):
+    metrics_label = "db_async"
+
 
 # 1. Membuat Engine Koneksi
-# Logic: Menggunakan URL yang dihasilkan di core/config.py
+# Logic: Engine async (asyncpg) melayani request API tanpa memakai thread; engine sinkron tetap ada untuk
+# perintah CLI (python -m app.db....), thread ingestion CV, ekspor transkrip, dan endpoint sinkron.
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_SYNC_POOL_SIZE,
+    max_overflow=settings.DB_SYNC_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     echo=False  # Ganti True untuk melihat SQL yang dieksekusi (debugging)
 )
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    echo=False
+)
 
 # 2. Membuat Session Lokal
 # Logic: Session ini akan digunakan oleh service untuk berinteraksi dengan DB
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Logic: expire_on_commit=False karena atribut kedaluwarsa tidak bisa di-lazy-load di luar konteks async.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 # 3. Basis Deklaratif
 # Logic: Ini adalah basis kelas yang akan diwarisi oleh semua model ORM Anda
 Base = declarative_base()
 
 # Fungsi Dependency untuk mendapatkan Session DB
-# Logic: Digunakan di router/endpoint FastAPI (Dependency Injection)
-def get_db():
+# Logic: Digunakan di router/endpoint FastAPI (Dependency Injection). Default-nya AsyncSession;
+# kode ORM sinkron yang sudah ada (repository) dijalankan lewat AsyncSession.run_sync (greenlet, tanpa thread).
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session sinkron untuk endpoint `def` biasa (berjalan di threadpool Starlette)
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def pool_status() -> Dict[str, Any]:
+    """Ringkasan pool kedua engine (untuk /health)."""
+    return {"async": async_engine.sync_engine.pool.status(), "sync": engine.pool.status()}
+
+# 4. Penghitung Statement SQL per Request
+# Logic: Listener global di Engine menambah counter milik request yang sedang berjalan (ContextVar),
+# sehingga jumlah round trip DB per request bisa dilaporkan (header X-DB-Statements) dan diuji.
+# Counter berupa list agar ikut terbawa ke thread (asyncio.to_thread menyalin konteks, bukan nilainya).
+_statement_counter: ContextVar[Optional[List[int]]] = ContextVar("statement_counter", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statement_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+@contextmanager
+def count_statements() -> Iterator[List[int]]:
+    """Menghitung statement SQL yang dieksekusi di dalam blok ini; nilai akhir ada di counter[0]."""
+    counter = [0]
+    token = _statement_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _statement_counter.reset(token)
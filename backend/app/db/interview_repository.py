@@ -0,0 +1,189 @@
+# File: backend/app/db/interview_repository.py
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.db import analytics_rollups
+from app.db.models import InterviewSession, PerQuestions, EvaluationMetrics, Feedback, EVALUATION_RUBRICS
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+
+class InterviewRepository:
+    """
+    Lapisan akses data untuk alur wawancara.
+    Tanggung jawab tunggal: membaca data satu giliran dengan satu query JOIN dan menyiapkan
+    semua penulisan satu giliran di Session yang sama. Repository TIDAK melakukan commit;
+    pemanggil (service) melakukan satu commit di akhir, sehingga satu giliran = satu transaksi.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ----------------------------------------------------------------------
+    # BACA
+    # ----------------------------------------------------------------------
+    def load_turn(self, qa_id: int) -> Optional[Tuple[PerQuestions, InterviewSession]]:
+        """Pertanyaan + sesi dalam SATU query. Role diambil dari cache Job Role (registry.job_roles)."""
+        row = self.db.query(PerQuestions, InterviewSession).join(
+            InterviewSession, InterviewSession.session_id == PerQuestions.session_id
+        ).filter(PerQuestions.qa_id == qa_id).first()
+        return tuple(row) if row else None
+
+    # ----------------------------------------------------------------------
+    # TULIS (tanpa commit)
+    # ----------------------------------------------------------------------
+    def claim_answer(self, qa_id: int, jawaban_mentah: str, answer_clean: str, waktu_respon: Optional[int],
+                     tgl_klaim_evaluasi: Optional[datetime] = None) -> bool:
+        """
+        Menyimpan jawaban HANYA jika pertanyaan belum dijawab (compare-and-set dalam satu UPDATE).
+        Logic: Transaksi duplikat menunggu kunci baris, lalu mendapati jawaban sudah terisi -> False.
+        tgl_klaim_evaluasi diisi untuk evaluasi tertunda, sehingga klaimnya tercatat bersama jawaban.
+        """
+        values = {
+            "jawaban_mahasiswa_mentah": jawaban_mentah,
+            "jawaban_mahasiswa_bersih": answer_clean,
+            "waktu_respon": waktu_respon,
+        }
+        if tgl_klaim_evaluasi is not None:
+            values["tgl_klaim_evaluasi"] = tgl_klaim_evaluasi
+        updated = self.db.query(PerQuestions).filter(
+            PerQuestions.qa_id == qa_id, PerQuestions.jawaban_mahasiswa_bersih.is_(None)
+        ).update(values, synchronize_session=False)
+        return updated == 1
+
+    def claim_turn(self, qa_id: int, claimed_at: datetime, stale_before: datetime) -> bool:
+        """
+        Menandai giliran sedang diproses (compare-and-set): berhasil jika belum dijawab dan belum diklaim,
+        atau klaim sebelumnya lebih tua dari stale_before (pemiliknya dianggap mati).
+        """
+        updated = self.db.query(PerQuestions).filter(
+            PerQuestions.qa_id == qa_id,
+            PerQuestions.jawaban_mahasiswa_bersih.is_(None),
+            or_(PerQuestions.tgl_klaim_jawaban.is_(None), PerQuestions.tgl_klaim_jawaban < stale_before)
+        ).update({"tgl_klaim_jawaban": claimed_at}, synchronize_session=False)
+        return updated == 1
+
+    def release_turn(self, qa_id: int, claimed_at: datetime):
+        """Melepas klaim giliran milik pemanggil (klaim yang sudah diambil alih worker lain tidak disentuh)."""
+        self.db.query(PerQuestions).filter(
+            PerQuestions.qa_id == qa_id,
+            PerQuestions.jawaban_mahasiswa_bersih.is_(None),
+            PerQuestions.tgl_klaim_jawaban == claimed_at
+        ).update({"tgl_klaim_jawaban": None}, synchronize_session=False)
+
+    def is_answered(self, qa_id: int) -> bool:
+        return self.db.query(PerQuestions.jawaban_mahasiswa_bersih.isnot(None)).filter(PerQuestions.qa_id == qa_id).scalar() or False
+
+    def claim_evaluation(self, qa_id: int, claimed_at: datetime, stale_before: datetime) -> bool:
+        """Mengklaim evaluasi tertunda (compare-and-set): berhasil jika klaim kosong atau lebih tua dari stale_before."""
+        updated = self.db.query(PerQuestions).filter(
+            PerQuestions.qa_id == qa_id,
+            or_(PerQuestions.tgl_klaim_evaluasi.is_(None), PerQuestions.tgl_klaim_evaluasi < stale_before)
+        ).update({"tgl_klaim_evaluasi": claimed_at}, synchronize_session=False)
+        return updated == 1
+
+    def release_evaluation(self, qa_id: int):
+        """Melepas klaim evaluasi (evaluasi gagal) agar poll status berikutnya atau giliran terakhir menjadwalkan ulang."""
+        self.db.query(PerQuestions).filter(PerQuestions.qa_id == qa_id).update(
+            {"tgl_klaim_evaluasi": None}, synchronize_session=False
+        )
+
+    def add_evaluation(self, session_id: int, db_metrics: EvaluationMetrics, db_feedback: Feedback) -> Decimal:
+        """
+        Menyimpan skor + feedback dan memperbarui agregat berjalan sesi di transaksi yang sama.
+        Logic: UPDATE memakai ekspresi SQL (kolom = kolom + nilai), sehingga evaluasi yang selesai
+        bersamaan (mis. evaluasi tertunda) tidak saling menimpa. Rubrik yang tidak dinilai (NULL) tidak menambah
+        total_<rubrik> maupun jumlah_<rubrik>, sehingga rata-rata rubrik hanya atas jawaban yang dinilai.
+        Mengembalikan skor_total_rata_rata sesi yang baru ditulis.
+        """
+        self.db.add_all([db_metrics, db_feedback])
+        skor_gabungan = db_metrics.skor_gabungan or 0
+        values = {
+            InterviewSession.jumlah_terjawab: InterviewSession.jumlah_terjawab + 1,
+            InterviewSession.total_skor_gabungan: InterviewSession.total_skor_gabungan + skor_gabungan,
+            # Logic: SET membaca nilai baris LAMA, sehingga rata-rata dihitung dari total + skor baru.
+            InterviewSession.skor_total_rata_rata: func.round(
+                (InterviewSession.total_skor_gabungan + skor_gabungan) / (InterviewSession.jumlah_terjawab + 1), 2
+            ),
+        }
+        for rubric in EVALUATION_RUBRICS:
+            score = getattr(db_metrics, rubric)
+            if score is None:
+                continue
+            total_column = getattr(InterviewSession, f"total_{rubric}")
+            count_column = getattr(InterviewSession, f"jumlah_{rubric}")
+            values[total_column] = total_column + score
+            values[count_column] = count_column + 1
+        # Logic: jumlah_terjawab dibaca dari hasil UPDATE (RETURNING), bukan dari objek sesi di identity map
+        # yang bisa basi; dua evaluasi bersamaan untuk satu sesi terserialisasi oleh kunci baris,
+        # sehingga hanya satu yang melihat jawaban pertama (jumlah_sesi tidak terhitung ganda).
+        jumlah_terjawab, mahasiswa_id, role_id, skor_total_rata_rata = self.db.execute(
+            update(InterviewSession).where(InterviewSession.session_id == session_id).values(values).returning(
+                InterviewSession.jumlah_terjawab, InterviewSession.mahasiswa_id, InterviewSession.role_id,
+                InterviewSession.skor_total_rata_rata
+            ).execution_options(synchronize_session=False)
+        ).one()
+        # Rollup analitik mahasiswa-role ikut diperbarui di transaksi yang sama.
+        analytics_rollups.apply_evaluation(
+            self.db, mahasiswa_id, role_id, db_metrics, first_answer_in_session=jumlah_terjawab == 1
+        )
+        return skor_total_rata_rata
+
+    def add_question(self, session_id: int, urutan_pertanyaan: int, jenis_pertanyaan: str, pertanyaan_llm: str) -> PerQuestions:
+        """Menambahkan pertanyaan baru dan melakukan flush agar qa_id tersedia sebelum commit."""
+        db_question = PerQuestions(
+            session_id=session_id,
+            urutan_pertanyaan=urutan_pertanyaan,
+            jenis_pertanyaan=jenis_pertanyaan,
+            pertanyaan_llm=pertanyaan_llm,
+            waktu_tanya=datetime.now()
+        )
+        self.db.add(db_question)
+        self.db.flush()
+        return db_question
+
+    def close_session(self, session_id: int) -> Optional[Decimal]:
+        """
+        Menandai sesi selesai. Skor rata-rata sudah terbarui oleh add_evaluation (tanpa AVG ulang);
+        nilai yang tersimpan dikembalikan (RETURNING) untuk dilaporkan ke klien.
+        """
+        return self.db.execute(
+            update(InterviewSession).where(InterviewSession.session_id == session_id).values(
+                tgl_selesai=datetime.now()
+            ).returning(InterviewSession.skor_total_rata_rata).execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+
+    def load_session_detail(self, session_id: int) -> Optional[InterviewSession]:
+        """Sesi + role (JOIN) lalu pertanyaan, metrics, dan feedback (selectinload): 4 query tetap."""
+        return self.db.query(InterviewSession).options(
+            joinedload(InterviewSession.job_role),
+            selectinload(InterviewSession.questions).selectinload(PerQuestions.metrics),
+            selectinload(InterviewSession.questions).selectinload(PerQuestions.feedback),
+        ).filter(InterviewSession.session_id == session_id).first()
+
+    def load_question_evaluation(self, qa_id: int) -> Optional[PerQuestions]:
+        """Pertanyaan + sesi + metrics + feedback dalam satu query (status evaluasi, tanpa lazy load; selalu data terbaru)."""
+        return self.db.query(PerQuestions).options(
+            joinedload(PerQuestions.session),
+            joinedload(PerQuestions.metrics),
+            joinedload(PerQuestions.feedback),
+        ).filter(PerQuestions.qa_id == qa_id).execution_options(populate_existing=True).first()
+
+    def load_unevaluated_answers(self, session_id: int) -> List[PerQuestions]:
+        """Pertanyaan sesi yang sudah dijawab tetapi belum punya skor (evaluasi tertunda yang belum tersimpan)."""
+        return self.db.query(PerQuestions).outerjoin(
+            EvaluationMetrics, EvaluationMetrics.qa_id == PerQuestions.qa_id
+        ).filter(
+            PerQuestions.session_id == session_id,
+            PerQuestions.jawaban_mahasiswa_bersih.isnot(None),
+            EvaluationMetrics.metrics_id.is_(None)
+        ).all()
+
+    def get_question_by_order(self, session_id: int, urutan_pertanyaan: int) -> Optional[PerQuestions]:
+        """Pertanyaan ke-N sebuah sesi (memakai ix_per_questions_session_urutan)."""
+        return self.db.query(PerQuestions).filter(
+            PerQuestions.session_id == session_id, PerQuestions.urutan_pertanyaan == urutan_pertanyaan
+        ).first()
+
+    def get_session(self, session_id: int) -> Optional[InterviewSession]:
+        return self.db.get(InterviewSession, session_id)
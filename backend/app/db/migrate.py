@@ -0,0 +1,158 @@
+# File: backend/app/db/migrate.py
+# Runner migrasi skema berbasis file SQL bernomor di database/migrations (NNNN_nama.sql).
+# Versi yang sudah diterapkan dicatat di tabel schema_migrations, sehingga aman dijalankan ulang.
+#   python -m app.db.migrate            -> menerapkan semua revisi yang belum diterapkan
+#   python -m app.db.migrate --status   -> menampilkan revisi yang sudah/belum diterapkan
+#   python -m app.db.migrate --check    -> EXPLAIN query panas tiap revisi, gagal jika indeksnya tidak dipakai
+#
+# Header opsional di baris awal file revisi:
+#   -- migrate:no-transaction   -> dijalankan dengan AUTOCOMMIT (wajib untuk CREATE INDEX CONCURRENTLY)
+#   -- check <nama_indeks>: <SELECT ...>   -> query panas yang WAJIB memakai <nama_indeks> (boleh lebih dari satu)
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.db.database import engine
+
+# backend/app/db/migrate.py -> <repo>/database/migrations
+MIGRATIONS_DIR = Path(__file__).resolve().parents[3] / "database" / "migrations"
+_REVISION_FILE = re.compile(r"^(\d{4})_[\w-]+\.sql$")
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+_CHECK_LINE = re.compile(r"^-- check (\w+):\s*(.+)$", re.MULTILINE)
+# Node plan yang dianggap "memakai indeks"
+INDEX_SCAN_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+class Revision(NamedTuple):
+    version: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+    @property
+    def transactional(self) -> bool:
+        return NO_TRANSACTION_MARKER not in self.sql
+
+    @property
+    def checks(self) -> List[Tuple[str, str]]:
+        """Pasangan (nama_indeks, query) dari baris '-- check'."""
+        return [(index_name, query.strip().rstrip(";")) for index_name, query in _CHECK_LINE.findall(self.sql)]
+
+
+def list_revisions(directory: Path = MIGRATIONS_DIR) -> List[Revision]:
+    """Semua file revisi, diurutkan berdasarkan nomor versi."""
+    revisions = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _REVISION_FILE.match(path.name)
+        if match:
+            revisions.append(Revision(match.group(1), path))
+    return revisions
+
+
+def _ensure_version_table(bind: Engine):
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version VARCHAR(16) PRIMARY KEY,"
+            " applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW())"
+        ))
+
+
+def applied_versions(bind: Engine = engine) -> Set[str]:
+    _ensure_version_table(bind)
+    with bind.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def apply_revision(revision: Revision, bind: Engine = engine):
+    """
+    Menerapkan satu revisi.
+    Logic: Revisi biasa + pencatatan versinya berada di SATU transaksi (gagal = tidak ada yang berubah).
+    Revisi no-transaction dijalankan dengan AUTOCOMMIT dan harus idempoten (IF NOT EXISTS).
+    """
+    if revision.transactional:
+        with bind.begin() as conn:
+            conn.exec_driver_sql(revision.sql)
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:v)"), {"v": revision.version})
+    else:
+        with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql(revision.sql)
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:v)"), {"v": revision.version})
+
+
+def upgrade(bind: Engine = engine) -> List[str]:
+    """Menerapkan semua revisi yang belum diterapkan secara berurutan."""
+    done = applied_versions(bind)
+    applied = []
+    for revision in list_revisions():
+        if revision.version in done:
+            continue
+        print(f"Menerapkan migrasi {revision.path.name} ...")
+        apply_revision(revision, bind)
+        applied.append(revision.version)
+    return applied
+
+
+def _plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def explain_uses_index(conn, query: str, index_name: str) -> bool:
+    """True jika plan EXPLAIN (FORMAT JSON) query memuat Index/Index Only/Bitmap Index Scan atas index_name."""
+    raw = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query}").scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    return any(
+        node.get("Node Type") in INDEX_SCAN_NODES and node.get("Index Name") == index_name
+        for node in _plan_nodes(plan)
+    )
+
+
+def run_checks(bind: Engine = engine) -> List[str]:
+    """
+    Menjalankan semua '-- check' milik revisi yang sudah diterapkan. Mengembalikan daftar kegagalan.
+    Logic: Database lokal/CI biasanya hampir kosong, sehingga planner wajar memilih Seq Scan.
+    enable_seqscan=off (SET LOCAL, hanya di transaksi ini) memaksa planner memakai indeks JIKA indeks
+    itu bisa melayani query; jika tetap tidak dipakai, indeks atau query-nya memang tidak cocok.
+    """
+    done = applied_versions(bind)
+    failures = []
+    with bind.connect() as conn:
+        with conn.begin() as trans:
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            for revision in list_revisions():
+                if revision.version not in done:
+                    continue
+                for index_name, query in revision.checks:
+                    ok = explain_uses_index(conn, query, index_name)
+                    print(f"[{'OK' if ok else 'GAGAL'}] {revision.path.name}: {index_name} <- {query}")
+                    if not ok:
+                        failures.append(f"{revision.path.name}: {index_name}")
+            trans.rollback()
+    return failures
+
+
+def print_status(bind: Engine = engine):
+    done = applied_versions(bind)
+    for revision in list_revisions():
+        mark = "x" if revision.version in done else " "
+        print(f"[{mark}] {revision.path.name}")
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv[1:]:
+        print_status()
+    elif "--check" in sys.argv[1:]:
+        failed = run_checks()
+        print(f"{len(failed)} pemeriksaan indeks gagal." if failed else "Semua query panas memakai indeks.")
+        sys.exit(1 if failed else 0)
+    else:
+        versions = upgrade()
+        print(f"Migrasi selesai: {len(versions)} revisi diterapkan." if versions else "Skema sudah terbaru.")
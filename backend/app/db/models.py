@@ -2,7 +2,7 @@
 
 # Model ORM adalah implementasi dari tabel Anda yang mempermudah interaksi DB tanpa harus menulis raw SQL berulang kali (prinsip DRY).
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Numeric
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Numeric, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base # Mengimpor Base dari database.py
 
@@ -57,10 +57,17 @@ class CvData(Base):
     raw_text = Column(Text, nullable=False)
     parsed_kompetensi = Column(Text) # Data yang sudah diolah/diekstraksi
     tgl_upload = Column(DateTime(timezone=True))
+    content_hash = Column(String(64), index=True) # SHA-256 dari byte PDF (deduplikasi upload)
+    status_proses = Column(String(20)) # 'pending', 'processing', 'indexed', 'failed' (NULL = CV lama, dianggap indexed)
 
     # Hubungan
     mahasiswa = relationship("Mahasiswa", back_populates="cv_data")
 
+    # Indeks riwayat CV (keyset pagination per mahasiswa; lihat database/migrations/0002)
+    __table_args__ = (
+        Index("ix_cv_data_mahasiswa_tgl_upload", "mahasiswa_id", "tgl_upload", "cv_id"),
+    )
+
 
 # ===============================================
 # 4. TABEL INTERVIEW_SESSIONS (Riwayat/History)
@@ -73,16 +80,44 @@ class InterviewSession(Base):
     # Foreign Keys
     mahasiswa_id = Column(Integer, ForeignKey("mahasiswa.mahasiswa_id", ondelete="CASCADE"), nullable=False)
     role_id = Column(Integer, ForeignKey("job_roles.role_id", ondelete="RESTRICT"), nullable=False)
+    cv_id = Column(Integer, ForeignKey("cv_data.cv_id", ondelete="SET NULL")) # CV sumber konteks RAG sesi ini
     
     # Data Sesi
     tgl_mulai = Column(DateTime(timezone=True))
     tgl_selesai = Column(DateTime(timezone=True))
-    skor_total_rata_rata = Column(Numeric(5, 2)) # Skor akhir sesi
+    skor_total_rata_rata = Column(Numeric(5, 2)) # Skor rata-rata sesi (diperbarui setiap jawaban dinilai)
+
+    # Agregat Berjalan (diperbarui di transaksi yang sama dengan INSERT evaluation_metrics)
+    # Logic: Skor live dan rata-rata akhir dibaca O(1) tanpa JOIN ke evaluation_metrics.
+    jumlah_terjawab = Column(Integer, nullable=False, default=0, server_default="0")
+    total_skor_gabungan = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_situation = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_task = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_action = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_result = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_relevance = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_clarity = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_confidence = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    total_skor_conciseness = Column(Numeric(8, 2), nullable=False, default=0, server_default="0")
+    # Jumlah jawaban yang dinilai per rubrik (pembagi rata-rata rubrik; rubrik NULL tidak dihitung)
+    jumlah_skor_situation = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_task = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_action = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_result = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_relevance = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_clarity = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_confidence = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_conciseness = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Hubungan
     mahasiswa = relationship("Mahasiswa", back_populates="sessions")
     job_role = relationship("JobRole", back_populates="sessions")
-    questions = relationship("PerQuestions", back_populates="session", cascade="all, delete-orphan")
+    questions = relationship("PerQuestions", back_populates="session", cascade="all, delete-orphan", order_by="PerQuestions.urutan_pertanyaan")
+
+    # Indeks riwayat sesi per mahasiswa (lihat database/migrations/0004)
+    __table_args__ = (
+        Index("ix_interview_sessions_mahasiswa_tgl_mulai", "mahasiswa_id", "tgl_mulai"),
+    )
 
 
 # ===============================================
@@ -104,12 +139,27 @@ class PerQuestions(Base):
     jawaban_mahasiswa_bersih = Column(Text) # Setelah NLP Preprocessing
     waktu_respon = Column(Integer) # Waktu dalam detik
     waktu_tanya = Column(DateTime(timezone=True))
+    # Klaim lintas worker (lihat database/migrations/0008); klaim yang lebih tua dari batas basi boleh diambil alih
+    tgl_klaim_jawaban = Column(DateTime(timezone=True)) # Giliran sedang diproses (diisi sebelum panggilan LLM)
+    tgl_klaim_evaluasi = Column(DateTime(timezone=True)) # Evaluasi tertunda sedang berjalan
 
     # Hubungan
     session = relationship("InterviewSession", back_populates="questions")
     metrics = relationship("EvaluationMetrics", back_populates="question", uselist=False, cascade="all, delete-orphan")
     feedback = relationship("Feedback", back_populates="question", uselist=False, cascade="all, delete-orphan")
 
+    # Indeks pertanyaan per sesi (lihat database/migrations/0003)
+    __table_args__ = (
+        Index("ix_per_questions_session_urutan", "session_id", "urutan_pertanyaan"),
+    )
+
+
+# Rubrik penilaian per jawaban (kolom EVALUATION_METRICS; agregatnya di INTERVIEW_SESSIONS.total_<rubrik> dan jumlah_<rubrik>)
+EVALUATION_RUBRICS = (
+    "skor_situation", "skor_task", "skor_action", "skor_result",
+    "skor_relevance", "skor_clarity", "skor_confidence", "skor_conciseness",
+)
+
 
 # ===============================================
 # 6. TABEL EVALUATION_METRICS (Rubrik Skor Modul 3)
@@ -154,4 +204,68 @@ class Feedback(Base):
     saran_perbaikan_utama = Column(Text) # Poin perbaikan yang disorot
 
     # Hubungan
-    question = relationship("PerQuestions", back_populates="feedback")
\ No newline at end of file
+    question = relationship("PerQuestions", back_populates="feedback")
+
+# ===============================================
+# 8. TABEL ROLLUP ANALITIK (Progres Mahasiswa)
+# ===============================================
+# Logic: Diperbarui secara inkremental di transaksi yang sama dengan INSERT evaluation_metrics
+# (lihat app/db/analytics_rollups.py), sehingga endpoint analitik tidak pernah memindai riwayat jawaban.
+class StudentRoleStats(Base):
+    """Rata-rata per mahasiswa per role (akumulasi seluruh jawaban yang dinilai)."""
+    __tablename__ = "student_role_stats"
+
+    mahasiswa_id = Column(Integer, ForeignKey("mahasiswa.mahasiswa_id", ondelete="CASCADE"), primary_key=True)
+    role_id = Column(Integer, ForeignKey("job_roles.role_id", ondelete="CASCADE"), primary_key=True)
+
+    jumlah_sesi = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_terjawab = Column(Integer, nullable=False, default=0, server_default="0")
+    total_skor_gabungan = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_situation = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_task = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_action = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_result = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_relevance = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_clarity = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_confidence = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    total_skor_conciseness = Column(Numeric(10, 2), nullable=False, default=0, server_default="0")
+    jumlah_skor_situation = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_task = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_action = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_result = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_relevance = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_clarity = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_confidence = Column(Integer, nullable=False, default=0, server_default="0")
+    jumlah_skor_conciseness = Column(Integer, nullable=False, default=0, server_default="0")
+    skor_rata_rata = Column(Numeric(5, 2))
+    tgl_terakhir = Column(DateTime(timezone=True))
+
+
+class RoleScoreHistogram(Base):
+    """Histogram rata-rata mahasiswa per role (bucket 0-100, lebar 1 poin) untuk persentil kohort."""
+    __tablename__ = "role_score_histogram"
+
+    role_id = Column(Integer, ForeignKey("job_roles.role_id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    jumlah_mahasiswa = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+# ===============================================
+# 9. TABEL BANK PERTANYAAN PEMBUKA (Pra-generate)
+# ===============================================
+# Logic: Diisi di background setelah CV terindeks (lihat app/services/opening_question_bank.py);
+# /interview/start mengambil (dan menghapus) satu kandidat per (cv_id, role_id) tanpa RAG + LLM.
+class PregeneratedQuestion(Base):
+    """Kandidat pertanyaan pembuka yang sudah dihasilkan LLM untuk satu CV dan satu role."""
+    __tablename__ = "pregenerated_questions"
+
+    question_id = Column(Integer, primary_key=True, index=True)
+    cv_id = Column(Integer, ForeignKey("cv_data.cv_id", ondelete="CASCADE"), nullable=False)
+    role_id = Column(Integer, ForeignKey("job_roles.role_id", ondelete="CASCADE"), nullable=False)
+    pertanyaan_llm = Column(Text, nullable=False)
+    tgl_dibuat = Column(DateTime(timezone=True), nullable=False)
+
+    # Indeks pengambilan kandidat tertua yang masih segar per (CV, role); lihat database/migrations/0005
+    __table_args__ = (
+        Index("ix_pregenerated_questions_cv_role_tgl", "cv_id", "role_id", "tgl_dibuat"),
+    )
@@ -0,0 +1,79 @@
+# File: backend/app/db/pagination.py
+
+# Utilitas list endpoint: keyset pagination + penundaan (defer) kolom teks besar.
+# Logic: Dipakai oleh semua list endpoint (riwayat CV, dan nantinya PerQuestions/Feedback), sehingga
+# halaman ke-N sama murahnya dengan halaman pertama (tanpa OFFSET) dan teks besar tidak ikut dibaca.
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Type
+from pydantic import BaseModel
+from sqlalchemy import Text, and_, or_
+from sqlalchemy.orm import Query, defer
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    """Dilempar jika cursor pagination tidak bisa dibaca."""
+    pass
+
+
+def defer_unused_large_columns(model, schema: Type[BaseModel]) -> List:
+    """
+    Opsi query yang menunda semua kolom Text milik model yang TIDAK dikembalikan oleh skema output.
+    Contoh: CvData.raw_text (isi CV penuh) tidak pernah dikirim oleh CvDataOut.
+    """
+    returned = set(schema.model_fields)
+    return [
+        defer(getattr(model, column.key))
+        for column in model.__table__.columns
+        if isinstance(column.type, Text) and column.key not in returned
+    ]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Cursor opaque (base64 JSON) dari nilai kolom urut baris terakhir."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(payload) != len(types):
+            raise ValueError("panjang cursor tidak cocok")
+        return tuple(
+            datetime.fromisoformat(value) if type_ is datetime and value is not None else value
+            for value, type_ in zip(payload, types)
+        )
+    except Exception as e:
+        raise InvalidCursorError(f"Cursor pagination tidak valid: {e}")
+
+
+def keyset_paginate(query: Query, order_columns: Sequence, cursor: Optional[str], limit: int,
+                    cursor_types: Sequence[type]) -> Tuple[List[Any], Optional[str]]:
+    """
+    Keyset pagination menurun (DESC) atas order_columns, misalnya (tgl_upload, cv_id).
+    Logic: Kolom terakhir harus unik (primary key) sebagai pemecah seri. Mengambil limit+1 baris
+    untuk mengetahui apakah masih ada halaman berikutnya. Mengembalikan (baris, cursor_berikutnya).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        values = decode_cursor(cursor, cursor_types)
+        # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y), ditulis eksplisit agar portabel antar DB
+        conditions = []
+        for i, column in enumerate(order_columns):
+            equal_prefix = [order_columns[j] == values[j] for j in range(i)]
+            conditions.append(and_(*equal_prefix, column < values[i]))
+        query = query.filter(or_(*conditions))
+
+    rows = query.order_by(*[column.desc() for column in order_columns]).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_columns])
+    return rows, next_cursor
@@ -0,0 +1,65 @@
+# File: backend/app/db/rebuild_analytics_rollups.py
+# Perintah sekali jalan: membangun ulang tabel rollup analitik dari agregat INTERVIEW_SESSIONS.
+# Jalankan SETELAH backfill_session_aggregates. Aman dijalankan ulang (tabel rollup dikosongkan dulu).
+#   python -m app.db.rebuild_analytics_rollups
+
+from collections import Counter
+from decimal import Decimal
+from sqlalchemy import func
+from app.db.database import SessionLocal
+from app.db.models import InterviewSession, StudentRoleStats, RoleScoreHistogram, EVALUATION_RUBRICS
+from app.db.analytics_rollups import score_bucket
+
+
+def rebuild_analytics_rollups() -> int:
+    with SessionLocal() as db:
+        # 1. Satu query GROUP BY (mahasiswa, role) di atas agregat per sesi
+        rows = db.query(
+            InterviewSession.mahasiswa_id,
+            InterviewSession.role_id,
+            func.count(InterviewSession.session_id),
+            func.sum(InterviewSession.jumlah_terjawab),
+            func.sum(InterviewSession.total_skor_gabungan),
+            func.max(InterviewSession.tgl_mulai),
+            *[func.sum(getattr(InterviewSession, f"total_{rubric}")) for rubric in EVALUATION_RUBRICS],
+            *[func.sum(getattr(InterviewSession, f"jumlah_{rubric}")) for rubric in EVALUATION_RUBRICS]
+        ).filter(InterviewSession.jumlah_terjawab > 0).group_by(
+            InterviewSession.mahasiswa_id, InterviewSession.role_id
+        ).all()
+
+        # 2. Kosongkan lalu isi ulang rollup + histogram
+        db.query(RoleScoreHistogram).delete(synchronize_session=False)
+        db.query(StudentRoleStats).delete(synchronize_session=False)
+
+        histogram = Counter()
+        stats_rows = []
+        for mahasiswa_id, role_id, sessions, answered, total, last_started, *rubric_aggregates in rows:
+            rubric_totals, rubric_counts = rubric_aggregates[:len(EVALUATION_RUBRICS)], rubric_aggregates[len(EVALUATION_RUBRICS):]
+            average = Decimal(f"{Decimal(total) / answered:.2f}")
+            stats = {
+                "mahasiswa_id": mahasiswa_id,
+                "role_id": role_id,
+                "jumlah_sesi": sessions,
+                "jumlah_terjawab": answered,
+                "total_skor_gabungan": total,
+                "skor_rata_rata": average,
+                "tgl_terakhir": last_started,
+            }
+            for rubric, rubric_total, rubric_count in zip(EVALUATION_RUBRICS, rubric_totals, rubric_counts):
+                stats[f"total_{rubric}"] = rubric_total or 0
+                stats[f"jumlah_{rubric}"] = rubric_count or 0
+            stats_rows.append(stats)
+            histogram[(role_id, score_bucket(average))] += 1
+
+        db.bulk_insert_mappings(StudentRoleStats, stats_rows)
+        db.bulk_insert_mappings(RoleScoreHistogram, [
+            {"role_id": role_id, "bucket": bucket, "jumlah_mahasiswa": count}
+            for (role_id, bucket), count in histogram.items()
+        ])
+        db.commit()
+        return len(stats_rows)
+
+
+if __name__ == "__main__":
+    rebuilt = rebuild_analytics_rollups()
+    print(f"Rollup analitik untuk {rebuilt} pasangan mahasiswa-role berhasil dibangun ulang.")
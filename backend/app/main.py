@@ -1,17 +1,71 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
 from app.core.config import settings
+from app.core.registry import ResourceRegistry, get_registry
+from app.core.metrics import metrics
+from app.db.database import SessionLocal, async_engine, count_statements, pool_status
+from app.services.job_role_service import JobRoleService
+from app.services.ingestion_jobs import IngestionJobManager
+from app.services.opening_question_bank import OpeningQuestionBank
 from app.api import user_router 
 from app.api import pipeline_router 
 from app.api import interview_router # <-- ROUTER BARU DARI LANGKAH C
+from app.api import analytics_router
+from app.api import admin_router
+
+def _load_job_roles(registry: ResourceRegistry):
+    # Logic: Cache Job Role dimuat sekali di awal, dan embedding template kueri RAG untuk setiap
+    # Job Role ikut dihitung, sehingga start interview tidak perlu query role / memanggil model embedding.
+    try:
+        with SessionLocal() as db:
+            JobRoleService(db, registry).refresh_cache()
+        registry.component_status["job_roles"] = "ok"
+    except Exception as e:
+        print(f"Startup: Gagal memuat Job Role / embedding kueri role: {e}")
+        registry.component_status["job_roles"] = f"error: {e}"
+
+# 0. Lifespan: Memuat Sumber Daya Bersama
+# Logic: Model embedding, ChromaDB, klien Gemini, dan CryptContext dimuat SEKALI per proses,
+# bukan per request. Loading dijalankan di threadpool agar tidak memblokir event loop.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    registry = ResourceRegistry()
+    await run_in_threadpool(registry.startup)
+    await run_in_threadpool(_load_job_roles, registry)
+    # Logic: Pipeline ingestion CV di background; CV yang terputus saat restart dijadwalkan ulang.
+    registry.ingestion_jobs = IngestionJobManager(registry)
+    registry.opening_questions = OpeningQuestionBank(registry)
+    try:
+        await registry.ingestion_jobs.resume_pending()
+    except Exception as e:
+        print(f"Startup: Gagal menjadwalkan ulang ingestion CV: {e}")
+    app.state.registry = registry
+    yield
+    await registry.aclose()
+    registry.shutdown()
+    await async_engine.dispose()
 
 # 1. Inisialisasi Aplikasi FastAPI
 # Logic: Titik masuk utama aplikasi. Semua konfigurasi dimuat dari settings.
 app = FastAPI(
     title="AI Mock Interview System API",
     version="1.0.0",
-    description="Backend API untuk sistem latihan wawancara berbasis LLM"
+    description="Backend API untuk sistem latihan wawancara berbasis LLM",
+    lifespan=lifespan
 )
 
+# Middleware: jumlah statement SQL per request (header X-DB-Statements + metrik)
+# Logic: Untuk respons streaming, hanya statement sebelum header dikirim yang terhitung.
+@app.middleware("http")
+async def db_statement_counter(request: Request, call_next):
+    with count_statements() as counter:
+        response = await call_next(request)
+    response.headers["X-DB-Statements"] = str(counter[0])
+    metrics.observe("db_statements_per_request", counter[0])
+    return response
+
 # 2. Endpoints Dasar (Testing)
 @app.get("/")
 def read_root():
@@ -23,9 +77,24 @@ def show_config():
     # Logic: Menampilkan konfigurasi yang dimuat dari .env (Hanya untuk debugging)
     return {"db_name": settings.DB_NAME, "db_host": settings.DB_HOST}
 
+@app.get("/health")
+def health_check(registry: ResourceRegistry = Depends(get_registry)):
+    # Logic: Readiness probe. 503 selama ada komponen (model, vector DB, LLM) yang belum siap.
+    report = registry.health()
+    report["db_pool"] = pool_status()
+    status_code = 200 if report["ready"] else 503
+    return JSONResponse(status_code=status_code, content=report)
+
+@app.get("/metrics")
+def show_metrics():
+    # Logic: Snapshot metrik in-process (batch embedding, cache, LLM, dll.) untuk observabilitas.
+    return metrics.snapshot()
+
 
 # 3. Menambahkan Semua Router (Penerapan SRP/DIP)
 # Logic: Delegasikan penanganan endpoint ke masing-masing router yang bertanggung jawab.
 app.include_router(user_router, prefix="/api/v1/user", tags=["Users"]) 
 app.include_router(pipeline_router, prefix="/api/v1/pipeline", tags=["Pipeline"])
 app.include_router(interview_router, prefix="/api/v1/interview", tags=["Interview"])
+app.include_router(analytics_router, prefix="/api/v1/analytics", tags=["Analytics"])
+app.include_router(admin_router, prefix="/api/v1/admin", tags=["Admin"])
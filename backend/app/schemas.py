@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from decimal import Decimal # Digunakan untuk tipe data Numeric dari skor
 
 # ===============================================
@@ -51,6 +51,11 @@ class JobRoleOut(BaseModel):
     class Config:
         from_attributes = True
 
+class JobRoleCreate(BaseModel):
+    # Digunakan oleh jalur admin untuk menambah/mengubah Job Role (Input)
+    nama_role: str
+    deskripsi: Optional[str] = None
+
 class CvDataOut(BaseModel):
     # Digunakan untuk menampilkan riwayat CV yang pernah diupload di Profile (Output)
     cv_id: int
@@ -58,10 +63,29 @@ class CvDataOut(BaseModel):
     file_name: str
     parsed_kompetensi: Optional[str] = None
     tgl_upload: datetime
+    status_proses: Optional[str] = None # 'pending', 'processing', 'indexed', 'failed'
     
     class Config:
         from_attributes = True
 
+class CvUploadAccepted(BaseModel):
+    # Respons upload CV (202): CV disimpan, pemrosesan berjalan di background (Output)
+    cv_id: int
+    job_id: Optional[str] = None # None jika CV identik sudah pernah diproses
+    status_proses: str
+
+class IngestionJobOut(BaseModel):
+    # Status job ingestion CV untuk polling dari Frontend (Output)
+    job_id: str
+    cv_id: int
+    mahasiswa_id: int
+    status: str # 'queued', 'running', 'done', 'failed'
+    stage: Optional[str] = None # 'extract', 'chunk', 'embed', 'index', 'competency'
+    progress: float # 0.0 hingga 1.0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
 # ===============================================
 # 3. SKEMA SIMULASI WAWANCARA (Modul 2)
 # ===============================================
@@ -87,7 +111,13 @@ class AnswerInput(BaseModel):
     # Jawaban Mahasiswa yang dikirim ke backend (Input)
     qa_id: int # Mengacu pada pertanyaan yang dijawab
     jawaban_mentah: str # Teks dari STT atau input langsung
-    waktu_respon: Optional[int] = None # Waktu dalam detik
+    waktu_respon: Optional[int] = Field(None, ge=0) # Waktu dalam detik
+
+class LiveAnswerInput(BaseModel):
+    # Pesan 'answer' pada sesi live WebSocket (qa_id diambil dari state sesi)
+    jawaban_mentah: str
+    waktu_respon: Optional[int] = Field(None, ge=0) # Waktu dalam detik
+    is_final: bool = False
 
 # ===============================================
 # 4. SKEMA EVALUASI DAN FEEDBACK (Modul 3)
@@ -124,6 +154,36 @@ class FeedbackOut(BaseModel):
     class Config:
         from_attributes = True
 
+# --- Skema Status Evaluasi (mode evaluasi tertunda) ---
+class EvaluationStatusOut(BaseModel):
+    qa_id: int
+    status: str # 'pending', 'done', 'failed', 'not_answered'
+    metrics: Optional[EvaluationMetricsOut] = None
+    feedback: Optional[FeedbackOut] = None
+    error: Optional[str] = None
+
+# --- Skema Output Terstruktur Evaluator LLM (response_schema Gemini) ---
+class EvaluationLLMOutput(BaseModel):
+    # Skor 0-100 untuk rubrik yang butuh penilaian LLM.
+    # skor_confidence & skor_conciseness dihitung lokal (lihat services/answer_analysis.py).
+    skor_situation: float
+    skor_task: float
+    skor_action: float
+    skor_result: float
+    skor_relevance: float
+    skor_clarity: float
+
+    feedback_narasi: str
+    saran_utama: str
+
+    @field_validator(
+        "skor_situation", "skor_task", "skor_action", "skor_result", "skor_relevance", "skor_clarity"
+    )
+    @classmethod
+    def clamp_score(cls, value: float) -> float:
+        # Logic: Skor di luar rentang dipotong (bukan ditolak), agar tidak memicu retry yang mahal.
+        return min(max(value, 0.0), 100.0)
+
 # -------------------------------------------------
 # SKEMA GABUNGAN (Output dari Sesi Wawancara)
 # -------------------------------------------------
@@ -159,3 +219,37 @@ class InterviewSessionOut(BaseModel):
     
     class Config:
         from_attributes = True
+
+# --- Skor Live Sesi (dibaca dari agregat berjalan INTERVIEW_SESSIONS) ---
+class SessionScoreOut(BaseModel):
+    session_id: int
+    jumlah_terjawab: int
+    skor_total_rata_rata: Optional[Decimal] = None
+    rata_rata_rubrik: Dict[str, Optional[Decimal]] = {} # skor_situation -> rata-rata (None = belum pernah dinilai), dst.
+    selesai: bool
+
+# ===============================================
+# 5. SKEMA ANALITIK PROGRES MAHASISWA
+# ===============================================
+class StudentRoleStatsOut(BaseModel):
+    role_id: int
+    nama_role: str
+    jumlah_sesi: int
+    jumlah_terjawab: int
+    skor_rata_rata: Optional[Decimal] = None
+    rata_rata_rubrik: Dict[str, Optional[Decimal]] = {}
+    persentil_kohort: Optional[Decimal] = None # Posisi mahasiswa di antara semua mahasiswa pada role yang sama
+    tgl_terakhir: Optional[datetime] = None
+
+class SessionTrendPointOut(BaseModel):
+    session_id: int
+    role_id: int
+    tgl_mulai: Optional[datetime] = None
+    jumlah_terjawab: int
+    skor_total_rata_rata: Optional[Decimal] = None
+    rata_rata_rubrik: Dict[str, Optional[Decimal]] = {}
+
+class RolePercentilesOut(BaseModel):
+    role_id: int
+    jumlah_mahasiswa: int
+    persentil: Dict[str, Optional[int]] # p25, p50, p75, p90 (bucket skor 0-100)
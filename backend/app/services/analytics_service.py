@@ -0,0 +1,93 @@
+# File: backend/app/services/analytics_service.py
+
+from sqlalchemy.orm import Session
+from app.db.models import StudentRoleStats, RoleScoreHistogram, InterviewSession, JobRole, EVALUATION_RUBRICS
+from app.db.analytics_rollups import percentile_of, score_at_percentiles
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+# Titik persentil kohort yang dilaporkan per role
+COHORT_PERCENTILES = [25, 50, 75, 90]
+
+
+def rubric_averages(totals_source) -> Dict[str, Optional[Decimal]]:
+    """
+    Rata-rata per rubrik dari kolom total_<rubrik> / jumlah_<rubrik> (baris sesi atau stats).
+    Logic: Pembagi = jumlah jawaban yang dinilai pada rubrik itu; rubrik tanpa jawaban dinilai -> None.
+    """
+    averages = {}
+    for rubric in EVALUATION_RUBRICS:
+        count = getattr(totals_source, f"jumlah_{rubric}") or 0
+        total = getattr(totals_source, f"total_{rubric}") or 0
+        averages[rubric] = Decimal(f"{Decimal(total) / count:.2f}") if count else None
+    return averages
+
+
+class AnalyticsService:
+    """
+    Modul analitik progres mahasiswa.
+    Tanggung jawab tunggal: MEMBACA tabel rollup (student_role_stats, role_score_histogram) dan agregat
+    berjalan interview_sessions. Tidak ada query yang memindai per_questions/evaluation_metrics,
+    sehingga latensi tidak bergantung pada panjang riwayat.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _histograms(self, role_ids: List[int]) -> Dict[int, Dict[int, int]]:
+        histograms: Dict[int, Dict[int, int]] = {role_id: {} for role_id in role_ids}
+        if not role_ids:
+            return histograms
+        rows = self.db.query(RoleScoreHistogram.role_id, RoleScoreHistogram.bucket, RoleScoreHistogram.jumlah_mahasiswa).filter(
+            RoleScoreHistogram.role_id.in_(role_ids), RoleScoreHistogram.jumlah_mahasiswa > 0
+        ).all()
+        for role_id, bucket, count in rows:
+            histograms[role_id][bucket] = count
+        return histograms
+
+    def get_student_role_summary(self, mahasiswa_id: int) -> List[Dict[str, Any]]:
+        """Rata-rata per role milik satu mahasiswa, lengkap dengan persentil di kohort role tersebut."""
+        rows = self.db.query(StudentRoleStats, JobRole.nama_role).join(
+            JobRole, JobRole.role_id == StudentRoleStats.role_id
+        ).filter(StudentRoleStats.mahasiswa_id == mahasiswa_id).all()
+        histograms = self._histograms([stats.role_id for stats, _ in rows])
+
+        return [{
+            "role_id": stats.role_id,
+            "nama_role": nama_role,
+            "jumlah_sesi": stats.jumlah_sesi,
+            "jumlah_terjawab": stats.jumlah_terjawab,
+            "skor_rata_rata": stats.skor_rata_rata,
+            "rata_rata_rubrik": rubric_averages(stats),
+            "persentil_kohort": percentile_of(histograms[stats.role_id], stats.skor_rata_rata),
+            "tgl_terakhir": stats.tgl_terakhir,
+        } for stats, nama_role in rows]
+
+    def get_student_trends(self, mahasiswa_id: int, role_id: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Tren per rubrik dari sesi ke sesi (sesi terbaru, maksimal `limit`, diurutkan lama -> baru).
+        Logic: Setiap sesi sudah menyimpan total per rubrik (agregat berjalan), jadi satu baris = satu titik tren.
+        """
+        query = self.db.query(InterviewSession).filter(
+            InterviewSession.mahasiswa_id == mahasiswa_id, InterviewSession.jumlah_terjawab > 0
+        )
+        if role_id is not None:
+            query = query.filter(InterviewSession.role_id == role_id)
+        sessions = query.order_by(InterviewSession.tgl_mulai.desc()).limit(limit).all()
+
+        return [{
+            "session_id": s.session_id,
+            "role_id": s.role_id,
+            "tgl_mulai": s.tgl_mulai,
+            "jumlah_terjawab": s.jumlah_terjawab,
+            "skor_total_rata_rata": s.skor_total_rata_rata,
+            "rata_rata_rubrik": rubric_averages(s),
+        } for s in reversed(sessions)]
+
+    def get_role_percentiles(self, role_id: int) -> Dict[str, Any]:
+        """Sebaran skor rata-rata mahasiswa di satu role (persentil 25/50/75/90)."""
+        histogram = self._histograms([role_id])[role_id]
+        return {
+            "role_id": role_id,
+            "jumlah_mahasiswa": sum(histogram.values()),
+            "persentil": {f"p{point}": bucket for point, bucket in score_at_percentiles(histogram, COHORT_PERCENTILES).items()},
+        }
@@ -0,0 +1,232 @@
+# File: backend/app/services/answer_analysis.py
+
+import re
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+from app.core.metrics import metrics
+
+# Tokenizer tunggal untuk jawaban DAN leksikon (kontraksi bahasa Inggris tetap satu token: "i'm", "don't")
+_TOKEN = re.compile(r"\w+(?:'\w+)?")
+
+# Kategori hasil pencocokan automaton (indeks = id kategori untuk np.bincount)
+CATEGORIES = (
+    "filler_id", "filler_en", "hedge",
+    "star_situation", "star_task", "star_action", "star_result",
+)
+_CATEGORY_ID = {name: index for index, name in enumerate(CATEGORIES)}
+STAR_CATEGORIES = ("star_situation", "star_task", "star_action", "star_result")
+
+# ----------------------------------------------------------------------
+# LEKSIKON (frasa ditokenisasi dengan _TOKEN saat automaton dikompilasi)
+# ----------------------------------------------------------------------
+_LEXICONS: Dict[str, Iterable[str]] = {
+    "filler_id": [
+        "eh", "ehm", "em", "emm", "hmm", "hm", "anu", "apa ya", "apa namanya", "gimana ya", "bagaimana ya",
+        "gitu", "gitu deh", "gitu loh", "kayak", "kayak gitu", "sih", "deh", "dong", "nah", "jadi gini", "pokoknya",
+    ],
+    "filler_en": [
+        # "like" sengaja tidak ada di sini ("I would like to", "tools like Docker"); lihat _FILLER_LIKE.
+        "uh", "uhm", "um", "umm", "er", "erm", "you know", "i mean", "basically", "actually",
+        "literally", "so yeah", "you see",
+    ],
+    "hedge": [
+        "mungkin", "sepertinya", "kayaknya", "kelihatannya", "barangkali", "saya rasa", "saya kira", "agak",
+        "kurang tahu", "kurang yakin", "tidak yakin", "nggak yakin", "semoga", "mudah-mudahan", "kurang lebih",
+        "i think", "i guess", "i suppose", "maybe", "perhaps", "probably", "not sure", "i'm not sure",
+        "sort of", "kind of", "i hope",
+    ],
+    "star_situation": [
+        "situasi", "kondisi", "latar belakang", "saat itu", "waktu itu", "pada saat", "ketika", "konteks",
+        "situation", "context", "background", "at the time", "when i was",
+    ],
+    "star_task": [
+        "tugas", "tugas saya", "tanggung jawab", "bertanggung jawab", "target", "tujuan", "peran saya", "bertugas",
+        "task", "goal", "objective", "responsible", "responsibility", "my role",
+    ],
+    "star_action": [
+        "saya melakukan", "saya membuat", "saya mengembangkan", "saya memutuskan", "saya menganalisis",
+        "saya merancang", "saya mengimplementasikan", "saya memimpin", "langkah", "tindakan", "pendekatan",
+        "i implemented", "i built", "i developed", "i decided", "i analyzed", "i designed", "i led",
+        "action", "steps", "approach",
+    ],
+    "star_result": [
+        "hasil", "hasilnya", "berhasil", "meningkat", "meningkatkan", "menurun", "menurunkan", "persen",
+        "dampak", "sehingga", "result", "results", "increased", "reduced", "improved", "achieved",
+        "impact", "outcome", "percent",
+    ],
+}
+
+# Kata fungsi (ID + EN) untuk kepadatan leksikal; kata lain dianggap kata isi
+_STOPWORDS = np.array(sorted({
+    "yang", "dan", "di", "ke", "dari", "ini", "itu", "untuk", "dengan", "pada", "adalah", "saya", "aku", "kami",
+    "kita", "akan", "juga", "tidak", "ada", "atau", "karena", "sebagai", "dalam", "oleh", "sudah", "bisa", "lebih",
+    "telah", "ya", "jadi", "maka", "agar", "tapi", "tetapi", "namun", "lalu", "kemudian", "seperti", "para", "pun",
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "at", "is", "are", "was", "were", "be", "been", "i",
+    "we", "it", "that", "this", "for", "with", "as", "my", "our", "have", "has", "had", "do", "did", "so", "but",
+    "not", "then", "there", "they", "he", "she", "you", "me", "by", "from", "which", "what",
+}))
+
+# Batas wajar (dipakai fungsi skor di bawah)
+IDEAL_WORDS = (40, 220) # Jawaban STAR lisan sekitar 1-2 menit
+IDEAL_WORDS_PER_SECOND = (1.5, 3.0) # Laju bicara natural
+MIN_LEXICAL_DENSITY = 0.45
+
+
+class _PhraseAutomaton:
+    """
+    Automaton frasa tingkat token (trie), dikompilasi SEKALI saat import.
+    Logic: Satu kali pindai token dengan pencocokan terpanjang (mis. "kayak gitu" menang atas "kayak"),
+    sehingga semua leksikon dicocokkan bersamaan tanpa regex per kata.
+    """
+    _END = "" # Token tidak pernah kosong, jadi aman sebagai penanda akhir frasa
+
+    def __init__(self, lexicons: Dict[str, Iterable[str]]):
+        self._root: Dict[str, dict] = {}
+        for category, phrases in lexicons.items():
+            for phrase in phrases:
+                node = self._root
+                for token in _TOKEN.findall(phrase.lower()):
+                    node = node.setdefault(token, {})
+                node[self._END] = _CATEGORY_ID[category]
+
+    def scan(self, tokens: List[str]) -> np.ndarray:
+        """Id kategori untuk setiap frasa yang cocok (tanpa tumpang tindih)."""
+        hits = []
+        i, n = 0, len(tokens)
+        while i < n:
+            node = self._root.get(tokens[i])
+            j, match = i, None
+            while node is not None:
+                if self._END in node:
+                    match = (node[self._END], j)
+                j += 1
+                if j >= n:
+                    break
+                node = node.get(tokens[j])
+            if match is None:
+                i += 1
+            else:
+                hits.append(match[0])
+                i = match[1] + 1
+        return np.fromiter(hits, dtype=np.int64, count=len(hits))
+
+
+_AUTOMATON = _PhraseAutomaton(_LEXICONS)
+
+# "like" hanya dihitung filler jika diapit koma/awal kalimat ("it was, like, fine"; "Like, ...")
+# atau diikuti filler satu kata ("like um"). Satu regex -> setiap "like" dihitung paling banyak sekali.
+_SINGLE_WORD_FILLERS = sorted(
+    phrase for category in ("filler_id", "filler_en") for phrase in _LEXICONS[category] if _TOKEN.fullmatch(phrase)
+)
+_FILLER_LIKE = re.compile(
+    r"(?:^|[,;.!?])\s*like\s*(?=,)|\blike(?=[\s,]+(?:" + "|".join(_SINGLE_WORD_FILLERS) + r")\b)",
+    re.IGNORECASE
+)
+
+
+class AnswerAnalysis(NamedTuple):
+    """Fitur lokal satu jawaban beserta skor confidence dan conciseness (0-100)."""
+    word_count: int
+    filler_id: int
+    filler_en: int
+    hedges: int
+    words_per_second: Optional[float] # None jika waktu_respon tidak dikirim (atau bukan > 0)
+    lexical_density: float
+    star_coverage: Dict[str, bool]
+    skor_confidence: float
+    skor_conciseness: float
+
+    @property
+    def filler_rate(self) -> float:
+        return (self.filler_id + self.filler_en) / self.word_count if self.word_count else 0.0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedges / self.word_count if self.word_count else 0.0
+
+    def prompt_summary(self) -> str:
+        """Ringkasan untuk prompt evaluator (hanya fitur dari teks, agar cache respons LLM tetap efektif)."""
+        covered = [name.split("_")[1][0].upper() for name, present in self.star_coverage.items() if present]
+        return (
+            f"{self.word_count} kata, filler {self.filler_id + self.filler_en} ({self.filler_rate:.0%}), "
+            f"frasa ragu {self.hedges}, kata kunci STAR: {', '.join(covered) or '-'}"
+        )
+
+
+def _clamp(value: float) -> float:
+    return round(min(max(float(value), 0.0), 100.0), 2)
+
+
+def _conciseness_score(word_count: int, filler_rate: float, lexical_density: float) -> float:
+    if word_count == 0:
+        return 0.0
+    low, high = IDEAL_WORDS
+    # Logic: Filler paling berat (setiap 1% filler = -4), lalu panjang di luar rentang wajar, lalu kepadatan rendah.
+    penalty = min(filler_rate * 400, 50)
+    if word_count > high:
+        penalty += min((word_count - high) / high * 40, 30)
+    elif word_count < low:
+        penalty += (low - word_count) / low * 40
+    if lexical_density < MIN_LEXICAL_DENSITY:
+        penalty += min((MIN_LEXICAL_DENSITY - lexical_density) * 100, 20)
+    return _clamp(100 - penalty)
+
+
+def _confidence_score(word_count: int, hedge_rate: float, filler_rate: float, words_per_second: Optional[float]) -> float:
+    if word_count == 0:
+        return 0.0
+    penalty = min(hedge_rate * 500, 40) + min(filler_rate * 200, 25)
+    if words_per_second is not None:
+        low, high = IDEAL_WORDS_PER_SECOND
+        # Logic: Bicara terlalu lambat (ragu) atau terlalu cepat (gugup) sama-sama mengurangi kesan percaya diri.
+        if words_per_second < low:
+            penalty += min((low - words_per_second) / low * 40, 20)
+        elif words_per_second > high:
+            penalty += min((words_per_second - high) / high * 40, 20)
+    return _clamp(100 - penalty)
+
+
+def analyze_answer(answer_clean: str, waktu_respon: Optional[int] = None) -> AnswerAnalysis:
+    """
+    Tahap analisis jawaban lokal (tanpa LLM, beberapa milidetik).
+    Menghitung rasio filler (ID/EN), frasa ragu, kata per detik dari waktu_respon, kepadatan leksikal,
+    dan cakupan kata kunci STAR, lalu skor confidence dan conciseness untuk EVALUATION_METRICS.
+    """
+    started_at = time.perf_counter()
+
+    # 1. Tokenisasi + pencocokan semua leksikon dalam satu pindaian automaton
+    tokens = _TOKEN.findall(answer_clean.lower())
+    word_count = len(tokens)
+    counts = np.bincount(_AUTOMATON.scan(tokens), minlength=len(CATEGORIES))
+    counts[_CATEGORY_ID["filler_en"]] += len(_FILLER_LIKE.findall(answer_clean))
+
+    # 2. Kepadatan leksikal (vektor): kata isi = bukan kata fungsi dan bukan filler
+    fillers = int(counts[_CATEGORY_ID["filler_id"]] + counts[_CATEGORY_ID["filler_en"]])
+    if word_count:
+        function_words = int(np.isin(np.array(tokens), _STOPWORDS).sum())
+        lexical_density = max(word_count - function_words - fillers, 0) / word_count
+    else:
+        lexical_density = 0.0
+
+    # 3. Laju bicara
+    # Logic: waktu_respon 0/negatif (jam klien salah) tidak bermakna -> laju bicara tidak dinilai.
+    words_per_second = round(word_count / waktu_respon, 2) if waktu_respon is not None and waktu_respon > 0 else None
+
+    # 4. Skor
+    filler_rate = fillers / word_count if word_count else 0.0
+    hedges = int(counts[_CATEGORY_ID["hedge"]])
+    hedge_rate = hedges / word_count if word_count else 0.0
+    analysis = AnswerAnalysis(
+        word_count=word_count,
+        filler_id=int(counts[_CATEGORY_ID["filler_id"]]),
+        filler_en=int(counts[_CATEGORY_ID["filler_en"]]),
+        hedges=hedges,
+        words_per_second=words_per_second,
+        lexical_density=round(lexical_density, 3),
+        star_coverage={name: bool(counts[_CATEGORY_ID[name]]) for name in STAR_CATEGORIES},
+        skor_confidence=_confidence_score(word_count, hedge_rate, filler_rate, words_per_second),
+        skor_conciseness=_conciseness_score(word_count, filler_rate, lexical_density),
+    )
+    metrics.observe("answer_analysis_ms", (time.perf_counter() - started_at) * 1000)
+    return analysis
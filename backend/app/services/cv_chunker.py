@@ -0,0 +1,101 @@
+# File: backend/app/services/cv_chunker.py
+
+import re
+from typing import Iterable, List, NamedTuple, Optional
+from app.services.pdf_extractor import PdfBlock
+
+# Judul bagian CV yang dikenali (Inggris & Indonesia) -> nama bagian kanonik untuk metadata chunk
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "professional summary", "about me", "ringkasan", "profil", "tentang saya"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "internship", "internships", "pengalaman", "pengalaman kerja", "pengalaman magang", "riwayat pekerjaan"],
+    "education": ["education", "academic background", "pendidikan", "riwayat pendidikan"],
+    "skills": ["skills", "technical skills", "hard skills", "soft skills", "keahlian", "keterampilan", "kemampuan"],
+    "projects": ["projects", "personal projects", "project", "proyek", "projek", "portofolio", "portfolio"],
+    "organization": ["organization", "organizations", "organizational experience", "leadership",
+                     "volunteer", "organisasi", "pengalaman organisasi", "kepanitiaan"],
+    "certifications": ["certifications", "certificates", "courses", "training", "sertifikasi", "sertifikat", "pelatihan"],
+    "achievements": ["achievements", "awards", "honors", "prestasi", "penghargaan"],
+    "languages": ["languages", "bahasa"],
+}
+
+# Logic: Satu regex terkompilasi untuk semua judul; cocok jika SELURUH baris adalah judul (opsional diakhiri ':').
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING_PATTERN = re.compile(
+    r"^\s*(" + "|".join(sorted((re.escape(a) for a in _HEADING_LOOKUP), key=len, reverse=True)) + r")\s*:?\s*$",
+    re.IGNORECASE
+)
+# Batas kalimat: akhir kalimat (. ! ?) diikuti spasi, atau pergantian baris (butir CV biasanya per baris)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Bagian sebelum judul pertama (nama, kontak) dianggap "header"
+DEFAULT_SECTION = "header"
+
+
+class CvChunk(NamedTuple):
+    """Satu chunk CV beserta bagian (section) dan halaman asalnya."""
+    text: str
+    section: str
+    page: int
+
+
+def detect_heading(line: str) -> Optional[str]:
+    """Mengembalikan nama bagian kanonik jika baris adalah judul bagian CV, selain itu None."""
+    if len(line) > 40:
+        return None
+    match = _HEADING_PATTERN.match(line)
+    return _HEADING_LOOKUP[match.group(1).lower()] if match else None
+
+
+def chunk_cv_blocks(blocks: Iterable[PdfBlock], max_words: int = 120) -> List[CvChunk]:
+    """
+    Memecah blok CV menjadi chunk yang mengikuti bagian CV dan batas kalimat.
+    Logic: Chunk tidak pernah melintasi dua bagian (misalnya Education dan Experience), dan tidak
+    memotong kalimat di tengah. Satu kali lintasan atas blok, sehingga waktu linear terhadap panjang teks.
+    """
+    chunks: List[CvChunk] = []
+    section = DEFAULT_SECTION
+    buffer: List[str] = []
+    buffer_words = 0
+    buffer_page = 0
+
+    def flush():
+        nonlocal buffer, buffer_words
+        if buffer:
+            chunks.append(CvChunk(" ".join(buffer), section, buffer_page))
+        buffer = []
+        buffer_words = 0
+
+    for block in blocks:
+        for line in block.text.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+
+            # 1. Judul bagian baru -> tutup chunk bagian sebelumnya
+            heading = detect_heading(line)
+            if heading:
+                flush()
+                section = heading
+                continue
+
+            # 2. Kumpulkan kalimat hingga batas kata tercapai
+            for sentence in _SENTENCE_SPLIT.split(line):
+                sentence = _WHITESPACE.sub(" ", sentence).strip()
+                if not sentence:
+                    continue
+                # Logic: "Kalimat" tanpa tanda baca yang lebih panjang dari max_words dipotong per jendela kata,
+                # karena model embedding memotong input yang terlalu panjang.
+                tokens = sentence.split(" ")
+                for start in range(0, len(tokens), max_words):
+                    piece = tokens[start:start + max_words]
+                    if buffer and buffer_words + len(piece) > max_words:
+                        flush()
+                    if not buffer:
+                        buffer_page = block.page
+                    buffer.append(" ".join(piece))
+                    buffer_words += len(piece)
+
+    flush()
+    return chunks
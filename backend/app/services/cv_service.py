@@ -4,60 +4,148 @@ from sqlalchemy.orm import Session
 from app.db.models import CvData, Mahasiswa 
 from datetime import datetime
 from typing import Optional
-import fitz # PyMuPDF
+import asyncio
+import hashlib
+import os
+from app.core.config import settings
+from app.core.registry import ResourceRegistry
 from app.services.rag_service import RAGService # <-- IMPORT BARU
-from typing import Optional, List
+from app.services.pdf_extractor import extract_text_from_pdf
+from app.services.llm_service import LLMService, LLMError
+from app.services.ingestion_jobs import IngestionJob, IngestionJobManager, CV_STATUS_PENDING, CV_STATUS_FAILED
+from app.core.metrics import metrics
+from app.db.pagination import defer_unused_large_columns, keyset_paginate, DEFAULT_PAGE_SIZE
+from app.schemas import CvDataOut
+from typing import Optional, List, Tuple
+
 
 class CvService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, registry: ResourceRegistry):
         self.db = db
+        self.registry = registry
         # 1. Inisialisasi RAGService di sini
         # Logic: CvService bertanggung jawab atas ORCHESTRATION antara DB dan Vektor.
-        self.rag_service = RAGService() 
+        # Model embedding dan koleksi Chroma diambil dari Registry (dimuat sekali per proses).
+        self.rag_service = RAGService(registry)
 
-    # --- Fungsi extract_text_from_pdf (TETAP SAMA SEPERTI SEBELUMNYA) ---
+    # --- Fungsi extract_text_from_pdf (dipindah ke services/pdf_extractor.py agar bisa jalan di ProcessPool) ---
     def extract_text_from_pdf(self, file_content: bytes) -> str:
         """Fungsi pembantu untuk mengekstrak teks dari file PDF."""
-        try:
-            doc = fitz.open(stream=file_content, filetype="pdf")
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            return text
-        except Exception as e:
-            print(f"Error extracting PDF: {e}")
-            return "Extraction Failed"
+        return extract_text_from_pdf(file_content)
             
-    def save_cv_data(self, mahasiswa_id: int, file_name: str, file_content: bytes):
-        """Menyimpan data CV ke PostgreSQL dan memulai proses vectorization (Langkah B)."""
-        
-        # 1. Ekstraksi teks mentah
-        raw_text = self.extract_text_from_pdf(file_content)
-        
-        # 2. Simpan ke PostgreSQL (CRUD)
+    @staticmethod
+    def hash_file(file_content: bytes) -> str:
+        """SHA-256 dari byte PDF (alamat konten untuk deduplikasi upload)."""
+        return hashlib.sha256(file_content).hexdigest()
+
+    def _find_cv_by_hash(self, content_hash: str, mahasiswa_id: Optional[int] = None) -> Optional[CvData]:
+        """Mencari CV yang isinya identik (opsional: milik mahasiswa tertentu)."""
+        query = self.db.query(CvData).filter(CvData.content_hash == content_hash)
+        if mahasiswa_id is not None:
+            query = query.filter(CvData.mahasiswa_id == mahasiswa_id)
+        return query.order_by(CvData.cv_id.desc()).first()
+
+    def _check_duplicates(self, content_hash: str, mahasiswa_id: int) -> Tuple[Optional[CvData], Optional[str]]:
+        """
+        Deduplikasi berbasis konten.
+        Mengembalikan (CV milik mahasiswa ini yang identik, teks hasil ekstraksi yang bisa dipakai ulang).
+        """
+        # Logic: Upload ulang PDF yang sama oleh mahasiswa yang sama tidak perlu diekstrak, disimpan,
+        # maupun di-embed ulang; cukup kembalikan CV yang sudah ada.
+        # CV identik yang gagal diproses tidak dipakai ulang, agar upload ulang bisa mencoba lagi.
+        existing_cv = self._find_cv_by_hash(content_hash, mahasiswa_id)
+        if existing_cv and existing_cv.status_proses != CV_STATUS_FAILED:
+            metrics.inc("cv_upload_dedup_hits")
+            return existing_cv, None
+
+        # Logic: Jika PDF identik sudah pernah diekstrak (oleh mahasiswa lain), pakai ulang hasilnya.
+        same_content_cv = self._find_cv_by_hash(content_hash)
+        if same_content_cv and same_content_cv.raw_text and same_content_cv.raw_text != "Extraction Failed":
+            return None, same_content_cv.raw_text
+        return None, None
+
+    def _create_pending_cv(self, mahasiswa_id: int, file_name: str, content_hash: str, file_content: bytes) -> CvData:
+        """Menyimpan baris CV berstatus 'pending' dan file PDF-nya; pemrosesan dilakukan oleh job ingestion."""
+        # 1. Simpan ke PostgreSQL (CRUD)
         # Logic: Simpan data terstruktur di SQL DB dulu, ini akan memberikan cv_id yang dibutuhkan.
         db_cv = CvData(
             mahasiswa_id=mahasiswa_id,
             file_name=file_name,
-            raw_text=raw_text,
+            raw_text="", # Diisi oleh tahap extract
             parsed_kompetensi="Belum diproses LLM/Vectorized", # Placeholder awal
-            tgl_upload=datetime.now()
+            tgl_upload=datetime.now(),
+            content_hash=content_hash,
+            status_proses=CV_STATUS_PENDING
         )
         self.db.add(db_cv)
         self.db.commit()
         self.db.refresh(db_cv)
-        
-        # 3. Panggil RAGService untuk Vectorization (Langkah B)
-        # Logic: Ini adalah titik di mana data CV diubah menjadi makna (vektor) dan disimpan di ChromaDB.
-        self.rag_service.add_cv_to_vector_db(
-            mahasiswa_id=db_cv.mahasiswa_id, 
-            cv_id=db_cv.cv_id, 
+
+        # 2. Simpan byte PDF ke disk
+        # Logic: File menjadi sumber job ingestion, dan memungkinkan job dijadwalkan ulang setelah restart.
+        os.makedirs(settings.CV_UPLOAD_DIR, exist_ok=True)
+        with open(IngestionJobManager.upload_path(db_cv.cv_id), "wb") as f:
+            f.write(file_content)
+        return db_cv
+
+    async def accept_cv_upload(self, mahasiswa_id: int, file_name: str, file_content: bytes) -> Tuple[CvData, Optional[IngestionJob]]:
+        """
+        Menerima upload CV dan menjadwalkan ingestion di background (Langkah B).
+        Logic: Request hanya membayar hash + satu INSERT + tulis file; ekstraksi, chunking, embedding,
+        indexing, dan ekstraksi kompetensi dijalankan oleh IngestionJobManager.
+        """
+        loop = asyncio.get_running_loop()
+        thread_pool = self.registry.ingest_thread_pool
+        job_manager = self.registry.ingestion_jobs
+
+        # 1. Hash + Deduplikasi (hash 5MB dan query DB tidak dijalankan di event loop)
+        content_hash = await loop.run_in_executor(thread_pool, self.hash_file, file_content)
+        existing_cv, raw_text = await loop.run_in_executor(
+            thread_pool, self._check_duplicates, content_hash, mahasiswa_id
+        )
+        if existing_cv:
+            return existing_cv, job_manager.get_for_cv(existing_cv.cv_id)
+
+        # 2. Admission Control: tolak (503) sebelum menulis apa pun jika antrean penuh
+        job_manager.ensure_capacity()
+
+        # 3. Simpan CV 'pending' + file, lalu jadwalkan job
+        db_cv = await loop.run_in_executor(
+            thread_pool, self._create_pending_cv, mahasiswa_id, file_name, content_hash, file_content
+        )
+        job = job_manager.submit(
+            cv_id=db_cv.cv_id,
+            mahasiswa_id=mahasiswa_id,
+            file_path=IngestionJobManager.upload_path(db_cv.cv_id),
+            content_hash=content_hash,
             raw_text=raw_text
         )
+        return db_cv, job
 
-        return db_cv
+    @staticmethod
+    async def extract_competencies(registry: ResourceRegistry, raw_text: str) -> Optional[str]:
+        """Tahap COMPETENCY: meminta LLM meringkas kompetensi utama dari teks CV."""
+        system_prompt = (
+            "Anda adalah asisten rekrutmen. Ekstrak kompetensi utama kandidat dari teks CV. "
+            "Tulis sebagai daftar singkat (maksimal 10 butir) yang mencakup hard skill, soft skill, "
+            "dan pengalaman paling relevan. Jangan menambahkan informasi yang tidak ada di CV."
+        )
+        user_prompt = f"Teks CV:\n---\n{raw_text[:settings.CV_COMPETENCY_MAX_CHARS]}\n---"
+        try:
+            result = await LLMService(registry).generate_content(system_prompt, user_prompt, temperature=0.2)
+        except LLMError as e:
+            print(f"CvService: Ekstraksi kompetensi gagal ({e.code}): {e.message}")
+            return None
+        return result.strip()
 
-    # --- Fungsi get_cv_history (TETAP SAMA) ---
-    def get_cv_history(self, mahasiswa_id: int) -> List[CvData]:
-        """Mengambil riwayat upload CV mahasiswa tertentu."""
-        return self.db.query(CvData).filter(CvData.mahasiswa_id == mahasiswa_id).all()
+    # --- Fungsi get_cv_history ---
+    def get_cv_history(self, mahasiswa_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[List[CvData], Optional[str]]:
+        """
+        Mengambil riwayat upload CV mahasiswa tertentu (terbaru dulu), per halaman.
+        Logic: raw_text (isi CV penuh) tidak dibaca karena tidak dikembalikan CvDataOut; halaman berikutnya
+        memakai keyset (tgl_upload, cv_id) yang didukung indeks (mahasiswa_id, tgl_upload, cv_id).
+        """
+        query = self.db.query(CvData).options(
+            *defer_unused_large_columns(CvData, CvDataOut)
+        ).filter(CvData.mahasiswa_id == mahasiswa_id)
+        return keyset_paginate(query, [CvData.tgl_upload, CvData.cv_id], cursor, limit, cursor_types=[datetime, int])
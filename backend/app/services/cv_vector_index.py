@@ -0,0 +1,75 @@
+# File: backend/app/services/cv_vector_index.py
+
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from app.core.metrics import metrics
+
+# Kunci indeks: (mahasiswa_id, cv_id)
+IndexKey = Tuple[int, int]
+# Isi indeks: (matriks embedding ternormalisasi [n_chunk x dim], daftar dokumen chunk)
+IndexEntry = Tuple[np.ndarray, List[str]]
+
+
+class CvVectorIndex:
+    """
+    Indeks vektor EXACT in-memory per CV.
+    Tanggung jawab tunggal: menyimpan matriks embedding float32 (L2-normalized) setiap CV dan
+    mencari chunk terdekat dengan satu perkalian matriks-vektor.
+
+    Logic: Satu CV hanya berisi puluhan chunk, sehingga brute-force dot product jauh lebih cepat
+    daripada round trip ke ChromaDB dengan filter metadata. Jumlah CV di memori dibatasi (LRU).
+    """
+    def __init__(self, max_cvs: int = 256):
+        self.max_cvs = max_cvs
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[IndexKey, IndexEntry]" = OrderedDict()
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def get_or_load(self, key: IndexKey, loader: Callable[[], Tuple[List[List[float]], List[str]]]) -> Optional[IndexEntry]:
+        """Mengambil matriks CV dari cache; jika belum ada, memuatnya sekali lewat loader (dari ChromaDB)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                metrics.inc("cv_vector_index_hits")
+                return entry
+
+        metrics.inc("cv_vector_index_misses")
+        embeddings, documents = loader()
+        if not documents:
+            return None
+        matrix = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        entry = (matrix, documents)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_cvs:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, key: IndexKey):
+        """Membuang matriks CV (dipanggil saat chunk CV tersebut berubah)."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def search(self, entry: IndexEntry, query_vector: List[float], n_results: int) -> List[str]:
+        """Mengembalikan n_results dokumen dengan kemiripan kosinus tertinggi, urut menurun."""
+        matrix, documents = entry
+        query = self._normalize(np.asarray(query_vector, dtype=np.float32))
+        scores = matrix @ query
+
+        k = min(n_results, len(documents))
+        if k <= 0:
+            return []
+        # Logic: argpartition O(n) untuk top-k, lalu hanya k kandidat yang diurutkan.
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [documents[i] for i in top]
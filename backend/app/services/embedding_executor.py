@@ -0,0 +1,126 @@
+# File: backend/app/services/embedding_executor.py
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+from app.core.metrics import metrics
+
+
+class _EncodeRequest:
+    """Satu permintaan encode dari satu pemanggil, beserta future untuk hasilnya."""
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingExecutor:
+    """
+    Eksekutor embedding dengan micro-batching.
+    Tanggung jawab tunggal: menggabungkan permintaan encode dari banyak request yang berjalan
+    bersamaan menjadi SATU panggilan model.encode, lalu membagikan potongan hasilnya ke setiap pemanggil.
+    """
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0, num_workers: int = 1):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue[Optional[_EncodeRequest]]" = queue.Queue()
+        self._workers = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="embedding-worker")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="embedding-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    # ----------------------------------------------------------------------
+    # API PUBLIK
+    # ----------------------------------------------------------------------
+    def submit(self, texts: List[str]) -> Future:
+        """Memasukkan teks ke antrean batch dan mengembalikan future berisi List[List[float]]."""
+        request = _EncodeRequest(list(texts))
+        if not request.texts:
+            request.future.set_result([])
+            return request.future
+        self._queue.put(request)
+        metrics.set_gauge("embedding_queue_depth", self._queue.qsize())
+        return request.future
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """Versi blocking (untuk kode sinkron): menunggu hingga batch yang memuat teks ini selesai."""
+        return self.submit(texts).result()
+
+    async def encode_async(self, texts: List[str]) -> List[List[float]]:
+        """Versi asinkron: menunggu hasil tanpa memblokir event loop."""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def shutdown(self):
+        """Menghentikan dispatcher dan worker (dipanggil saat lifespan berakhir)."""
+        self._queue.put(None)
+        self._dispatcher.join(timeout=5)
+        self._workers.shutdown(wait=True)
+
+    # ----------------------------------------------------------------------
+    # LOOP INTERNAL
+    # ----------------------------------------------------------------------
+    def _dispatch_loop(self):
+        """
+        Mengumpulkan permintaan hingga batas ukuran ATAU batas waktu tercapai, lalu mengirimnya ke worker.
+        Logic: Permintaan pertama membuka "jendela" max_wait; permintaan yang datang di dalam jendela ikut digabung.
+        """
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            batch_size = len(first.texts)
+            deadline = time.perf_counter() + self.max_wait_seconds
+            stop = False
+
+            while batch_size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                batch_size += len(request.texts)
+
+            self._workers.submit(self._run_batch, batch, batch_size)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[_EncodeRequest], batch_size: int):
+        """Menjalankan satu model.encode untuk seluruh batch dan me-resolve future setiap pemanggil."""
+        started_at = time.perf_counter()
+        for request in batch:
+            metrics.observe("embedding_queue_wait_ms", (started_at - request.enqueued_at) * 1000)
+        metrics.observe("embedding_batch_fill_ratio", min(batch_size / self.max_batch_size, 1.0))
+        metrics.observe("embedding_batch_texts", batch_size)
+        metrics.observe("embedding_batch_requests", len(batch))
+
+        all_texts = [text for request in batch for text in request.texts]
+        try:
+            vectors = self.model.encode(all_texts).tolist()
+        except Exception as e:
+            metrics.inc("embedding_batch_errors")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        metrics.observe("embedding_encode_ms", (time.perf_counter() - started_at) * 1000)
+
+        # Logic: Setiap pemanggil menerima potongan (slice) sesuai urutan teksnya di batch.
+        offset = 0
+        for request in batch:
+            end = offset + len(request.texts)
+            request.future.set_result(vectors[offset:end])
+            offset = end
@@ -1,81 +1,143 @@
-from app.services.llm_service import LLMService
-from typing import Dict, Any, Tuple
+from pydantic import ValidationError
+from app.services.llm_service import LLMService, LLMError, extract_json_object
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.registry import ResourceRegistry
+from app.db.models import EVALUATION_RUBRICS
+from app.schemas import EvaluationLLMOutput
+from app.services.answer_analysis import analyze_answer
+from typing import Dict, Optional, Tuple
 from decimal import Decimal
-import json
+import time
 
 class EvaluationService:
     """
     Modul Tingkat Rendah untuk menilai jawaban menggunakan LLM dan Guardrails.
     Tanggung jawab: Menghasilkan skor numerik dan narasi feedback.
+    Confidence dan conciseness dinilai lokal oleh tahap analisis jawaban (answer_analysis.py);
+    LLM hanya menilai rubrik yang butuh penilaian (STAR, relevance, clarity).
+    Guardrail output: mode output terstruktur (skema EvaluationLLMOutput) -> ekstraksi JSON toleran
+    -> satu percobaan perbaikan murah selama anggaran latensi masih cukup.
     """
-    def __init__(self):
-        self.llm_service = LLMService()
+    def __init__(self, registry: ResourceRegistry):
+        self.llm_service = LLMService(registry)
 
     def _get_evaluation_system_prompt(self, job_role: str) -> str:
         """
         Menyusun System Instruction untuk LLM Evaluator.
-        Logic: Memaksa LLM untuk bertindak sebagai penilai objektif dan menggunakan JSON output.
+        Logic: Memaksa LLM untuk bertindak sebagai penilai objektif; format JSON ditegakkan oleh response_schema,
+        sehingga prompt tidak perlu memuat templat JSON.
         """
         return (
             f"Anda adalah sistem evaluator AI yang sangat objektif dan ketat dalam proses wawancara "
-            f"untuk peran '{job_role}'. Tugas Anda adalah menilai jawaban kandidat "
-            f"berdasarkan rubrik STAR dan Kualitas Komunikasi. "
-            f"Setelah penilaian, berikan saran perbaikan konkret. "
-            f"OUTPUT HARUS BERUPA JSON MURNI (tanpa teks penjelasan lain) dengan format:\n"
-            f"{{\n"
-            f'  "skor_situation": 0.00,\n'
-            f'  "skor_task": 0.00,\n'
-            f'  "skor_action": 0.00,\n'
-            f'  "skor_result": 0.00,\n'
-            f'  "skor_relevance": 0.00,\n'
-            f'  "skor_clarity": 0.00,\n'
-            f'  "skor_confidence": 0.00,\n'
-            f'  "feedback_narasi": "Saran perbaikan untuk jawaban ini.",\n'
-            f'  "saran_utama": "Poin perbaikan paling penting."\n'
-            f"}}"
+            f"untuk peran '{job_role}'. Nilai jawaban kandidat (skala 0-100) pada rubrik STAR "
+            f"(situation, task, action, result), relevance, dan clarity, lalu berikan feedback_narasi "
+            f"dan saran_utama yang konkret. Output: JSON murni sesuai skema."
         )
 
-    def evaluate_answer(self, job_role: str, question: str, answer_clean: str) -> Tuple[Dict[str, Decimal], str, str]:
+    @staticmethod
+    def _parse_output(raw_output: str) -> Optional[EvaluationLLMOutput]:
         """
-        Melakukan evaluasi LLM dan mengembalikan skor, feedback narasi, dan saran utama.
+        Memvalidasi output LLM terhadap skema evaluasi.
+        Logic: Jalur cepat = JSON murni (mode output terstruktur); fallback = ekstraksi toleran
+        (pagar markdown, teks pembuka, trailing comma, output terpotong).
         """
-        
+        try:
+            return EvaluationLLMOutput.model_validate_json(raw_output)
+        except ValidationError:
+            pass
+        data = extract_json_object(raw_output)
+        if data is None:
+            return None
+        try:
+            parsed = EvaluationLLMOutput.model_validate(data)
+        except ValidationError:
+            return None
+        metrics.inc("evaluation_salvaged_output")
+        return parsed
+
+    async def _repair_output(self, raw_output: str, remaining: float) -> Optional[EvaluationLLMOutput]:
+        """
+        Satu percobaan perbaikan: output rusak dikirim ulang (tanpa pertanyaan/jawaban) untuk diubah
+        menjadi JSON sesuai skema. Lebih murah dari evaluasi ulang: prompt pendek, temperature 0.
+        """
+        started_at = time.perf_counter()
+        truncated = raw_output[:settings.EVALUATION_REPAIR_MAX_CHARS]
+        metrics.inc("evaluation_repair_attempts")
+        metrics.observe("evaluation_repair_input_chars", len(truncated))
+        system_prompt = (
+            "Anda adalah pemformat JSON. Ubah teks hasil penilaian berikut menjadi SATU objek JSON valid "
+            "sesuai skema. Pertahankan nilai yang ada; skor yang tidak ditemukan diisi 0."
+        )
+        try:
+            repaired = await self.llm_service.generate_content(
+                system_prompt, truncated,
+                model=settings.EVALUATION_REPAIR_MODEL or None,
+                timeout=remaining,
+                temperature=0.0,
+                response_schema=EvaluationLLMOutput
+            )
+        except LLMError as e:
+            print(f"EvaluationService: Perbaikan JSON gagal: {e.code} - {e.message}")
+            return None
+        finally:
+            metrics.observe("evaluation_repair_ms", (time.perf_counter() - started_at) * 1000)
+        parsed = self._parse_output(repaired)
+        if parsed is not None:
+            metrics.inc("evaluation_repair_success")
+        return parsed
+
+    async def evaluate_answer(
+        self, job_role: str, question: str, answer_clean: str, waktu_respon: Optional[int] = None
+    ) -> Tuple[Dict[str, Decimal], str, str]:
+        """
+        Melakukan evaluasi (analisis lokal + LLM) dan mengembalikan skor, feedback narasi, dan saran utama.
+        """
+        started_at = time.perf_counter()
+        budget = settings.EVALUATION_LATENCY_BUDGET_SECONDS
+
+        # 1. Analisis lokal: skor confidence & conciseness tanpa LLM
+        analysis = analyze_answer(answer_clean, waktu_respon)
+
+        # 2. Prompt LLM: hanya rubrik yang butuh penilaian
         system_prompt = self._get_evaluation_system_prompt(job_role)
-        
+
+        # Logic: Ringkasan analisis hanya memuat fitur teks (tanpa waktu_respon), agar jawaban identik tetap cache hit.
         user_prompt = (
             f"Pertanyaan Pewawancara:\n---\n{question}\n---\n"
-            f"Jawaban Mahasiswa (Setelah Preprocessing):\n---\n{answer_clean}\n---\n"
-            f"Instruksi Penilaian:\n"
-            f"1. Nilai setiap aspek (S, T, A, R, Relevance, Clarity) dalam skala 0 hingga 100.\n"
-            f"2. Gunakan metode STAR jika pertanyaan berbasis perilaku (Behavioral).\n"
-            f"3. Jika jawaban terlalu pendek atau tidak relevan, skor relevansi harus rendah.\n"
-            f"4. Berikan Feedback Narasi dan Saran Utama (Key Takeaway)."
+            f"Jawaban Mahasiswa:\n---\n{answer_clean}\n---\n"
+            f"Analisis otomatis: {analysis.prompt_summary()}\n"
+            f"Instruksi: Gunakan STAR jika pertanyaan behavioral; jawaban pendek/tidak relevan -> relevance rendah. "
+            f"Sebutkan filler/frasa ragu di feedback jika banyak."
+        )
+
+        # Logic: Error LLM (API Key salah, timeout, dll.) dilempar sebagai LLMError terstruktur oleh LLM Gateway.
+        # Jawaban identik untuk pertanyaan + role yang sama dinilai dari cache respons LLM.
+        raw_output = await self.llm_service.generate_content(
+            system_prompt, user_prompt, timeout=budget,
+            cache_use_case="evaluation", response_schema=EvaluationLLMOutput
         )
+        metrics.inc("evaluation_outputs")
 
-        raw_json_output = self.llm_service.generate_content(system_prompt, user_prompt)
-        
-        # Penanganan error LLM (Jika API Key salah, dll.)
-        if not raw_json_output or raw_json_output.startswith("ERROR"):
-            raise Exception(f"LLM Gagal menghasilkan evaluasi: {raw_json_output}")
+        evaluation = self._parse_output(raw_output)
+        if evaluation is None:
+            # Jika LLM tidak memberikan JSON sesuai skema (Pelanggaran Prompt)
+            metrics.inc("evaluation_malformed_output")
+            print(f"EvaluationService: Output evaluasi tidak sesuai skema. Raw Output: {raw_output[:500]}")
+            # Logic: Output rusak tidak boleh terus dilayani dari cache.
+            await self.llm_service.forget_cached(system_prompt, user_prompt, "evaluation", response_schema=EvaluationLLMOutput)
 
-        try:
-            # Logic: Membersihkan dan parsing JSON murni dari output LLM
-            # Hapus markdown artifacts yang mungkin ditambahkan oleh LLM
-            cleaned_json_str = raw_json_output.strip().replace('```json', '').replace('```', '')
-            evaluation_data = json.loads(cleaned_json_str)
-            
-            # Memastikan skor adalah Decimal untuk presisi
-            scores = {
-                k: Decimal(str(v)) for k, v in evaluation_data.items() if k.startswith('skor_')
-            }
-            
-            # Mengambil feedback naratif
-            narasi = evaluation_data.get('feedback_narasi', 'Tidak ada feedback naratif.')
-            saran = evaluation_data.get('saran_utama', 'Perlu struktur jawaban yang lebih baik.')
-            
-            return scores, narasi, saran
+            remaining = budget - (time.perf_counter() - started_at)
+            if remaining >= settings.EVALUATION_REPAIR_MIN_SECONDS:
+                evaluation = await self._repair_output(raw_output, remaining)
+            else:
+                metrics.inc("evaluation_repair_skipped_budget")
+            if evaluation is None:
+                raise LLMError("invalid_output", "LLM memberikan format output yang salah. Silakan coba lagi.", retryable=True)
 
-        except json.JSONDecodeError as e:
-            # Jika LLM tidak memberikan JSON murni (Pelanggaran Prompt)
-            print(f"JSON Parsing Error: {e}\nRaw Output: {raw_json_output}")
-            raise Exception("LLM memberikan format output yang salah. Perlu perbaikan Prompt Engineering.")
+        # 3. Gabungkan skor LLM + skor lokal (Decimal untuk presisi)
+        scores = {}
+        for rubric in EVALUATION_RUBRICS:
+            source = evaluation if rubric in EvaluationLLMOutput.model_fields else analysis
+            scores[rubric] = Decimal(str(round(getattr(source, rubric), 2)))
+        return scores, evaluation.feedback_narasi, evaluation.saran_utama
@@ -0,0 +1,285 @@
+# File: backend/app/services/ingestion_jobs.py
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.database import SessionLocal
+from app.db.models import CvData
+from app.services.pdf_extractor import extract_pdf_blocks, blocks_to_text, blocks_from_text
+from app.services.rag_service import RAGService
+
+# Status pemrosesan CV (kolom cv_data.status_proses)
+# Logic: NULL diperlakukan sama dengan "indexed" (CV lama sebelum pipeline asinkron).
+CV_STATUS_PENDING = "pending"
+CV_STATUS_PROCESSING = "processing"
+CV_STATUS_INDEXED = "indexed"
+CV_STATUS_FAILED = "failed"
+
+
+class IngestionBusyError(Exception):
+    """Dilempar saat antrean ingestion CV penuh (admission limit tercapai)."""
+    pass
+
+
+class CvNotReadyError(Exception):
+    """Dilempar saat CV yang dipilih belum selesai diindeks (atau gagal diproses)."""
+    pass
+
+
+class IngestionJob:
+    """
+    Status satu job ingestion CV.
+    Tahapan: extract -> chunk -> embed -> index -> competency.
+    """
+    STAGES = ["extract", "chunk", "embed", "index", "competency"]
+
+    def __init__(self, cv_id: int, mahasiswa_id: int, file_path: str, content_hash: str, raw_text: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.cv_id = cv_id
+        self.mahasiswa_id = mahasiswa_id
+        self.file_path = file_path
+        self.content_hash = content_hash
+        self.raw_text = raw_text # Diisi jika hasil ekstraksi PDF identik bisa dipakai ulang
+
+        self.status = "queued" # queued -> running -> done / failed
+        self.stage: Optional[str] = None
+        self.completed_stages: List[str] = []
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+
+        # Logic: threading.Event (bukan asyncio.Event) agar bisa ditunggu dari thread maupun event loop.
+        self.indexed_event = threading.Event()
+
+    def start_stage(self, stage: str):
+        if self.stage and self.stage not in self.completed_stages:
+            self.completed_stages.append(self.stage)
+        self.stage = stage
+        self.updated_at = datetime.now()
+
+    def finish(self, error: Optional[str] = None):
+        if error is None and self.stage and self.stage not in self.completed_stages:
+            self.completed_stages.append(self.stage)
+        self.status = "failed" if error else "done"
+        self.error = error
+        self.updated_at = datetime.now()
+        self.indexed_event.set()
+
+    @property
+    def progress(self) -> float:
+        return round(len(self.completed_stages) / len(self.STAGES), 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "cv_id": self.cv_id,
+            "mahasiswa_id": self.mahasiswa_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class IngestionJobManager:
+    """
+    Pengelola pipeline ingestion CV di background.
+    Tanggung jawab tunggal: menjalankan tahapan ingestion setiap CV di pool worker,
+    memperbarui status job/CV, dan melayani polling status.
+    """
+    def __init__(self, registry, max_retained_jobs: int = 1000):
+        self.registry = registry
+        self.max_retained_jobs = max_retained_jobs
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._jobs_by_cv: Dict[int, str] = {}
+        self._tasks = set()
+
+    # ----------------------------------------------------------------------
+    # API PUBLIK
+    # ----------------------------------------------------------------------
+    @property
+    def queued_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status in ("queued", "running"))
+
+    def ensure_capacity(self):
+        """Menolak upload baru jika antrean sudah penuh (dipanggil SEBELUM menulis apa pun)."""
+        if self.queued_count >= settings.CV_INGEST_MAX_QUEUED:
+            metrics.inc("cv_ingest_rejected")
+            raise IngestionBusyError("Antrean pemrosesan CV sedang penuh. Coba lagi sebentar.")
+
+    def submit(self, cv_id: int, mahasiswa_id: int, file_path: str, content_hash: str, raw_text: Optional[str] = None) -> IngestionJob:
+        """Mendaftarkan job baru dan menjadwalkannya di event loop."""
+        job = IngestionJob(cv_id, mahasiswa_id, file_path, content_hash, raw_text)
+        self._remember(job)
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        metrics.inc("cv_ingest_submitted")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def get_for_cv(self, cv_id: int) -> Optional[IngestionJob]:
+        job_id = self._jobs_by_cv.get(cv_id)
+        return self._jobs.get(job_id) if job_id else None
+
+    async def wait_until_indexed(self, cv_id: int, timeout: float) -> Optional[IngestionJob]:
+        """
+        Menunggu hingga CV selesai diindeks/gagal, maksimal timeout detik (tanpa menahan thread).
+        Logic: Job hanya ada di memori worker yang menerima upload; jika job ada di worker ini, event job dicek
+        berkala; jika tidak, status_proses di DB dibaca berkala (satu query singkat per iterasi).
+        """
+        job = self.get_for_cv(cv_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            if job is not None:
+                if job.indexed_event.is_set():
+                    return job
+            elif await asyncio.to_thread(self._read_cv_status, cv_id) not in (CV_STATUS_PENDING, CV_STATUS_PROCESSING):
+                return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            await asyncio.sleep(min(settings.CV_INDEX_POLL_INTERVAL, remaining))
+
+    async def resume_pending(self):
+        """
+        Menjadwalkan ulang CV yang belum selesai saat proses sebelumnya berhenti.
+        Logic: Status job hanya ada di memori, tetapi status CV dan file PDF tersimpan permanen.
+        """
+        loop = asyncio.get_running_loop()
+        pending = await loop.run_in_executor(self.registry.ingest_thread_pool, self._load_unfinished_cvs)
+        for cv_id, mahasiswa_id, content_hash in pending:
+            file_path = self.upload_path(cv_id)
+            if os.path.exists(file_path):
+                self.submit(cv_id, mahasiswa_id, file_path, content_hash)
+        if pending:
+            print(f"IngestionJobManager: {len(pending)} CV yang belum selesai dijadwalkan ulang.")
+
+    @staticmethod
+    def upload_path(cv_id: int) -> str:
+        return os.path.join(settings.CV_UPLOAD_DIR, f"{cv_id}.pdf")
+
+    # ----------------------------------------------------------------------
+    # PIPELINE INTERNAL
+    # ----------------------------------------------------------------------
+    def _remember(self, job: IngestionJob):
+        self._jobs[job.job_id] = job
+        self._jobs_by_cv[job.cv_id] = job.job_id
+        # Logic: Hanya job yang sudah selesai yang boleh dibuang saat batas retensi terlampaui.
+        while len(self._jobs) > self.max_retained_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status in ("queued", "running"):
+                break
+            self._jobs.pop(oldest_id)
+            if self._jobs_by_cv.get(oldest.cv_id) == oldest_id:
+                self._jobs_by_cv.pop(oldest.cv_id)
+
+    @staticmethod
+    def _load_unfinished_cvs():
+        with SessionLocal() as db:
+            rows = db.query(CvData.cv_id, CvData.mahasiswa_id, CvData.content_hash).filter(
+                CvData.status_proses.in_([CV_STATUS_PENDING, CV_STATUS_PROCESSING])
+            ).all()
+            return [tuple(r) for r in rows]
+
+    @staticmethod
+    def _read_cv_status(cv_id: int) -> Optional[str]:
+        with SessionLocal() as db:
+            return db.query(CvData.status_proses).filter(CvData.cv_id == cv_id).scalar()
+
+    @staticmethod
+    def _update_cv(cv_id: int, **values):
+        with SessionLocal() as db:
+            db.query(CvData).filter(CvData.cv_id == cv_id).update(values)
+            db.commit()
+
+    @staticmethod
+    def _read_file(file_path: str) -> bytes:
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    async def _run(self, job: IngestionJob):
+        """Menjalankan seluruh tahapan satu job. Jumlah job aktif dibatasi semaphore admission."""
+        # Logic: Import lokal untuk menghindari import melingkar (cv_service meng-import modul ini).
+        from app.services.cv_service import CvService
+
+        loop = asyncio.get_running_loop()
+        pool = self.registry.ingest_thread_pool
+
+        async with self.registry.ingest_admission:
+            job.status = "running"
+            metrics.inc("cv_ingest_started")
+            rag_service = RAGService(self.registry)
+            try:
+                # 1. EXTRACT (ProcessPool, CPU-bound)
+                job.start_stage("extract")
+                raw_text = job.raw_text
+                if raw_text is None:
+                    # Logic: Ekstraksi streaming per blok dengan batas halaman/karakter; halaman tiap blok
+                    # dibawa ke chunker agar metadata chunk mencatat halaman asalnya.
+                    file_content = await loop.run_in_executor(pool, self._read_file, job.file_path)
+                    blocks = await loop.run_in_executor(
+                        self.registry.pdf_process_pool, extract_pdf_blocks,
+                        file_content, settings.CV_MAX_PAGES, settings.CV_MAX_CHARS
+                    )
+                    if not blocks:
+                        raise ValueError("Teks PDF tidak dapat diekstrak.")
+                    raw_text = blocks_to_text(blocks)
+                else:
+                    blocks = blocks_from_text(raw_text)
+                await loop.run_in_executor(
+                    pool, lambda: self._update_cv(job.cv_id, raw_text=raw_text, status_proses=CV_STATUS_PROCESSING)
+                )
+
+                # 2. CHUNK
+                job.start_stage("chunk")
+                chunks, chunk_hashes = await loop.run_in_executor(pool, rag_service.prepare_chunks, blocks)
+
+                # 3. EMBED (EmbeddingExecutor menggabungkan batch dengan request lain)
+                job.start_stage("embed")
+                embeddings = await loop.run_in_executor(
+                    pool, rag_service.embed_chunks, [chunk.text for chunk in chunks], chunk_hashes
+                )
+
+                # 4. INDEX
+                job.start_stage("index")
+                if chunks:
+                    await loop.run_in_executor(
+                        pool, rag_service.index_chunks,
+                        job.mahasiswa_id, job.cv_id, chunks, chunk_hashes, embeddings, job.content_hash
+                    )
+                await loop.run_in_executor(pool, lambda: self._update_cv(job.cv_id, status_proses=CV_STATUS_INDEXED))
+                # Logic: CV sudah bisa dipakai wawancara; ekstraksi kompetensi tidak perlu ditunggu.
+                job.indexed_event.set()
+            except Exception as e:
+                print(f"IngestionJobManager: Job {job.job_id} (CV {job.cv_id}) gagal di tahap {job.stage}: {e}")
+                await loop.run_in_executor(pool, lambda: self._update_cv(job.cv_id, status_proses=CV_STATUS_FAILED))
+                job.finish(error=f"Gagal di tahap {job.stage}: {e}")
+                metrics.inc("cv_ingest_failed")
+                return
+
+            # 5. COMPETENCY (LLM). Kegagalan di tahap ini tidak menggagalkan CV yang sudah terindeks.
+            job.start_stage("competency")
+            try:
+                kompetensi = await CvService.extract_competencies(self.registry, raw_text)
+                if kompetensi:
+                    await loop.run_in_executor(pool, lambda: self._update_cv(job.cv_id, parsed_kompetensi=kompetensi))
+            except Exception as e:
+                print(f"IngestionJobManager: Ekstraksi kompetensi CV {job.cv_id} dilewati: {e}")
+            job.finish()
+            metrics.inc("cv_ingest_completed")
+
+            # 6. Pra-generate pertanyaan pembuka untuk role terpopuler (lihat OpeningQuestionBank)
+            if self.registry.opening_questions is not None:
+                self.registry.opening_questions.schedule_fill(job.cv_id, job.mahasiswa_id)
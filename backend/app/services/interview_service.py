@@ -1,191 +1,620 @@
 # File: backend/app/services/interview_service.py
 
-from sqlalchemy.orm import Session
-from app.db.models import InterviewSession, PerQuestions, JobRole, Mahasiswa, CvData, EvaluationMetrics, Feedback # Import Model Baru
-from app.schemas import InterviewStart, QuestionGenerateOut, AnswerInput
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.db.models import InterviewSession, PerQuestions, Mahasiswa, CvData, EvaluationMetrics, Feedback # Import Model Baru
+from app.schemas import InterviewStart, QuestionGenerateOut, AnswerInput, JobRoleOut
+from app.core.registry import ResourceRegistry
+from app.db.interview_repository import InterviewRepository
 from app.services.rag_service import RAGService 
-from app.services.llm_service import LLMService 
+from app.services.llm_service import LLMService, iter_sentences
 from app.services.evaluation_service import EvaluationService # <-- IMPORT BARU
-from datetime import datetime
-from typing import Optional, Tuple, Dict, Any, Union
+from app.services.ingestion_jobs import CvNotReadyError, CV_STATUS_INDEXED, CV_STATUS_FAILED
+from app.services.analytics_service import rubric_averages
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.database import AsyncSessionLocal
+from datetime import datetime, timedelta
+from typing import Optional, Tuple, Dict, Any, Union, AsyncIterator, List
 from decimal import Decimal
+import asyncio
+
+# Batasi maksimum 5 pertanyaan untuk demo
+MAX_QUESTIONS_PER_SESSION = 5
+
+# Output satu giliran jawaban: pertanyaan lanjutan atau status akhir sesi
+AnswerResult = Union[QuestionGenerateOut, Dict[str, Any]]
+
+
+class TurnAlreadyAnswered(Exception):
+    """Giliran qa_id sudah selesai (jawaban tersimpan); hasilnya diputar ulang dari DB."""
+    def __init__(self, session_id: int, urutan_pertanyaan: int):
+        super().__init__(f"Giliran ke-{urutan_pertanyaan} sesi {session_id} sudah dijawab.")
+        self.session_id = session_id
+        self.urutan_pertanyaan = urutan_pertanyaan
+
 
 class InterviewService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, registry: ResourceRegistry):
         self.db = db
-        self.rag_service = RAGService()
-        self.llm_service = LLMService()
-        self.evaluation_service = EvaluationService()
+        self.registry = registry
+        # Logic: Semua service berbagi sumber daya berat dari Registry, sehingga konstruksi per request murah.
+        self.rag_service = RAGService(registry)
+        self.llm_service = LLMService(registry)
+        self.evaluation_service = EvaluationService(registry)
+        # Logic: Repository memakai API ORM sinkron di atas sync_session milik AsyncSession;
+        # setiap pemanggilannya dibungkus _run_sync agar I/O berjalan async (greenlet, tanpa thread).
+        self.repository = InterviewRepository(db.sync_session)
+
+    async def _run_sync(self, fn, *args, **kwargs):
+        """Menjalankan fungsi ORM sinkron (repository, cache Job Role) di koneksi async milik sesi ini."""
+        return await self.db.run_sync(lambda _session: fn(*args, **kwargs))
+
+    async def _end_read_transaction(self):
+        """
+        Mengakhiri transaksi baca sebelum menunggu RAG/LLM, sehingga koneksi kembali ke pool selama beberapa detik itu.
+        Logic: expire_on_commit=False -> objek yang sudah dibaca tetap bisa dipakai tanpa SELECT ulang.
+        Dipanggil SEBELUM ada perubahan di sesi, agar penulisan satu giliran tetap satu transaksi.
+        """
+        await self.db.commit()
 
     # ----------------------------------------------------------------------
     # FUNGSI PEMBANTU UNTUK MENGAMBIL DATA DASAR
     # ----------------------------------------------------------------------
-    def _fetch_session_data(self, session_data: InterviewStart):
-        """Mengambil data Mahasiswa, Role, dan CV yang dibutuhkan dari PostgreSQL."""
-        mahasiswa = self.db.query(Mahasiswa).filter(Mahasiswa.mahasiswa_id == session_data.mahasiswa_id).first()
-        job_role = self.db.query(JobRole).filter(JobRole.role_id == session_data.role_id).first()
-        cv_data = self.db.query(CvData).filter(CvData.cv_id == session_data.cv_id).first()
+    async def _fetch_session_data(self, session_data: InterviewStart):
+        """Mengambil data Mahasiswa dan CV dari PostgreSQL; Role dari cache Job Role (tanpa query)."""
+        mahasiswa = await self.db.get(Mahasiswa, session_data.mahasiswa_id)
+        job_role = await self.db.run_sync(self.registry.job_roles.get, session_data.role_id)
+        cv_data = await self.db.get(CvData, session_data.cv_id)
         
         if not all([mahasiswa, job_role, cv_data]):
             raise ValueError("Data Mahasiswa, Role, atau CV tidak ditemukan.")
             
         return mahasiswa, job_role, cv_data
 
+    async def _ensure_cv_indexed(self, cv_data: CvData):
+        """
+        Memastikan CV sudah selesai diindeks sebelum dipakai untuk RAG.
+        Logic: CV yang masih diproses ditunggu sebentar (CV_INDEX_WAIT_ON_START); jika belum siap atau gagal, sesi ditolak.
+        """
+        if cv_data.status_proses in (None, CV_STATUS_INDEXED):
+            return
+        if cv_data.status_proses != CV_STATUS_FAILED:
+            # Logic: Koneksi tidak ditahan selama menunggu; status_proses lalu dibaca ulang di transaksi baru yang singkat.
+            await self._end_read_transaction()
+            await self.registry.ingestion_jobs.wait_until_indexed(cv_data.cv_id, settings.CV_INDEX_WAIT_ON_START)
+            await self.db.refresh(cv_data, ["status_proses"])
+            if cv_data.status_proses in (None, CV_STATUS_INDEXED):
+                return
+        if cv_data.status_proses == CV_STATUS_FAILED:
+            raise CvNotReadyError("CV gagal diproses. Silakan upload ulang CV Anda.")
+        raise CvNotReadyError("CV masih diproses. Coba mulai sesi lagi dalam beberapa detik.")
+
     # ----------------------------------------------------------------------
     # FUNGSI UTAMA: MEMULAI WAWANCARA (START INTERVIEW)
     # ----------------------------------------------------------------------
-    def start_new_interview(self, session_data: InterviewStart) -> QuestionGenerateOut:
-        """
-        Langkah C: Memulai sesi baru, memanggil RAG, dan menghasilkan pertanyaan pertama.
-        """
-        
-        # 1. Fetch Data dari PostgreSQL
-        mahasiswa, job_role, cv_data = self._fetch_session_data(session_data)
-        
-        # 2. Buat Entri Sesi Baru di PostgreSQL
-        db_session = InterviewSession(
-            mahasiswa_id=mahasiswa.mahasiswa_id,
-            role_id=job_role.role_id,
-            tgl_mulai=datetime.now(),
-            skor_total_rata_rata=0.00 # Skor awal 0
-        )
-        self.db.add(db_session)
-        self.db.commit()
-        self.db.refresh(db_session)
-        
-        # 3. Lakukan Retrieval (RAG)
-        # Logic: Cari konteks CV yang paling relevan dengan Job Role
-        rag_query = f"Pengalaman atau kompetensi apa yang paling menonjol terkait peran {job_role.nama_role}?"
-        relevant_cv_context = self.rag_service.retrieve_relevant_context(
-            mahasiswa_id=mahasiswa.mahasiswa_id, 
+    async def retrieve_cv_context(self, mahasiswa_id: int, nama_role: str, cv_id: Optional[int] = None) -> str:
+        """Retrieval (RAG): konteks CV yang paling relevan dengan Job Role (di thread, karena query Chroma blocking)."""
+        rag_query = self.rag_service.build_role_query(nama_role)
+        return await asyncio.to_thread(
+            self.rag_service.retrieve_relevant_context,
+            mahasiswa_id=mahasiswa_id, 
             query_text=rag_query, 
-            n_results=5
+            n_results=5,
+            cv_id=cv_id # Logic: Hanya CV yang dipilih untuk sesi ini, bukan semua CV lama.
         )
-        
-        # 4. Prompt Engineering (Membuat System Instruction)
+
+    @staticmethod
+    def build_opening_prompts(nama_mahasiswa: str, nama_role: str, cv_context: str) -> Tuple[str, str]:
+        """Prompt pertanyaan pembuka (dipakai juga oleh bank pertanyaan pembuka saat pra-generate)."""
         # Logic: Mengatur persona LLM dan memberikan semua konteks yang dikumpulkan.
         system_instruction = (
-            f"Anda adalah pewawancara HR profesional untuk peran '{job_role.nama_role}' "
+            f"Anda adalah pewawancara HR profesional untuk peran '{nama_role}' "
             f"di perusahaan teknologi. Tanyakan pertanyaan pembuka yang PERSONAL "
             f"berdasarkan konteks CV yang disediakan. Tanyakan hanya SATU pertanyaan."
         )
         
         user_prompt = (
             f"Tugas Anda: Ajukan pertanyaan pembuka. \n\n"
-            f"Data Mahasiswa: Nama={mahasiswa.nama}, Role Tujuan='{job_role.nama_role}'. \n"
-            f"Konteks CV Paling Relevan (RAG): ```{relevant_cv_context}``` \n\n"
+            f"Data Mahasiswa: Nama={nama_mahasiswa}, Role Tujuan='{nama_role}'. \n"
+            f"Konteks CV Paling Relevan (RAG): ```{cv_context}``` \n\n"
             f"Pertanyaan Anda harus mengacu pada informasi di bagian Konteks CV tersebut. "
             f"Contoh: 'Berdasarkan proyek Anda di [Proyek A] yang terkait dengan [Topik di CV], bagaimana Anda menangani...?'"
         )
-        
-        # 5. Panggil LLM Service
-        pertanyaan_llm = self.llm_service.generate_content(system_instruction, user_prompt)
+        return system_instruction, user_prompt
+
+    async def load_opening_data(self, session_data: InterviewStart) -> Tuple[Mahasiswa, JobRoleOut, CvData]:
+        """Langkah 1 memulai wawancara: ambil data dan pastikan CV sudah terindeks (transaksi baca terbuka saat kembali)."""
+        mahasiswa, job_role, cv_data = await self._fetch_session_data(session_data)
+        await self._ensure_cv_indexed(cv_data)
+        return mahasiswa, job_role, cv_data
 
-        # 6. Simpan Pertanyaan Pertama ke PostgreSQL
+    async def _opening_prompts(self, mahasiswa: Mahasiswa, job_role: JobRoleOut, cv_data: CvData) -> Tuple[str, str, str]:
+        """Langkah 2-3 memulai wawancara: RAG, lalu susun prompt pertanyaan pembuka."""
+        relevant_cv_context = await self.retrieve_cv_context(mahasiswa.mahasiswa_id, job_role.nama_role, cv_data.cv_id)
+        system_instruction, user_prompt = self.build_opening_prompts(mahasiswa.nama, job_role.nama_role, relevant_cv_context)
+        return relevant_cv_context, system_instruction, user_prompt
+
+    async def _pop_pregenerated_question(self, mahasiswa: Mahasiswa, job_role: JobRoleOut, cv_data: CvData) -> Optional[str]:
+        """
+        Mengambil pertanyaan pembuka dari bank pra-generate (None jika kosong/nonaktif).
+        Logic: Pada hit, penghapusan kandidat ikut commit sesi baru. Pada miss, transaksi baca diakhiri
+        sebelum RAG + LLM live. Keduanya menjadwalkan pengisian ulang pasangan (CV, role) ini.
+        """
+        bank = self.registry.opening_questions
+        if bank is None or not settings.OPENING_BANK_ENABLED:
+            await self._end_read_transaction()
+            return None
+        pertanyaan_llm = await self._run_sync(bank.pop, self.repository.db, cv_data.cv_id, job_role.role_id)
+        if pertanyaan_llm is None:
+            await self._end_read_transaction()
+        bank.schedule_fill(cv_data.cv_id, mahasiswa.mahasiswa_id, [job_role.role_id])
+        return pertanyaan_llm
+
+    async def persist_opening_question(self, mahasiswa: Mahasiswa, job_role: JobRoleOut, cv_id: int, pertanyaan_llm: str) -> PerQuestions:
+        """Menyimpan Sesi Baru dan Pertanyaan Pertama ke PostgreSQL (satu commit)."""
+        db_session = InterviewSession(
+            mahasiswa_id=mahasiswa.mahasiswa_id,
+            role_id=job_role.role_id,
+            cv_id=cv_id, # Logic: Resume sesi live memakai RAG atas CV yang sama
+
+            tgl_mulai=datetime.now(),
+            skor_total_rata_rata=0.00 # Skor awal 0
+        )
         db_question = PerQuestions(
-            session_id=db_session.session_id,
+            session=db_session,
             urutan_pertanyaan=1,
             jenis_pertanyaan="Pembuka (RAG)",
-            pertanyaan_llm=pertanyaan_llm if pertanyaan_llm and not pertanyaan_llm.startswith("ERROR") else "Maaf, terjadi kesalahan saat membuat pertanyaan.",
+            pertanyaan_llm=pertanyaan_llm,
             waktu_tanya=datetime.now()
         )
-        self.db.add(db_question)
-        self.db.commit()
-        self.db.refresh(db_question)
-        
-        # 7. Mengembalikan Respons Output
-        return QuestionGenerateOut(
-            qa_id=db_question.qa_id,
-            session_id=db_session.session_id,
-            urutan_pertanyaan=1,
-            jenis_pertanyaan=db_question.jenis_pertanyaan,
-            pertanyaan_llm=db_question.pertanyaan_llm
-        )
+        self.db.add_all([db_session, db_question])
+        # Logic: qa_id dan session_id sudah terisi saat flush; expire_on_commit=False -> tanpa SELECT ulang.
+        await self.db.commit()
+        return db_question
 
-# ----------------------------------------------------------------------
-    # FUNGSI BARU: MENERIMA JAWABAN, EVALUASI, DAN LANJUTKAN SESI
-    # ----------------------------------------------------------------------
-    def submit_answer_and_continue(self, answer_data: AnswerInput, is_final_question: bool = False) -> Union[QuestionGenerateOut, Dict[str, str]]:
+    async def start_new_interview(self, session_data: InterviewStart) -> QuestionGenerateOut:
         """
-        Menerima jawaban, mengevaluasi, menyimpan skor, dan menghasilkan pertanyaan lanjutan.
+        Langkah C: Memulai sesi baru, memanggil RAG, dan menghasilkan pertanyaan pertama.
+        Logic: Pertanyaan pra-generate dari bank dipakai lebih dulu; RAG + LLM live hanya saat bank kosong.
         """
-        # 1. Ambil Data Pertanyaan & Sesi
-        db_qa = self.db.query(PerQuestions).filter(PerQuestions.qa_id == answer_data.qa_id).first()
-        if not db_qa:
-            raise ValueError("Pertanyaan tidak ditemukan.")
+        # 1. Data
+        mahasiswa, job_role, cv_data = await self.load_opening_data(session_data)
 
-        db_session = self.db.query(InterviewSession).filter(InterviewSession.session_id == db_qa.session_id).first()
-        job_role = self.db.query(JobRole).filter(JobRole.role_id == db_session.role_id).first()
-        
-        # 2. Preprocessing Jawaban
-        # Logic: Contoh sederhana preprocessing (Anda dapat menambahkan penghitungan filler words di sini)
-        answer_clean = answer_data.jawaban_mentah.strip() 
-        
-        # 3. Lakukan Evaluasi (PANGGIL EVALUATION SERVICE)
-        # Logic: EvaluationService akan mengurus LLM Prompting untuk mendapatkan skor dan feedback.
-        scores_dict, narasi_feedback, saran_utama = self.evaluation_service.evaluate_answer(
-            job_role=job_role.nama_role, 
-            question=db_qa.pertanyaan_llm, 
-            answer_clean=answer_clean
-        )
+        # 2. Bank Pertanyaan Pembuka (tanpa RAG + LLM)
+        pertanyaan_llm = await self._pop_pregenerated_question(mahasiswa, job_role, cv_data)
+        if pertanyaan_llm is None:
+            # 3. RAG dan Prompt
+            _, system_instruction, user_prompt = await self._opening_prompts(mahasiswa, job_role, cv_data)
+
+            # 4. Panggil LLM Gateway (asinkron)
+            # Logic: Jika LLM gagal, LLMError dilempar SEBELUM sesi dibuat, sehingga tidak ada sesi yatim di DB.
+            # Logic: CV + role yang sama menghasilkan prompt identik -> dilayani dari cache respons LLM.
+            pertanyaan_llm = await self.llm_service.generate_content(
+                system_instruction, user_prompt, cache_use_case="opening_question"
+            )
+
+        # 5. Simpan Sesi Baru dan Pertanyaan Pertama
+        db_question = await self.persist_opening_question(mahasiswa, job_role, cv_data.cv_id, pertanyaan_llm)
         
-        # 4. Hitung Skor Gabungan dan Kategori
+        # 6. Mengembalikan Respons Output
+        return self._to_question_out(db_question)
+
+    async def opening_question_stream(self, mahasiswa: Mahasiswa, job_role: JobRoleOut, cv_data: CvData) -> Tuple[AsyncIterator[str], Optional[str]]:
+        """
+        Sumber teks pertanyaan pembuka untuk jalur streaming (SSE dan WebSocket live).
+        Mengembalikan (stream teks, konteks CV hasil RAG); konteks None jika pertanyaan berasal dari bank.
+        Logic: Sama dengan start_new_interview: bank pertanyaan pembuka dulu, RAG + stream LLM hanya saat bank kosong.
+        """
+        pertanyaan_llm = await self._pop_pregenerated_question(mahasiswa, job_role, cv_data)
+        if pertanyaan_llm is not None:
+            # Logic: Kandidat dari bank dikirim per kalimat seperti hasil streaming LLM.
+            async def pregenerated():
+                yield pertanyaan_llm
+            return pregenerated(), None
+        relevant_cv_context, system_instruction, user_prompt = await self._opening_prompts(mahasiswa, job_role, cv_data)
+        stream = self.llm_service.stream_content(system_instruction, user_prompt, cache_use_case="opening_question")
+        return stream, relevant_cv_context
+
+    async def stream_new_interview(self, session_data: InterviewStart) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Versi streaming dari start_new_interview.
+        Menghasilkan event {'event': 'sentence', 'data': {...}} per kalimat, lalu satu event 'done'
+        berisi QuestionGenerateOut setelah pertanyaan tersimpan di PER_QUESTIONS.
+        """
+        mahasiswa, job_role, cv_data = await self.load_opening_data(session_data)
+        stream, _ = await self.opening_question_stream(mahasiswa, job_role, cv_data)
+
+        sentences = []
+        async for sentence in iter_sentences(stream):
+            sentences.append(sentence)
+            yield {"event": "sentence", "data": {"index": len(sentences) - 1, "text": sentence}}
+
+        # Logic: Sesi baru dibuat hanya jika stream selesai utuh (klien putus = tidak ada sesi yatim).
+        db_question = await self.persist_opening_question(mahasiswa, job_role, cv_data.cv_id, " ".join(sentences))
+        yield {"event": "done", "data": self._to_question_out(db_question).model_dump()}
+
+# ----------------------------------------------------------------------
+    # FUNGSI PEMBANTU: SKOR, PERTANYAAN LANJUTAN, DAN OUTPUT
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def build_evaluation_rows(qa_id: int, scores_dict: Dict[str, Decimal], narasi_feedback: str, saran_utama: str) -> Tuple[EvaluationMetrics, Feedback]:
+        """Menghitung skor gabungan + kategori dan membentuk baris EVALUATION_METRICS dan FEEDBACK."""
         # Logic: Tentukan skor akhir dan label kategori (A, B, C)
         total_scores = sum(scores_dict.values())
         count = len(scores_dict)
         skor_gabungan = total_scores / count
         label_kategori = "A" if skor_gabungan >= 80 else ("B" if skor_gabungan >= 60 else "C")
 
-        # 5. Update & Simpan Data (PostgreSQL)
-        
-        # A. Update Jawaban di PER_QUESTIONS
-        db_qa.jawaban_mahasiswa_mentah = answer_data.jawaban_mentah
-        db_qa.jawaban_mahasiswa_bersih = answer_clean
-        db_qa.waktu_respon = answer_data.waktu_respon
-        self.db.add(db_qa)
-
-        # B. Simpan EVALUATION_METRICS
         db_metrics = EvaluationMetrics(
-            qa_id=db_qa.qa_id,
+            qa_id=qa_id,
             skor_gabungan=skor_gabungan,
             label_kategori=label_kategori,
             **scores_dict # Unpack semua skor STAR dan Kualitas
         )
-        self.db.add(db_metrics)
-
-        # C. Simpan FEEDBACK
         db_feedback = Feedback(
-            qa_id=db_qa.qa_id,
+            qa_id=qa_id,
             feedback_narasi_llm=narasi_feedback,
             saran_perbaikan_utama=saran_utama
         )
-        self.db.add(db_feedback)
-        
-        self.db.commit() # Simpan semua perubahan
+        return db_metrics, db_feedback
+
+    @staticmethod
+    def _to_question_out(db_question: PerQuestions) -> QuestionGenerateOut:
+        return QuestionGenerateOut(
+            qa_id=db_question.qa_id,
+            session_id=db_question.session_id,
+            urutan_pertanyaan=db_question.urutan_pertanyaan,
+            jenis_pertanyaan=db_question.jenis_pertanyaan,
+            pertanyaan_llm=db_question.pertanyaan_llm
+        )
+
+    # ----------------------------------------------------------------------
+    # FUNGSI BARU: MENERIMA JAWABAN, EVALUASI, DAN LANJUTKAN SESI
+    # ----------------------------------------------------------------------
+    async def _load_answer_turn(self, answer_data: AnswerInput) -> Tuple[PerQuestions, InterviewSession, JobRoleOut, str]:
+        """
+        Mengambil pertanyaan, sesi, dan role, mengklaim giliran (_claim_turn), lalu menyiapkan jawaban bersih
+        (ditulis oleh _claim_answer). Pemanggil WAJIB melepas klaim (_release_turn) jika giliran gagal.
+        """
+        # 1. Ambil Data Pertanyaan & Sesi (satu query JOIN); Role dari cache Job Role
+        turn = await self._run_sync(self.repository.load_turn, answer_data.qa_id)
+        if not turn:
+            raise ValueError("Pertanyaan tidak ditemukan.")
+        db_qa, db_session = turn
+        if db_qa.jawaban_mahasiswa_bersih is not None:
+            # Logic: Jawaban hanya tersimpan bersama hasil LLM-nya, jadi giliran ini sudah selesai -> diputar ulang.
+            raise TurnAlreadyAnswered(db_qa.session_id, db_qa.urutan_pertanyaan)
+        job_role = await self.db.run_sync(self.registry.job_roles.get, db_session.role_id)
+        if job_role is None:
+            raise ValueError("Job Role sesi ini tidak ditemukan.")
+        # Logic: Commit klaim sekaligus mengakhiri transaksi baca sebelum panggilan LLM.
+        await self._claim_turn(db_qa)
         
-        # 6. Tentukan Langkah Selanjutnya: Lanjut Pertanyaan atau Akhiri Sesi
-        if is_final_question or db_qa.urutan_pertanyaan >= 5: # Batasi maksimum 5 pertanyaan untuk demo
-            self.end_interview_session(db_session.session_id)
-            return {"status": "Sesi Berakhir", "session_id": db_session.session_id}
+        # 2. Preprocessing Jawaban
+        # Logic: Fitur jawaban (filler, frasa ragu, laju bicara, STAR) dihitung saat evaluasi oleh answer_analysis.
+        answer_clean = answer_data.jawaban_mentah.strip()
+
+        # 3. Jawaban bersih dipasang di objek untuk prompt lanjutan TANPA ditandai berubah;
+        # penulisannya dilakukan _claim_answer di transaksi akhir giliran.
+        set_committed_value(db_qa, "jawaban_mahasiswa_bersih", answer_clean)
+        return db_qa, db_session, job_role, answer_clean
+
+    async def _claim_turn(self, db_qa: PerQuestions):
+        """
+        Menandai giliran sedang diproses (per_questions.tgl_klaim_jawaban) SEBELUM panggilan LLM, lalu commit.
+        Logic: Duplikat di worker lain mendapati klaim yang masih segar -> menunggu (poll) sampai jawaban tersimpan
+        lalu memutar ulang hasilnya, bukan menghitung ulang. Klaim yang dilepas (giliran gagal) atau lebih tua dari
+        ANSWER_CLAIM_STALE_SECONDS (worker pemilik mati) diambil alih.
+        """
+        waited = False
+        while True:
+            claimed_at = datetime.now()
+            stale_before = claimed_at - timedelta(seconds=settings.ANSWER_CLAIM_STALE_SECONDS)
+            claimed = await self._run_sync(self.repository.claim_turn, db_qa.qa_id, claimed_at, stale_before)
+            answered = not claimed and await self._run_sync(self.repository.is_answered, db_qa.qa_id)
+            await self.db.commit()
+            if claimed:
+                set_committed_value(db_qa, "tgl_klaim_jawaban", claimed_at)
+                return
+            if answered:
+                raise TurnAlreadyAnswered(db_qa.session_id, db_qa.urutan_pertanyaan)
+            if not waited:
+                metrics.inc("answer_claim_waits")
+                waited = True
+            await asyncio.sleep(settings.ANSWER_CLAIM_POLL_INTERVAL)
+
+    async def _release_turn(self, db_qa: PerQuestions):
+        """
+        Melepas klaim giliran yang gagal/dibatalkan (tidak ada yang disimpan), agar duplikat yang menunggu
+        atau retry klien langsung mengambil alih tanpa menunggu klaim basi.
+        """
+        await self.db.rollback()
+        await self._run_sync(self.repository.release_turn, db_qa.qa_id, db_qa.tgl_klaim_jawaban)
+        await self.db.commit()
+
+    async def _claim_answer(self, db_qa: PerQuestions, answer_data: AnswerInput, defer_evaluation: bool = False):
+        """
+        Penulisan pertama di transaksi akhir giliran: menyimpan jawaban HANYA jika belum ada.
+        Logic: Duplikat yang mengambil alih klaim basi lalu lebih dulu commit terdeteksi di sini (UPDATE 0 baris)
+        -> hasil LLM giliran ini dibuang dan hasil yang tersimpan diputar ulang.
+        Evaluasi tertunda diklaim di UPDATE yang sama (tgl_klaim_evaluasi), lihat get_evaluation_status.
+        """
+        claimed = await self._run_sync(
+            self.repository.claim_answer,
+            db_qa.qa_id, answer_data.jawaban_mentah, db_qa.jawaban_mahasiswa_bersih, answer_data.waktu_respon,
+            datetime.now() if defer_evaluation else None
+        )
+        if not claimed:
+            raise TurnAlreadyAnswered(db_qa.session_id, db_qa.urutan_pertanyaan)
+
+    async def _evaluate_and_end_session(self, db_qa: PerQuestions, db_session: InterviewSession, job_role: JobRoleOut, answer_data: AnswerInput) -> Dict[str, Any]:
+        """Pertanyaan terakhir: evaluasi jawaban, lalu simpan jawaban + skor + penutupan sesi dalam satu commit."""
+        scores_dict, narasi_feedback, saran_utama = await self.evaluation_service.evaluate_answer(
+            job_role=job_role.nama_role, 
+            question=db_qa.pertanyaan_llm, 
+            answer_clean=db_qa.jawaban_mahasiswa_bersih,
+            waktu_respon=answer_data.waktu_respon
+        )
+        # Logic: Evaluasi tertunda dari pertanyaan sebelumnya harus selesai sebelum rata-rata sesi dihitung.
+        await self._await_deferred_evaluations(db_session.session_id, job_role)
+        await self._claim_answer(db_qa, answer_data)
+        await self._run_sync(self.repository.add_evaluation, db_session.session_id, *self.build_evaluation_rows(db_qa.qa_id, scores_dict, narasi_feedback, saran_utama))
+        await self._run_sync(self.repository.close_session, db_session.session_id)
+        await self.db.commit()
+        return self._session_ended_out(db_session.session_id)
+
+    @staticmethod
+    def _session_ended_out(session_id: int) -> Dict[str, Any]:
+        return {"status": "Sesi Berakhir", "session_id": session_id}
+
+    # ----------------------------------------------------------------------
+    # IDEMPOTENSI JAWABAN (PER qa_id)
+    # ----------------------------------------------------------------------
+    async def _join_inflight_answer(self, qa_id: int) -> Optional[AnswerResult]:
+        """
+        Jika jawaban untuk qa_id sedang diproses di worker ini, tunggu dan pakai hasilnya (atau error-nya).
+        Mengembalikan None jika tidak ada yang sedang berjalan (pemanggil menjadi pemilik komputasi).
+        """
+        while qa_id in self.registry.inflight_answers:
+            pending = self.registry.inflight_answers[qa_id]
+            metrics.inc("answer_inflight_joins")
+            await asyncio.wait([pending])
+            # Logic: Pemilik yang dibatalkan (klien putus) tidak menghasilkan apa pun -> coba ambil alih.
+            if not pending.cancelled():
+                return pending.result()
+        return None
+
+    def _register_inflight_answer(self, qa_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.registry.inflight_answers[qa_id] = future
+        return future
+
+    def _finish_inflight_answer(self, qa_id: int, future: asyncio.Future, result: Optional[AnswerResult] = None, error: Optional[BaseException] = None):
+        """Menyerahkan hasil ke duplikat yang menunggu, lalu melepas entri qa_id."""
+        if self.registry.inflight_answers.get(qa_id) is future:
+            del self.registry.inflight_answers[qa_id]
+        if isinstance(error, Exception):
+            future.set_exception(error)
+            future.exception() # Menandai error sudah diambil (tidak ada peringatan jika tak ada duplikat)
+        elif error is not None:
+            future.cancel()
         else:
-            return self._generate_next_question(db_session.session_id, db_qa)
+            future.set_result(result)
+
+    async def _replay_answer(self, answered: "TurnAlreadyAnswered") -> AnswerResult:
+        """Membentuk ulang output giliran yang sudah selesai dari data tersimpan (tanpa panggilan LLM)."""
+        await self.db.rollback()
+        metrics.inc("answer_replays")
+        next_question = await self._run_sync(
+            self.repository.get_question_by_order, answered.session_id, answered.urutan_pertanyaan + 1
+        )
+        if next_question is None:
+            # Logic: Jawaban tersimpan tanpa pertanyaan berikutnya hanya terjadi pada giliran terakhir.
+            return self._session_ended_out(answered.session_id)
+        return self._to_question_out(next_question)
+
+    async def submit_answer_and_continue(self, answer_data: AnswerInput, is_final_question: bool = False, defer_evaluation: bool = False) -> AnswerResult:
+        """
+        Menerima jawaban, mengevaluasi, menyimpan skor, dan menghasilkan pertanyaan lanjutan.
+        Logic: Idempoten per qa_id. Duplikat yang datang saat giliran masih diproses menunggu komputasi
+        yang sama; giliran yang sudah selesai diputar ulang dari DB tanpa panggilan LLM.
+        """
+        result = await self._join_inflight_answer(answer_data.qa_id)
+        if result is not None:
+            return result
+
+        future = self._register_inflight_answer(answer_data.qa_id)
+        try:
+            try:
+                result = await self._answer_and_continue(answer_data, is_final_question, defer_evaluation)
+            except TurnAlreadyAnswered as answered:
+                result = await self._replay_answer(answered)
+        except BaseException as e:
+            self._finish_inflight_answer(answer_data.qa_id, future, error=e)
+            raise
+        self._finish_inflight_answer(answer_data.qa_id, future, result=result)
+        return result
+
+    async def _answer_and_continue(self, answer_data: AnswerInput, is_final_question: bool, defer_evaluation: bool) -> AnswerResult:
+        """
+        Logic: Pertanyaan lanjutan hanya bergantung pada pertanyaan dan jawaban sebelumnya (bukan skor),
+        sehingga evaluasi dan pembuatan pertanyaan berjalan BERSAMAAN. Dengan defer_evaluation=True,
+        pertanyaan dikembalikan lebih dulu dan evaluasi diselesaikan di background.
+        """
+        # 1-3. Ambil Data, Klaim Giliran & Siapkan Jawaban (belum ditulis)
+        db_qa, db_session, job_role, answer_clean = await self._load_answer_turn(answer_data)
+        try:
+            return await self._continue_claimed_turn(db_qa, db_session, job_role, answer_clean, answer_data, is_final_question, defer_evaluation)
+        except TurnAlreadyAnswered:
+            raise
+        except BaseException:
+            await self._release_turn(db_qa)
+            raise
+
+    async def _continue_claimed_turn(self, db_qa: PerQuestions, db_session: InterviewSession, job_role: JobRoleOut, answer_clean: str,
+                                     answer_data: AnswerInput, is_final_question: bool, defer_evaluation: bool) -> AnswerResult:
+        # 4A. Pertanyaan Terakhir: hanya evaluasi, lalu akhiri sesi
+        if is_final_question or db_qa.urutan_pertanyaan >= MAX_QUESTIONS_PER_SESSION:
+            return await self._evaluate_and_end_session(db_qa, db_session, job_role, answer_data)
+
+        # 4B. Mode Tertunda: pertanyaan lanjutan dulu, evaluasi di background
+        if defer_evaluation:
+            pertanyaan_llm = await self._generate_next_question_text(job_role.nama_role, db_qa)
+            await self._claim_answer(db_qa, answer_data, defer_evaluation=True)
+            result = self._to_question_out(await self._add_next_question(db_qa, pertanyaan_llm))
+            question_text = db_qa.pertanyaan_llm
+            await self.db.commit()
+            self._schedule_deferred_evaluation(db_qa.qa_id, db_session.session_id, job_role.nama_role, question_text, answer_clean, answer_data.waktu_respon)
+            return result
+
+        # 4C. Mode Normal: evaluasi dan pertanyaan lanjutan BERSAMAAN
+        # Logic: Jika salah satu gagal, yang lain dibatalkan agar tidak membuang panggilan LLM.
+        evaluation_task = asyncio.create_task(self.evaluation_service.evaluate_answer(
+            job_role=job_role.nama_role, 
+            question=db_qa.pertanyaan_llm, 
+            answer_clean=answer_clean,
+            waktu_respon=answer_data.waktu_respon
+        ))
+        question_task = asyncio.create_task(self._generate_next_question_text(job_role.nama_role, db_qa))
+        try:
+            (scores_dict, narasi_feedback, saran_utama), pertanyaan_llm = await asyncio.gather(evaluation_task, question_task)
+        except Exception:
+            evaluation_task.cancel()
+            question_task.cancel()
+            raise
+
+        # 5. Simpan Jawaban, Skor, Feedback, dan Pertanyaan Baru dalam SATU commit
+        # Logic: Output dibentuk setelah flush (qa_id sudah ada) dan sebelum commit, agar tidak perlu SELECT ulang.
+        await self._claim_answer(db_qa, answer_data)
+        await self._run_sync(self.repository.add_evaluation, db_session.session_id, *self.build_evaluation_rows(db_qa.qa_id, scores_dict, narasi_feedback, saran_utama))
+        result = self._to_question_out(await self._add_next_question(db_qa, pertanyaan_llm))
+        await self.db.commit()
+        return result
+
+    # ----------------------------------------------------------------------
+    # FUNGSI BARU: STREAMING JAWABAN + PERTANYAAN LANJUTAN (SSE)
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _answer_event_data(result: AnswerResult) -> Dict[str, Any]:
+        return result.model_dump() if isinstance(result, QuestionGenerateOut) else result
+
+    async def _replay_answer_events(self, result: AnswerResult) -> AsyncIterator[Dict[str, Any]]:
+        """Event SSE untuk hasil yang diputar ulang: kalimat pertanyaan tersimpan, lalu 'done'."""
+        if isinstance(result, QuestionGenerateOut):
+            async def stored_text():
+                yield result.pertanyaan_llm
+            index = 0
+            async for sentence in iter_sentences(stored_text()):
+                yield {"event": "sentence", "data": {"index": index, "text": sentence}}
+                index += 1
+        yield {"event": "done", "data": self._answer_event_data(result)}
+
+    async def stream_answer_and_continue(self, answer_data: AnswerInput, is_final_question: bool = False, defer_evaluation: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Versi streaming dari submit_answer_and_continue (idempoten per qa_id dengan cara yang sama).
+        Logic: Kalimat pertanyaan lanjutan dikirim segera (untuk TTS) sementara evaluasi berjalan bersamaan;
+        jawaban, skor, dan pertanyaan baru disimpan dalam satu commit setelah stream selesai.
+        """
+        result = await self._join_inflight_answer(answer_data.qa_id)
+        if result is not None:
+            async for event in self._replay_answer_events(result):
+                yield event
+            return
+
+        future = self._register_inflight_answer(answer_data.qa_id)
+        events = self._stream_answer_and_continue(answer_data, is_final_question, defer_evaluation)
+        try:
+            try:
+                async for event in events:
+                    if event["event"] == "done":
+                        result = event["result"]
+                    else:
+                        yield event
+            except TurnAlreadyAnswered as answered:
+                result = await self._replay_answer(answered)
+                # Logic: Kalimat yang sudah terkirim (duplikat lintas worker) digantikan oleh 'done' yang tersimpan.
+                async for event in self._replay_answer_events(result):
+                    yield event
+                self._finish_inflight_answer(answer_data.qa_id, future, result=result)
+                return
+        except BaseException as e:
+            # Logic: Klien putus -> stream giliran ditutup sekarang (rollback + klaim dilepas), bukan menunggu GC.
+            try:
+                await events.aclose()
+            finally:
+                self._finish_inflight_answer(answer_data.qa_id, future, error=e)
+            raise
+        self._finish_inflight_answer(answer_data.qa_id, future, result=result)
+        yield {"event": "done", "data": self._answer_event_data(result)}
+
+    async def _stream_answer_and_continue(self, answer_data: AnswerInput, is_final_question: bool, defer_evaluation: bool) -> AsyncIterator[Dict[str, Any]]:
+        """Event 'sentence' per kalimat, diakhiri event internal {'event': 'done', 'result': ...}."""
+        db_qa, db_session, job_role, answer_clean = await self._load_answer_turn(answer_data)
+        events = self._stream_claimed_turn(db_qa, db_session, job_role, answer_clean, answer_data, is_final_question, defer_evaluation)
+        try:
+            async for event in events:
+                yield event
+        except TurnAlreadyAnswered:
+            raise
+        except BaseException:
+            # Logic: Stream dalam ditutup dulu (evaluasi dibatalkan + rollback), baru klaim dilepas.
+            await events.aclose()
+            await self._release_turn(db_qa)
+            raise
+
+    async def _stream_claimed_turn(self, db_qa: PerQuestions, db_session: InterviewSession, job_role: JobRoleOut, answer_clean: str,
+                                   answer_data: AnswerInput, is_final_question: bool, defer_evaluation: bool) -> AsyncIterator[Dict[str, Any]]:
+        if is_final_question or db_qa.urutan_pertanyaan >= MAX_QUESTIONS_PER_SESSION:
+            yield {"event": "done", "result": await self._evaluate_and_end_session(db_qa, db_session, job_role, answer_data)}
+            return
+
+        evaluation_task = None
+        if not defer_evaluation:
+            evaluation_task = asyncio.create_task(self.evaluation_service.evaluate_answer(
+                job_role=job_role.nama_role,
+                question=db_qa.pertanyaan_llm,
+                answer_clean=answer_clean,
+                waktu_respon=answer_data.waktu_respon
+            ))
+        try:
+            system_instruction, user_prompt = self.next_question_prompts(job_role.nama_role, db_qa)
+            sentences = []
+            async for sentence in iter_sentences(self.llm_service.stream_content(system_instruction, user_prompt)):
+                sentences.append(sentence)
+                yield {"event": "sentence", "data": {"index": len(sentences) - 1, "text": sentence}}
+            await self._claim_answer(db_qa, answer_data, defer_evaluation=defer_evaluation)
+            if evaluation_task is not None:
+                scores_dict, narasi_feedback, saran_utama = await evaluation_task
+                await self._run_sync(self.repository.add_evaluation, db_session.session_id, *self.build_evaluation_rows(db_qa.qa_id, scores_dict, narasi_feedback, saran_utama))
+        except BaseException:
+            # Logic: Termasuk klien yang memutus stream (CancelledError/GeneratorExit); tidak ada yang disimpan.
+            if evaluation_task is not None:
+                evaluation_task.cancel()
+            await self.db.rollback()
+            raise
+
+        result = self._to_question_out(await self._add_next_question(db_qa, " ".join(sentences)))
+        question_text = db_qa.pertanyaan_llm
+        await self.db.commit()
+        if defer_evaluation:
+            self._schedule_deferred_evaluation(db_qa.qa_id, db_session.session_id, job_role.nama_role, question_text, answer_clean, answer_data.waktu_respon)
+        yield {"event": "done", "result": result}
 
     # ----------------------------------------------------------------------
     # FUNGSI BARU: GENERATE PERTANYAAN LANJUTAN (PROMPT CHAINING)
     # ----------------------------------------------------------------------
-    def _generate_next_question(self, session_id: int, previous_qa: PerQuestions) -> QuestionGenerateOut:
+    @staticmethod
+    def next_question_prompts(nama_role: str, previous_qa: PerQuestions, cv_context: Optional[str] = None, asked_questions: Optional[List[str]] = None) -> Tuple[str, str]:
         """
-        Menghasilkan pertanyaan lanjutan berdasarkan riwayat percakapan sebelumnya.
+        Menyusun prompt pertanyaan lanjutan berdasarkan riwayat percakapan sebelumnya.
+        cv_context dan asked_questions (opsional) dipakai sesi WebSocket yang menyimpan keduanya di memori.
         """
-        
-        # Ambil semua data sesi untuk konteks LLM
-        db_session = self.db.query(InterviewSession).filter(InterviewSession.session_id == session_id).first()
-        job_role = self.db.query(JobRole).filter(JobRole.role_id == db_session.role_id).first()
-        
         # 1. Prompt Chaining: Berikan Konteks
         # Logic: LLM harus tahu apa yang sudah ditanyakan dan bagaimana jawaban sebelumnya.
         system_instruction = (
-            f"Anda adalah pewawancara profesional untuk peran '{job_role.nama_role}'. "
+            f"Anda adalah pewawancara profesional untuk peran '{nama_role}'. "
             f"Tugas Anda adalah mengajukan pertanyaan lanjutan (follow-up) atau pertanyaan teknis baru. "
             f"Tanyakan hanya SATU pertanyaan."
         )
@@ -196,49 +625,170 @@ class InterviewService:
             f"A: {previous_qa.jawaban_mahasiswa_bersih}\n\n"
             f"Instruksi: Berdasarkan jawaban di atas, ajukan SATU pertanyaan LANJUTAN yang lebih spesifik "
             f"(misalnya: 'Bisakah Anda jelaskan lebih detail tentang metode X?') atau "
-            f"ajukan pertanyaan TEKNIS baru yang relevan dengan peran '{job_role.nama_role}'."
+            f"ajukan pertanyaan TEKNIS baru yang relevan dengan peran '{nama_role}'."
         )
+        if asked_questions:
+            # Logic: Mencegah LLM mengulang pertanyaan yang sudah diajukan di sesi yang sama.
+            user_prompt += "\n\nPertanyaan yang SUDAH diajukan (jangan diulang):\n" + "\n".join(f"- {q}" for q in asked_questions)
+        if cv_context:
+            user_prompt += f"\n\nKonteks CV Mahasiswa (RAG): ```{cv_context}```"
+        return system_instruction, user_prompt
 
-        pertanyaan_llm = self.llm_service.generate_content(system_instruction, user_prompt)
-        
-        # 2. Simpan Pertanyaan Baru
-        new_qa = PerQuestions(
-            session_id=session_id,
-            urutan_pertanyaan=previous_qa.urutan_pertanyaan + 1,
-            jenis_pertanyaan="Lanjutan (Chaining)",
-            pertanyaan_llm=pertanyaan_llm,
-            waktu_tanya=datetime.now()
+    async def _generate_next_question_text(self, nama_role: str, previous_qa: PerQuestions) -> str:
+        """Menghasilkan teks pertanyaan lanjutan (non-streaming)."""
+        system_instruction, user_prompt = self.next_question_prompts(nama_role, previous_qa)
+        return await self.llm_service.generate_content(system_instruction, user_prompt)
+
+    async def _add_next_question(self, previous_qa: PerQuestions, pertanyaan_llm: str) -> PerQuestions:
+        """Menambahkan pertanyaan baru (flush untuk qa_id; commit dilakukan oleh pemanggil)."""
+        return await self._run_sync(
+            self.repository.add_question,
+            previous_qa.session_id, previous_qa.urutan_pertanyaan + 1, "Lanjutan (Chaining)", pertanyaan_llm
         )
-        self.db.add(new_qa)
-        self.db.commit()
-        self.db.refresh(new_qa)
-        
-        # 3. Kembalikan Output
-        return QuestionGenerateOut(
-            qa_id=new_qa.qa_id,
-            session_id=session_id,
-            urutan_pertanyaan=new_qa.urutan_pertanyaan,
-            jenis_pertanyaan=new_qa.jenis_pertanyaan,
-            pertanyaan_llm=new_qa.pertanyaan_llm
+
+    # ----------------------------------------------------------------------
+    # FUNGSI BARU: EVALUASI TERTUNDA (BACKGROUND)
+    # ----------------------------------------------------------------------
+    def _schedule_deferred_evaluation(self, qa_id: int, session_id: int, nama_role: str, question: str, answer_clean: str, waktu_respon: Optional[int]):
+        """Menjadwalkan evaluasi jawaban di background. Status dapat dipantau lewat get_evaluation_status."""
+        task = asyncio.create_task(
+            self._run_deferred_evaluation(self.registry, qa_id, session_id, nama_role, question, answer_clean, waktu_respon)
         )
+        self.registry.deferred_evaluations[qa_id] = (session_id, task)
+
+    @staticmethod
+    async def _run_deferred_evaluation(registry: ResourceRegistry, qa_id: int, session_id: int, nama_role: str, question: str, answer_clean: str, waktu_respon: Optional[int]):
+        """
+        Evaluasi di background. Entri registry selalu dilepas di akhir; status berikutnya dibaca dari DB.
+        Logic: Jika gagal, klaim evaluasi dilepas sehingga poll status berikutnya atau giliran terakhir menjadwalkan ulang.
+        """
+        try:
+            scores_dict, narasi_feedback, saran_utama = await EvaluationService(registry).evaluate_answer(
+                job_role=nama_role, question=question, answer_clean=answer_clean, waktu_respon=waktu_respon
+            )
+            rows = InterviewService.build_evaluation_rows(qa_id, scores_dict, narasi_feedback, saran_utama)
+            await InterviewService._store_evaluation_rows(session_id, rows)
+        except Exception as e:
+            print(f"InterviewService: Evaluasi tertunda QA {qa_id} gagal: {e}")
+            metrics.inc("deferred_evaluation_failures")
+            async with AsyncSessionLocal() as db:
+                await db.run_sync(lambda sync_db: InterviewRepository(sync_db).release_evaluation(qa_id))
+                await db.commit()
+        finally:
+            registry.deferred_evaluations.pop(qa_id, None)
+
+    @staticmethod
+    async def _store_evaluation_rows(session_id: int, rows: Tuple[EvaluationMetrics, Feedback]):
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(lambda sync_db: InterviewRepository(sync_db).add_evaluation(session_id, *rows))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Logic: Evaluasi qa_id ini sudah disimpan proses lain (qa_id unik) -> agregat tidak dihitung dua kali.
+                await db.rollback()
+                print(f"InterviewService: Evaluasi QA {rows[0].qa_id} sudah tersimpan, hasil duplikat dibuang.")
+
+    async def _claim_evaluation(self, qa_id: int) -> bool:
+        """Mengklaim evaluasi tertunda (klaim kosong atau basi) dan commit; False jika worker lain memegang klaim segar."""
+        claimed_at = datetime.now()
+        stale_before = claimed_at - timedelta(seconds=settings.EVALUATION_CLAIM_STALE_SECONDS)
+        claimed = await self._run_sync(self.repository.claim_evaluation, qa_id, claimed_at, stale_before)
+        await self.db.commit()
+        return claimed
+
+    async def _await_deferred_evaluations(self, session_id: int, job_role: JobRoleOut):
+        """
+        Menunggu evaluasi tertunda milik sesi ini (dengan batas waktu LLM).
+        Logic: Jawaban yang masih belum dinilai (evaluasi gagal, atau worker pemiliknya mati) dijadwalkan ulang
+        dengan aturan klaim yang sama seperti get_evaluation_status, lalu ditunggu juga.
+        """
+        tasks = [task for sid, task in self.registry.deferred_evaluations.values() if sid == session_id]
+        if tasks:
+            await asyncio.wait(tasks, timeout=settings.LLM_TIMEOUT_SECONDS)
+
+        unevaluated = await self._run_sync(self.repository.load_unevaluated_answers, session_id)
+        await self._end_read_transaction()
+        retried = []
+        for db_qa in unevaluated:
+            if db_qa.qa_id in self.registry.deferred_evaluations or not await self._claim_evaluation(db_qa.qa_id):
+                continue
+            self._schedule_deferred_evaluation(
+                db_qa.qa_id, session_id, job_role.nama_role, db_qa.pertanyaan_llm, db_qa.jawaban_mahasiswa_bersih, db_qa.waktu_respon
+            )
+            retried.append(self.registry.deferred_evaluations[db_qa.qa_id][1])
+        if retried:
+            metrics.inc("deferred_evaluation_retries", len(retried))
+            await asyncio.wait(retried, timeout=settings.LLM_TIMEOUT_SECONDS)
+
+    async def get_evaluation_status(self, qa_id: int) -> Dict[str, Any]:
+        """
+        Mengambil skor dan feedback sebuah jawaban (untuk mode evaluasi tertunda).
+        Status: 'done', 'pending', 'failed' (Job Role sesi sudah tidak ada), atau 'not_answered'.
+        Evaluasi yang gagal tidak dilaporkan 'failed', melainkan dijadwalkan ulang oleh poll berikutnya ('pending').
+        """
+        db_qa = await self._run_sync(self.repository.load_question_evaluation, qa_id)
+        if not db_qa:
+            raise ValueError("Pertanyaan tidak ditemukan.")
+
+        result = {"qa_id": qa_id, "status": "done", "metrics": db_qa.metrics, "feedback": db_qa.feedback, "error": None}
+        if db_qa.metrics is not None:
+            return result
+
+        if db_qa.jawaban_mahasiswa_bersih is None:
+            result["status"] = "not_answered"
+            return result
+        result["status"] = "pending"
+        if qa_id in self.registry.deferred_evaluations:
+            return result # Logic: Evaluasi sedang berjalan di worker ini
+
+        job_role = await self.db.run_sync(self.registry.job_roles.get, db_qa.session.role_id)
+        if job_role is None:
+            result["status"] = "failed"
+            result["error"] = "Job Role sesi ini tidak ditemukan."
+            return result
+        # Logic: Jawaban tersimpan tanpa skor dan tidak ada evaluasi di worker ini. Dijadwalkan ulang HANYA jika
+        # klaim evaluasi kosong (evaluasi sebelumnya gagal) atau basi (worker pemiliknya mati); selain itu
+        # worker lain masih mengevaluasi -> tetap 'pending'.
+        if await self._claim_evaluation(qa_id):
+            self._schedule_deferred_evaluation(
+                qa_id, db_qa.session_id, job_role.nama_role, db_qa.pertanyaan_llm, db_qa.jawaban_mahasiswa_bersih, db_qa.waktu_respon
+            )
+        return result
+
+    # ----------------------------------------------------------------------
+    # FUNGSI BARU: DETAIL SESI (TRANSKRIP + SKOR + FEEDBACK)
+    # ----------------------------------------------------------------------
+    async def get_session_detail(self, session_id: int) -> InterviewSession:
+        """
+        Mengambil sesi lengkap untuk laporan.
+        Logic: Jumlah query tetap (sesi+role, pertanyaan, metrics, feedback) berapa pun jumlah pertanyaan,
+        menggantikan lazy load per relasi (N+1).
+        """
+        db_session = await self._run_sync(self.repository.load_session_detail, session_id)
+        if not db_session:
+            raise ValueError("Sesi wawancara tidak ditemukan.")
+        return db_session
+
+    # ----------------------------------------------------------------------
+    # FUNGSI BARU: SKOR LIVE SESI (O(1) dari agregat berjalan)
+    # ----------------------------------------------------------------------
+    async def get_session_score(self, session_id: int) -> Dict[str, Any]:
+        db_session = await self.db.get(InterviewSession, session_id)
+        if not db_session:
+            raise ValueError("Sesi wawancara tidak ditemukan.")
+        answered = db_session.jumlah_terjawab or 0
+        return {
+            "session_id": session_id,
+            "jumlah_terjawab": answered,
+            "skor_total_rata_rata": db_session.skor_total_rata_rata,
+            "rata_rata_rubrik": rubric_averages(db_session) if answered else {},
+            "selesai": db_session.tgl_selesai is not None,
+        }
 
     # ----------------------------------------------------------------------
     # FUNGSI BARU: MENGAKHIRI SESI
     # ----------------------------------------------------------------------
-    def end_interview_session(self, session_id: int):
-        """Menghitung skor rata-rata sesi dan menandai sesi selesai."""
-        db_session = self.db.query(InterviewSession).filter(InterviewSession.session_id == session_id).first()
-        
-        # 1. Ambil semua skor gabungan dari sesi ini
-        scores = self.db.query(EvaluationMetrics.skor_gabungan).join(PerQuestions).filter(PerQuestions.session_id == session_id).all()
-        
-        if scores:
-            total_score = sum([s[0] for s in scores])
-            avg_score = total_score / len(scores)
-            
-            # 2. Update sesi
-            db_session.skor_total_rata_rata = Decimal(f"{avg_score:.2f}") # Simpan 2 desimal
-        
-        db_session.tgl_selesai = datetime.now()
-        self.db.add(db_session)
-        self.db.commit()
\ No newline at end of file
+    async def end_interview_session(self, session_id: int):
+        """Menandai sesi selesai (skor rata-rata sudah diperbarui oleh agregat berjalan)."""
+        await self._run_sync(self.repository.close_session, session_id)
+        await self.db.commit()
@@ -0,0 +1,100 @@
+# File: backend/app/services/job_role_cache.py
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.metrics import metrics
+from app.db.models import JobRole
+from app.schemas import JobRoleOut
+
+
+class JobRoleCache:
+    """
+    Cache in-process data referensi Job Role (read-through).
+    Tanggung jawab tunggal: menyimpan snapshot semua role (JobRoleOut, immutable) beserta ETag-nya,
+    sehingga daftar role dan lookup per role_id di setiap giliran wawancara tidak menyentuh DB.
+
+    Logic: Snapshot dimuat saat startup dan dimuat ulang jika (a) di-invalidate oleh jalur admin,
+    atau (b) sudah lebih tua dari ttl_seconds (perubahan dari worker/proses lain tetap terlihat).
+    role_id tak dikenal memicu muat ulang paling banyak sekali per miss_reload_seconds.
+    """
+    def __init__(self, ttl_seconds: float = 300.0, miss_reload_seconds: float = 5.0):
+        self.ttl_seconds = ttl_seconds
+        self.miss_reload_seconds = miss_reload_seconds
+        self._lock = threading.Lock()
+        self._roles: Dict[int, JobRoleOut] = {}
+        self._etag: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+
+    @staticmethod
+    def _compute_etag(roles: List[JobRoleOut]) -> str:
+        payload = json.dumps([role.model_dump() for role in roles], sort_keys=True, ensure_ascii=False)
+        return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+    def load(self, db: Session) -> List[JobRoleOut]:
+        """Memuat ulang snapshot dari DB (satu query) dan menggantinya secara atomik."""
+        roles = [JobRoleOut.model_validate(role) for role in db.query(JobRole).order_by(JobRole.role_id).all()]
+        with self._lock:
+            self._roles = {role.role_id: role for role in roles}
+            self._etag = self._compute_etag(roles)
+            self._loaded_at = time.monotonic()
+        metrics.inc("job_role_cache_loads")
+        return roles
+
+    def invalidate(self):
+        """Menandai snapshot kedaluwarsa; akses berikutnya memuat ulang dari DB."""
+        with self._lock:
+            self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and (time.monotonic() - self._loaded_at) < self.ttl_seconds
+
+    def _ensure_loaded(self, db: Session):
+        if not self._is_fresh():
+            metrics.inc("job_role_cache_misses")
+            self.load(db)
+        else:
+            metrics.inc("job_role_cache_hits")
+
+    def snapshot(self, db: Session) -> Tuple[List[JobRoleOut], str]:
+        """Daftar role beserta ETag-nya (diambil bersamaan agar selalu konsisten)."""
+        self._ensure_loaded(db)
+        with self._lock:
+            return list(self._roles.values()), self._etag
+
+    def get(self, db: Session, role_id: int) -> Optional[JobRoleOut]:
+        self._ensure_loaded(db)
+        with self._lock:
+            role = self._roles.get(role_id)
+        if role is None and self._may_reload_on_miss():
+            # Logic: role_id tak dikenal bisa berarti role baru dari worker lain -> muat ulang sekali.
+            # Snapshot yang baru dimuat tidak dimuat ulang lagi, sehingga role_id acak dari klien
+            # tidak bisa memaksa query tabel job_roles di setiap request.
+            self.load(db)
+            with self._lock:
+                role = self._roles.get(role_id)
+        return role
+
+    def _may_reload_on_miss(self) -> bool:
+        with self._lock:
+            loaded_at = self._loaded_at
+        if loaded_at is not None and (time.monotonic() - loaded_at) < self.miss_reload_seconds:
+            metrics.inc("job_role_cache_miss_reload_skipped")
+            return False
+        return True
+
+    def peek(self) -> List[JobRoleOut]:
+        """Isi cache saat ini TANPA memuat ulang (boleh kedaluwarsa)."""
+        with self._lock:
+            return list(self._roles.values())
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "roles": len(self._roles),
+                "etag": self._etag,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            }
@@ -2,15 +2,71 @@
 
 from sqlalchemy.orm import Session
 from app.db.models import JobRole
+from app.core.registry import ResourceRegistry
+from app.schemas import JobRoleCreate, JobRoleOut
+from app.services.rag_service import RAGService
+from app.services.opening_question_bank import OpeningQuestionBank
+from typing import List, Optional, Set, Tuple
 
 class JobRoleService:
-    def __init__(self, db: Session):
+    """
+    Modul logika bisnis Job Role.
+    Tanggung jawab tunggal: membaca role dari cache in-process (registry.job_roles) dan, untuk jalur admin,
+    menulis perubahan ke DB lalu menyegarkan cache + embedding kueri RAG yang di-pin per role.
+    """
+    def __init__(self, db: Session, registry: ResourceRegistry):
         self.db = db
+        self.registry = registry
 
-    def get_all_job_roles(self):
-        """Mengambil semua daftar Job Role yang tersedia dari DB."""
-        return self.db.query(JobRole).all()
-        
-    def get_role_by_id(self, role_id: int):
-        """Mengambil detail Job Role berdasarkan ID."""
-        return self.db.query(JobRole).filter(JobRole.role_id == role_id).first()
\ No newline at end of file
+    def get_all_job_roles(self) -> Tuple[List[JobRoleOut], str]:
+        """Mengambil semua daftar Job Role yang tersedia beserta ETag-nya (dari cache)."""
+        return self.registry.job_roles.snapshot(self.db)
+
+    def get_role_by_id(self, role_id: int) -> Optional[JobRoleOut]:
+        """Mengambil detail Job Role berdasarkan ID (dari cache)."""
+        return self.registry.job_roles.get(self.db, role_id)
+
+    # ----------------------------------------------------------------------
+    # JALUR ADMIN (menulis ke DB lalu menyegarkan cache)
+    # ----------------------------------------------------------------------
+    def create_job_role(self, role: JobRoleCreate) -> JobRoleOut:
+        db_role = JobRole(nama_role=role.nama_role, deskripsi=role.deskripsi)
+        self.db.add(db_role)
+        self.db.commit()
+        self.refresh_cache()
+        return self.get_role_by_id(db_role.role_id)
+
+    def update_job_role(self, role_id: int, role: JobRoleCreate) -> Optional[JobRoleOut]:
+        db_role = self.db.get(JobRole, role_id)
+        if db_role is None:
+            return None
+        if db_role.nama_role != role.nama_role:
+            # Logic: Nama role ada di prompt pembuka -> kandidat pra-generate lama tidak berlaku lagi.
+            OpeningQuestionBank.evict_role(self.db, role_id)
+        db_role.nama_role = role.nama_role
+        db_role.deskripsi = role.deskripsi
+        self.db.commit()
+        self.refresh_cache()
+        return self.get_role_by_id(role_id)
+
+    def refresh_cache(self) -> List[JobRoleOut]:
+        """
+        Memuat ulang cache Job Role dari DB dan menyelaraskan embedding kueri RAG yang di-pin.
+        Logic: Template kueri role yang sudah tidak ada di-unpin; role baru/berganti nama dihitung
+        embedding-nya dalam satu batch. Dipanggil juga setelah role diubah langsung di DB (seed/SQL).
+        """
+        old_names: Set[str] = {role.nama_role for role in self.registry.job_roles.peek()}
+        roles = self.registry.job_roles.load(self.db)
+        new_names: Set[str] = {role.nama_role for role in roles}
+
+        rag_service = RAGService(self.registry)
+        for nama_role in old_names - new_names:
+            self.registry.query_cache.unpin(rag_service.build_role_query(nama_role))
+        added = sorted(new_names - old_names)
+        if added and self.registry.embedder is not None:
+            try:
+                rag_service.precompute_role_queries(added)
+            except Exception as e:
+                # Logic: Embedding yang belum di-pin hanya berarti cache miss pertama; bukan kegagalan admin.
+                print(f"JobRoleService: Gagal menghitung embedding kueri role baru: {e}")
+        return roles
@@ -0,0 +1,283 @@
+# File: backend/app/services/live_interview.py
+
+import asyncio
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.core.metrics import metrics
+from app.core.registry import ResourceRegistry
+from app.db.database import AsyncSessionLocal
+from app.db.interview_repository import InterviewRepository
+from app.db.models import InterviewSession, PerQuestions, EvaluationMetrics, Feedback
+from app.schemas import InterviewStart, QuestionGenerateOut, EvaluationMetricsOut, FeedbackOut
+from app.services.evaluation_service import EvaluationService
+from app.services.interview_service import InterviewService, MAX_QUESTIONS_PER_SESSION, TurnAlreadyAnswered
+from app.services.llm_service import LLMService, iter_sentences
+
+
+class TranscriptTurn(NamedTuple):
+    """Satu tanya-jawab di transkrip sesi live (atributnya sama dengan kolom PerQuestions yang dipakai prompt)."""
+    qa_id: int
+    urutan_pertanyaan: int
+    pertanyaan_llm: str
+    jawaban_mahasiswa_bersih: Optional[str] = None
+    skor_gabungan: Optional[Decimal] = None
+
+
+class LiveInterviewState:
+    """
+    State per koneksi WebSocket: role, konteks CV hasil RAG, dan transkrip berjalan.
+    Logic: Data yang sebelumnya di-query ulang setiap giliran disimpan di sini sekali saja.
+    """
+    def __init__(self, session_id: int, mahasiswa_id: int, role_id: int, nama_role: str, cv_context: str):
+        self.session_id = session_id
+        self.mahasiswa_id = mahasiswa_id
+        self.role_id = role_id
+        self.nama_role = nama_role
+        self.cv_context = cv_context
+        self.transcript: List[TranscriptTurn] = []
+        self.ended = False
+
+    @property
+    def current_turn(self) -> Optional[TranscriptTurn]:
+        """Pertanyaan terakhir yang belum dijawab (None jika sesi selesai)."""
+        if self.ended or not self.transcript or self.transcript[-1].jawaban_mahasiswa_bersih is not None:
+            return None
+        return self.transcript[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        current = self.current_turn
+        return {
+            "session_id": self.session_id,
+            "nama_role": self.nama_role,
+            "ended": self.ended,
+            "transcript": [turn._asdict() for turn in self.transcript],
+            "current_question": self.question_out(current).model_dump() if current else None,
+        }
+
+    def question_out(self, turn: TranscriptTurn) -> QuestionGenerateOut:
+        return QuestionGenerateOut(
+            qa_id=turn.qa_id,
+            session_id=self.session_id,
+            urutan_pertanyaan=turn.urutan_pertanyaan,
+            jenis_pertanyaan="Pembuka (RAG)" if turn.urutan_pertanyaan == 1 else "Lanjutan (Chaining)",
+            pertanyaan_llm=turn.pertanyaan_llm
+        )
+
+
+class LiveInterviewSession:
+    """
+    Pengendali satu sesi wawancara lewat WebSocket.
+    Tanggung jawab tunggal: menjalankan giliran tanya-jawab dari state di memori, dengan
+    satu putaran LLM (evaluasi + pertanyaan lanjutan bersamaan) dan satu transaksi DB per giliran.
+    """
+    def __init__(self, registry: ResourceRegistry):
+        self.registry = registry
+        self.llm_service = LLMService(registry)
+        self.evaluation_service = EvaluationService(registry)
+        self.state: Optional[LiveInterviewState] = None
+
+    # ----------------------------------------------------------------------
+    # MEMULAI & MELANJUTKAN SESI
+    # ----------------------------------------------------------------------
+    async def start(self, session_data: InterviewStart) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Membuat sesi baru; kalimat pertanyaan pembuka di-stream, lalu event 'question'.
+        Logic: Sumber pertanyaan sama dengan /interview/start (bank pra-generate dulu). Pada hit bank,
+        RAG untuk konteks CV giliran berikutnya dijalankan setelah sesi tersimpan (transaksi sudah selesai).
+        """
+        async with AsyncSessionLocal() as db:
+            interview_service = InterviewService(db, self.registry)
+            mahasiswa, job_role, cv_data = await interview_service.load_opening_data(session_data)
+            stream, cv_context = await interview_service.opening_question_stream(mahasiswa, job_role, cv_data)
+
+            sentences = []
+            async for sentence in iter_sentences(stream):
+                sentences.append(sentence)
+                yield {"type": "sentence", "index": len(sentences) - 1, "text": sentence}
+
+            db_question = await interview_service.persist_opening_question(
+                mahasiswa, job_role, cv_data.cv_id, " ".join(sentences)
+            )
+            if cv_context is None:
+                cv_context = await interview_service.retrieve_cv_context(
+                    mahasiswa.mahasiswa_id, job_role.nama_role, cv_data.cv_id
+                )
+            self.state = LiveInterviewState(
+                db_question.session_id, mahasiswa.mahasiswa_id, job_role.role_id, job_role.nama_role, cv_context
+            )
+            self.state.transcript.append(TranscriptTurn(db_question.qa_id, 1, db_question.pertanyaan_llm))
+        yield {"type": "question", "data": self.state.question_out(self.state.transcript[-1]).model_dump()}
+
+    async def resume(self, session_id: int) -> Dict[str, Any]:
+        """
+        Memulihkan state dari DB setelah koneksi terputus (satu query sesi + role + pertanyaan + skor).
+        Logic: Konteks CV tidak disimpan di DB, sehingga diambil ulang lewat RAG atas CV yang dipakai sesi ini
+        (sesi lama tanpa cv_id -> semua CV milik mahasiswa).
+        """
+        async with AsyncSessionLocal() as db:
+            db_session = await db.run_sync(self._load_session, session_id)
+            if db_session is None:
+                raise ValueError("Sesi wawancara tidak ditemukan.")
+            cv_context = await InterviewService(db, self.registry).retrieve_cv_context(
+                db_session.mahasiswa_id, db_session.job_role.nama_role, db_session.cv_id
+            )
+        state = LiveInterviewState(
+            db_session.session_id, db_session.mahasiswa_id, db_session.role_id, db_session.job_role.nama_role, cv_context
+        )
+        self._restore_transcript(state, db_session)
+        self.state = state
+        return {"type": "session", "data": state.to_dict()}
+
+    @staticmethod
+    def _load_session(db: Session, session_id: int) -> Optional[InterviewSession]:
+        return db.query(InterviewSession).options(
+            joinedload(InterviewSession.job_role),
+            selectinload(InterviewSession.questions).joinedload(PerQuestions.metrics),
+            selectinload(InterviewSession.questions).joinedload(PerQuestions.feedback)
+        ).filter(InterviewSession.session_id == session_id).first()
+
+    @staticmethod
+    def _restore_transcript(state: LiveInterviewState, db_session: InterviewSession):
+        state.transcript = [
+            TranscriptTurn(
+                qa.qa_id, qa.urutan_pertanyaan, qa.pertanyaan_llm, qa.jawaban_mahasiswa_bersih,
+                qa.metrics.skor_gabungan if qa.metrics is not None else None
+            )
+            for qa in sorted(db_session.questions, key=lambda q: q.urutan_pertanyaan)
+        ]
+        state.ended = db_session.tgl_selesai is not None
+
+    # ----------------------------------------------------------------------
+    # SATU GILIRAN: JAWABAN -> EVALUASI + PERTANYAAN LANJUTAN -> SATU TRANSAKSI
+    # ----------------------------------------------------------------------
+    async def answer(self, jawaban_mentah: str, waktu_respon: Optional[int] = None, is_final: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        state = self.state
+        if state is None:
+            raise ValueError("Belum ada sesi aktif. Kirim 'start' atau 'resume' terlebih dahulu.")
+        turn = state.current_turn
+        if turn is None:
+            raise ValueError("Tidak ada pertanyaan yang menunggu jawaban.")
+
+        # 1. Preprocessing Jawaban
+        answer_clean = jawaban_mentah.strip()
+        answered_turn = turn._replace(jawaban_mahasiswa_bersih=answer_clean)
+        ends_session = is_final or turn.urutan_pertanyaan >= MAX_QUESTIONS_PER_SESSION
+
+        # 2. Evaluasi dan pertanyaan lanjutan BERSAMAAN (satu putaran LLM)
+        evaluation_task = asyncio.create_task(self.evaluation_service.evaluate_answer(
+            job_role=state.nama_role, question=turn.pertanyaan_llm, answer_clean=answer_clean, waktu_respon=waktu_respon
+        ))
+        sentences = []
+        try:
+            if not ends_session:
+                system_instruction, user_prompt = InterviewService.next_question_prompts(
+                    state.nama_role, answered_turn, state.cv_context,
+                    asked_questions=[t.pertanyaan_llm for t in state.transcript[:-1]]
+                )
+                async for sentence in iter_sentences(self.llm_service.stream_content(system_instruction, user_prompt)):
+                    sentences.append(sentence)
+                    yield {"type": "sentence", "index": len(sentences) - 1, "text": sentence}
+            scores_dict, narasi_feedback, saran_utama = await evaluation_task
+        except BaseException:
+            evaluation_task.cancel()
+            raise
+
+        # 3. Satu transaksi: jawaban, skor, feedback, dan pertanyaan baru (atau penutupan sesi)
+        db_metrics, db_feedback = InterviewService.build_evaluation_rows(turn.qa_id, scores_dict, narasi_feedback, saran_utama)
+        # Logic: Payload dibentuk sebelum commit, karena objek ORM kedaluwarsa setelah sesi DB ditutup.
+        evaluation_event = {"type": "evaluation", "qa_id": turn.qa_id, "data": {
+            "metrics": EvaluationMetricsOut.model_validate(db_metrics).model_dump(),
+            "feedback": FeedbackOut.model_validate(db_feedback).model_dump(),
+        }}
+        answered_turn = answered_turn._replace(skor_gabungan=db_metrics.skor_gabungan)
+        scored_transcript = state.transcript[:-1] + [answered_turn]
+        next_turn = None if ends_session else TranscriptTurn(0, turn.urutan_pertanyaan + 1, " ".join(sentences))
+        try:
+            new_qa_id, average = await self._write_turn(
+                state.session_id, turn, jawaban_mentah, answer_clean, waktu_respon,
+                db_metrics, db_feedback, next_turn, ends_session
+            )
+        except TurnAlreadyAnswered:
+            # Logic: Giliran ini sudah tersimpan (mis. resume di koneksi lain) -> hasil LLM dibuang, hasil tersimpan diputar ulang.
+            async for event in self._replay_turn(turn.qa_id):
+                yield event
+            return
+
+        # 4. Perbarui state di memori SETELAH commit berhasil
+        state.transcript = scored_transcript
+        yield evaluation_event
+        if ends_session:
+            state.ended = True
+            yield {"type": "session_ended", "session_id": state.session_id, "skor_total_rata_rata": average}
+        else:
+            state.transcript.append(next_turn._replace(qa_id=new_qa_id))
+            yield {"type": "question", "data": state.question_out(state.transcript[-1]).model_dump()}
+
+    @staticmethod
+    async def _write_turn(session_id: int, turn: TranscriptTurn, jawaban_mentah: str, answer_clean: str, waktu_respon: Optional[int],
+                          db_metrics: EvaluationMetrics, db_feedback: Feedback, next_turn: Optional[TranscriptTurn],
+                          ends_session: bool) -> Tuple[Optional[int], Decimal]:
+        """
+        Menulis seluruh hasil satu giliran dalam SATU transaksi (tanpa membaca ulang state giliran).
+        Mengembalikan (qa_id pertanyaan baru, skor_total_rata_rata sesi yang ditulis transaksi ini).
+        Logic: Jawaban disimpan dengan compare-and-set yang sama dengan jalur HTTP (claim_answer);
+        jika sudah dijawab, TurnAlreadyAnswered dilempar dan transaksi dibatalkan.
+        """
+        def write(db: Session) -> Tuple[Optional[int], Decimal]:
+            repository = InterviewRepository(db)
+            if not repository.claim_answer(turn.qa_id, jawaban_mentah, answer_clean, waktu_respon):
+                raise TurnAlreadyAnswered(session_id, turn.urutan_pertanyaan)
+            average = repository.add_evaluation(session_id, db_metrics, db_feedback)
+            new_qa_id = None
+            if next_turn is not None:
+                new_qa_id = repository.add_question(
+                    session_id, next_turn.urutan_pertanyaan, "Lanjutan (Chaining)", next_turn.pertanyaan_llm
+                ).qa_id
+            if ends_session:
+                average = repository.close_session(session_id)
+            return new_qa_id, average
+
+        async with AsyncSessionLocal() as db:
+            result = await db.run_sync(write)
+            await db.commit()
+            return result
+
+    async def _replay_turn(self, qa_id: int) -> AsyncIterator[Dict[str, Any]]:
+        """Event untuk giliran yang sudah tersimpan: evaluasi tersimpan, lalu pertanyaan berikut atau akhir sesi."""
+        metrics.inc("answer_replays")
+        state = self.state
+        async with AsyncSessionLocal() as db:
+            db_session = await db.run_sync(self._load_session, state.session_id)
+        self._restore_transcript(state, db_session)
+        db_qa = next(qa for qa in db_session.questions if qa.qa_id == qa_id)
+        if db_qa.metrics is not None and db_qa.feedback is not None:
+            yield {"type": "evaluation", "qa_id": qa_id, "data": {
+                "metrics": EvaluationMetricsOut.model_validate(db_qa.metrics).model_dump(),
+                "feedback": FeedbackOut.model_validate(db_qa.feedback).model_dump(),
+            }}
+        current = state.current_turn
+        if current is not None:
+            yield {"type": "question", "data": state.question_out(current).model_dump()}
+        else:
+            yield {"type": "session_ended", "session_id": state.session_id, "skor_total_rata_rata": db_session.skor_total_rata_rata}
+
+    async def end(self) -> Dict[str, Any]:
+        """Mengakhiri sesi tanpa menjawab pertanyaan yang tersisa."""
+        state = self.state
+        if state is None:
+            raise ValueError("Belum ada sesi aktif.")
+        average = await self._close_session(state.session_id, already_ended=state.ended)
+        state.ended = True
+        return {"type": "session_ended", "session_id": state.session_id, "skor_total_rata_rata": average}
+
+    @staticmethod
+    async def _close_session(session_id: int, already_ended: bool) -> Optional[Decimal]:
+        """Menutup sesi (jika belum) dan mengembalikan skor_total_rata_rata yang tersimpan di DB."""
+        async with AsyncSessionLocal() as db:
+            if already_ended:
+                db_session = await db.get(InterviewSession, session_id)
+                return db_session.skor_total_rata_rata if db_session is not None else None
+            average = await db.run_sync(lambda sync_db: InterviewRepository(sync_db).close_session(session_id))
+            await db.commit()
+            return average
@@ -0,0 +1,199 @@
+# File: backend/app/services/llm_response_cache.py
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+def make_cache_key(use_case: str, model: str, system_prompt: str, user_prompt: str, generation_config: Dict[str, Any]) -> str:
+    """Hash SHA-256 dari semua masukan yang menentukan respons LLM."""
+    payload = json.dumps(
+        [use_case, model, system_prompt, user_prompt, generation_config],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Cache respons LLM Gateway (lihat LLMService.generate_content / stream_content).
+    Tanggung jawab tunggal: menyimpan teks respons per kunci hash dengan TTL dan batas jumlah entri,
+    serta mencatat hit/miss per use case (misalnya 'evaluation', 'opening_question').
+    Backend konkret: MemoryLLMResponseCache (per proses) dan SqliteLLMResponseCache (dipakai bersama antar worker).
+    """
+    backend = "base"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._stats_lock = threading.Lock()
+        self._use_case_stats: Dict[str, Dict[str, int]] = {}
+
+    # --- Diimplementasikan oleh backend (sinkron; dipanggil lewat get/put) ---
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _put(self, key: str, value: str):
+        raise NotImplementedError
+
+    def _delete(self, key: str):
+        raise NotImplementedError
+
+    def _size(self) -> int:
+        raise NotImplementedError
+
+    # --- API asinkron untuk LLMService ---
+    async def get(self, key: str, use_case: str) -> Optional[str]:
+        value = self._get(key)
+        self._record(use_case, hit=value is not None)
+        return value
+
+    async def put(self, key: str, value: str):
+        self._put(key, value)
+
+    async def delete(self, key: str):
+        self._delete(key)
+
+    def close(self):
+        pass
+
+    def _record(self, use_case: str, hit: bool):
+        with self._stats_lock:
+            stats = self._use_case_stats.setdefault(use_case, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+        metrics.inc(f"llm_cache_{'hits' if hit else 'misses'}_{use_case}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            use_cases = {
+                use_case: {**counts, "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 3)}
+                for use_case, counts in self._use_case_stats.items()
+            }
+        return {"backend": self.backend, "entries": self._size(), "max_entries": self.max_entries, "use_cases": use_cases}
+
+
+class MemoryLLMResponseCache(LLMResponseCache):
+    """LRU in-memory per proses (entri kedaluwarsa dibuang saat dibaca)."""
+    backend = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__(max_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SqliteLLMResponseCache(LLMResponseCache):
+    """
+    Cache di file SQLite (WAL), dipakai bersama oleh semua worker di satu host dan bertahan saat restart.
+    Logic: Operasi file dijalankan di thread (asyncio.to_thread) agar tidak memblokir event loop.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        super().__init__(max_entries, ttl_seconds)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def _put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now)
+            )
+            # Logic: Entri kedaluwarsa dibuang dulu, lalu entri yang paling lama tidak dipakai di atas batas.
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def _size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    async def get(self, key: str, use_case: str) -> Optional[str]:
+        value = await asyncio.to_thread(self._get, key)
+        self._record(use_case, hit=value is not None)
+        return value
+
+    async def put(self, key: str, value: str):
+        await asyncio.to_thread(self._put, key, value)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Membuat backend cache sesuai LLM_CACHE_BACKEND ('memory', 'sqlite', atau 'none')."""
+    backend = settings.LLM_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SqliteLLMResponseCache(settings.LLM_CACHE_SQLITE_PATH, settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+    if backend == "memory":
+        return MemoryLLMResponseCache(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+    raise ValueError(f"LLM_CACHE_BACKEND tidak dikenal: {settings.LLM_CACHE_BACKEND}")
@@ -1,40 +1,329 @@
 from google import genai
 from google.genai.errors import APIError
 from app.core.config import settings
-from typing import Optional
+from app.core.metrics import metrics
+from app.core.registry import ResourceRegistry
+from app.services.llm_response_cache import make_cache_key
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Dict, Optional, Type
+import asyncio
+import json
+import re
+import time
+
+
+class LLMError(Exception):
+    """
+    Error terstruktur dari LLM Gateway (menggantikan string "Error: ...").
+    code: 'not_configured', 'timeout', 'rate_limited', 'api_error', 'empty_response', 'invalid_output', 'unexpected'
+    """
+    def __init__(self, code: str, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.retryable = retryable
+
+    def to_dict(self) -> dict:
+        return {"code": self.code, "message": self.message, "retryable": self.retryable}
+
+
+# Batas kalimat untuk streaming (akhir kalimat diikuti spasi/baris baru)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+async def iter_sentences(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Menggabungkan potongan token streaming menjadi kalimat utuh.
+    Logic: TTS di frontend butuh kalimat lengkap; kalimat dikirim segera setelah batasnya terlihat.
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        parts = _SENTENCE_END.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Mengambil objek JSON pertama dari output LLM yang tidak rapi (fallback jika output terstruktur gagal).
+    Logic: Satu kali pindai karakter demi karakter (melacak string, escape, dan kedalaman kurung):
+    teks sebelum '{' (pembuka, pagar markdown) diabaikan, koma sebelum '}'/']' dibuang, dan output
+    yang terpotong ditutup dengan melengkapi string serta kurung yang masih terbuka.
+    Mengembalikan None jika tidak ada objek yang bisa diselamatkan.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    out = []
+    closers = []
+    in_string = False
+    escaped = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if not closers:
+                break
+            # Koma sebelum penutup (trailing comma) tidak valid di JSON
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            closers.pop()
+            out.append(ch)
+            if not closers:
+                break
+            continue
+        out.append(ch)
+
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    if closers:
+        # Output terpotong: buang pasangan kunci/nilai yang belum lengkap di ekor, lalu tutup kurung.
+        candidate = "".join(out).rstrip()
+        candidate = re.sub(r'(,\s*"[^"]*"\s*:?\s*|,\s*|:\s*)$', "", candidate)
+        candidate += "".join(reversed(closers))
+    else:
+        candidate = "".join(out)
+
+    try:
+        data = json.loads(candidate, strict=False) # strict=False: baris baru mentah di dalam string diterima
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
 
 class LLMService:
     """
-    Modul Tingkat Rendah untuk interaksi langsung dengan Google Gemini.
-    Tanggung jawab tunggal: mengirim prompt dan menerima respons.
+    Modul Tingkat Rendah untuk interaksi langsung dengan Google Gemini (LLM Gateway asinkron).
+    Tanggung jawab tunggal: mengirim prompt dan menerima respons, dengan batas waktu per panggilan
+    serta batas konkurensi global dan per model. Pemanggil bisa opt-in ke cache respons
+    (registry.llm_cache) lewat argumen cache_use_case.
     """
-    def __init__(self):
-        # Inisialisasi Klien Gemini
-        # Logic: Memuat kunci API dari settings Pydantic
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        self.model = "gemini-2.5-flash" # Model cepat untuk real-time chat
+    def __init__(self, registry: ResourceRegistry):
+        # Klien Gemini (dibagikan oleh Registry)
+        # Logic: Klien dibuat sekali saat startup, sehingga pool koneksinya dipakai ulang.
+        self.client = registry.llm_client
+        self.registry = registry
+        self.model = settings.LLM_MODEL_NAME # Model cepat untuk real-time chat
+
+    def _model_semaphore(self, model: str) -> asyncio.Semaphore:
+        """Semaphore per model (dibuat saat model pertama kali dipakai)."""
+        semaphores = self.registry.llm_model_semaphores
+        if model not in semaphores:
+            semaphores[model] = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY_PER_MODEL)
+        return semaphores[model]
+
+    def _cache_key(self, cache_use_case: Optional[str], model: str, system_prompt: str, user_prompt: str, temperature: float,
+                   response_schema: Optional[Type[BaseModel]] = None) -> Optional[str]:
+        """Kunci cache untuk panggilan ini, atau None jika use case tidak memakai cache."""
+        if cache_use_case is None or self.registry.llm_cache is None:
+            return None
+        enabled = {use_case.strip() for use_case in settings.LLM_CACHE_USE_CASES.split(",")}
+        if cache_use_case not in enabled:
+            return None
+        generation_config = {"temperature": temperature}
+        if response_schema is not None:
+            # Logic: Skema ikut menjadi kunci, sehingga perubahan skema tidak melayani respons lama.
+            generation_config["response_schema"] = response_schema.model_json_schema()
+        return make_cache_key(cache_use_case, model, system_prompt, user_prompt, generation_config)
 
-    def generate_content(self, system_prompt: str, user_prompt: str) -> Optional[str]:
+    async def forget_cached(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        cache_use_case: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        response_schema: Optional[Type[BaseModel]] = None
+    ):
+        """Membuang respons dari cache (misalnya jika pemanggil gagal mem-parsing respons tersebut)."""
+        key = self._cache_key(cache_use_case, model or self.model, system_prompt, user_prompt, temperature, response_schema)
+        if key is not None:
+            await self.registry.llm_cache.delete(key)
+
+    @staticmethod
+    def _to_llm_error(e: Exception, deadline: float) -> LLMError:
+        """Memetakan exception mentah (timeout, APIError, lainnya) ke LLMError terstruktur."""
+        if isinstance(e, LLMError):
+            return e
+        if isinstance(e, asyncio.TimeoutError):
+            metrics.inc("llm_errors_timeout")
+            return LLMError("timeout", f"LLM tidak merespons dalam {deadline} detik.", retryable=True)
+        if isinstance(e, APIError):
+            print(f"LLM API Error: {e}")
+            code = "rate_limited" if e.code == 429 else "api_error"
+            metrics.inc(f"llm_errors_{code}")
+            return LLMError(code, f"Gagal menghubungi LLM: {e.message}", retryable=e.code == 429 or e.code >= 500)
+        print(f"Unexpected LLM Error: {e}")
+        metrics.inc("llm_errors_unexpected")
+        return LLMError("unexpected", "Terjadi kesalahan tak terduga pada LLM Service.")
+
+    async def generate_content(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        temperature: float = 0.7, # Memberi sedikit variasi pada jawaban
+        cache_use_case: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
         """
         Mengirim System Prompt dan User Prompt ke LLM.
+        Logic: Deadline mencakup waktu menunggu slot konkurensi DAN waktu respons model.
+        Jika cache_use_case diisi (dan diaktifkan di LLM_CACHE_USE_CASES), respons untuk masukan
+        yang identik diambil dari cache tanpa memanggil model. Jika response_schema diisi, model
+        diminta mengeluarkan JSON sesuai skema Pydantic tersebut (mode output terstruktur).
+        Melempar LLMError jika gagal.
         """
-        if not settings.GEMINI_API_KEY:
-             return "ERROR: Kunci API Gemini tidak ditemukan. Tidak dapat menghasilkan konten."
+        model = model or self.model
+        cache_key = self._cache_key(cache_use_case, model, system_prompt, user_prompt, temperature, response_schema)
+        if cache_key is not None:
+            cached = await self.registry.llm_cache.get(cache_key, cache_use_case)
+            if cached is not None:
+                return cached
 
-        try:
-            # Menggunakan System Instruction untuk mengatur persona (Pewawancara)
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=user_prompt,
-                config=genai.types.GenerateContentConfig(
+        if not settings.GEMINI_API_KEY or self.client is None:
+            raise LLMError("not_configured", "Kunci API Gemini tidak ditemukan. Tidak dapat menghasilkan konten.")
+
+        deadline = timeout or settings.LLM_TIMEOUT_SECONDS
+        started_at = time.perf_counter()
+        metrics.inc("llm_calls")
+
+        async def _call() -> str:
+            async with self.registry.llm_semaphore, self._model_semaphore(model):
+                metrics.observe("llm_slot_wait_ms", (time.perf_counter() - started_at) * 1000)
+                # Menggunakan System Instruction untuk mengatur persona (Pewawancara)
+                config = genai.types.GenerateContentConfig(
                     system_instruction=system_prompt,
-                    temperature=0.7 # Memberi sedikit variasi pada jawaban
+                    temperature=temperature
                 )
-            )
-            return response.text
-        except APIError as e:
-            print(f"LLM API Error: {e}")
-            return f"Error: Gagal menghubungi LLM. {e}"
+                if response_schema is not None:
+                    config.response_mime_type = "application/json"
+                    config.response_schema = response_schema
+                response = await self.client.aio.models.generate_content(
+                    model=model,
+                    contents=user_prompt,
+                    config=config
+                )
+                return response.text
+
+        try:
+            text = await asyncio.wait_for(_call(), timeout=deadline)
         except Exception as e:
-            print(f"Unexpected LLM Error: {e}")
-            return "Error: Terjadi kesalahan tak terduga pada LLM Service."
+            raise self._to_llm_error(e, deadline)
+        finally:
+            metrics.observe("llm_latency_ms", (time.perf_counter() - started_at) * 1000)
+
+        if not text:
+            metrics.inc("llm_errors_empty_response")
+            raise LLMError("empty_response", "LLM mengembalikan respons kosong.", retryable=True)
+        if cache_key is not None:
+            # Logic: Hanya respons sukses dan tidak kosong yang disimpan.
+            await self.registry.llm_cache.put(cache_key, text)
+        return text
+
+    async def stream_content(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        temperature: float = 0.7,
+        cache_use_case: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Versi streaming dari generate_content: menghasilkan potongan teks segera setelah model mengirimnya.
+        Logic: Deadline yang sama berlaku untuk seluruh stream (slot konkurensi + semua potongan);
+        slot konkurensi ditahan sampai stream selesai atau dibatalkan klien.
+        Cache hit dikirim sebagai satu potongan; stream yang selesai utuh disimpan ke cache.
+        """
+        model = model or self.model
+        cache_key = self._cache_key(cache_use_case, model, system_prompt, user_prompt, temperature)
+        if cache_key is not None:
+            cached = await self.registry.llm_cache.get(cache_key, cache_use_case)
+            if cached is not None:
+                yield cached
+                return
+
+        if not settings.GEMINI_API_KEY or self.client is None:
+            raise LLMError("not_configured", "Kunci API Gemini tidak ditemukan. Tidak dapat menghasilkan konten.")
+
+        deadline = timeout or settings.LLM_TIMEOUT_SECONDS
+        started_at = time.perf_counter()
+        metrics.inc("llm_stream_calls")
+
+        def remaining() -> float:
+            left = deadline - (time.perf_counter() - started_at)
+            if left <= 0:
+                raise asyncio.TimeoutError()
+            return left
+
+        received_text = False
+        chunks = []
+        try:
+            await asyncio.wait_for(self.registry.llm_semaphore.acquire(), timeout=remaining())
+            try:
+                model_semaphore = self._model_semaphore(model)
+                await asyncio.wait_for(model_semaphore.acquire(), timeout=remaining())
+                try:
+                    metrics.observe("llm_slot_wait_ms", (time.perf_counter() - started_at) * 1000)
+                    stream = await asyncio.wait_for(
+                        self.client.aio.models.generate_content_stream(
+                            model=model,
+                            contents=user_prompt,
+                            config=genai.types.GenerateContentConfig(
+                                system_instruction=system_prompt,
+                                temperature=temperature
+                            )
+                        ),
+                        timeout=remaining()
+                    )
+                    iterator = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining())
+                        except StopAsyncIteration:
+                            break
+                        if not chunk.text:
+                            continue
+                        if not received_text:
+                            # Logic: Latensi token pertama menentukan kapan audio pertama bisa diputar.
+                            metrics.observe("llm_first_token_ms", (time.perf_counter() - started_at) * 1000)
+                            received_text = True
+                        chunks.append(chunk.text)
+                        yield chunk.text
+                finally:
+                    model_semaphore.release()
+            finally:
+                self.registry.llm_semaphore.release()
+        except Exception as e:
+            raise self._to_llm_error(e, deadline)
+        finally:
+            metrics.observe("llm_latency_ms", (time.perf_counter() - started_at) * 1000)
+
+        if not received_text:
+            metrics.inc("llm_errors_empty_response")
+            raise LLMError("empty_response", "LLM mengembalikan respons kosong.", retryable=True)
+        if cache_key is not None:
+            await self.registry.llm_cache.put(cache_key, "".join(chunks))
@@ -0,0 +1,205 @@
+# File: backend/app/services/opening_question_bank.py
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.database import SessionLocal
+from app.db.models import Mahasiswa, PregeneratedQuestion, StudentRoleStats
+from app.services.llm_service import LLMService
+from app.services.rag_service import RAGService
+
+
+class OpeningQuestionBank:
+    """
+    Bank pertanyaan pembuka pra-generate per (cv_id, role_id).
+    Tanggung jawab tunggal: mengisi tabel pregenerated_questions di background (RAG + LLM, di luar jalur request)
+    dan menyerahkan satu kandidat ke /interview/start, sehingga start tidak perlu menunggu RAG + LLM.
+
+    Kebijakan:
+    - Isi: setelah CV terindeks, untuk OPENING_BANK_ROLES_PER_CV role terpopuler (total sesi di student_role_stats).
+    - Refresh: setiap pengambilan (hit maupun miss) menjadwalkan pengisian ulang pasangan (CV, role) tersebut
+      hingga OPENING_BANK_QUESTIONS_PER_ROLE kandidat.
+    - Eviction: kandidat yang lebih tua dari OPENING_BANK_MAX_AGE_HOURS diabaikan lalu dihapus saat pengisian;
+      kandidat sebuah role dihapus saat role diubah admin; CV/role yang dihapus -> ON DELETE CASCADE.
+    """
+    def __init__(self, registry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.evicted = 0
+        # Pasangan (cv_id, role_id) yang sedang diisi (mencegah pengisian ganda untuk pasangan yang sama)
+        self._filling: Set[Tuple[int, int]] = set()
+        self._tasks = set()
+        # Logic: Pengisian memakai slot LLM yang sama dengan trafik live, jadi jumlahnya dibatasi.
+        self._fill_slots = asyncio.Semaphore(settings.OPENING_BANK_MAX_CONCURRENT_FILLS)
+
+    @staticmethod
+    def _cutoff() -> datetime:
+        return datetime.now() - timedelta(hours=settings.OPENING_BANK_MAX_AGE_HOURS)
+
+    # ----------------------------------------------------------------------
+    # JALUR REQUEST (sinkron; dipanggil lewat AsyncSession.run_sync)
+    # ----------------------------------------------------------------------
+    def pop(self, db: Session, cv_id: int, role_id: int) -> Optional[str]:
+        """
+        Mengambil (dan menghapus) kandidat tertua yang masih segar. Penghapusan ikut commit pemanggil,
+        sehingga kandidat hanya hilang jika sesi barunya benar-benar tersimpan.
+        Logic: FOR UPDATE SKIP LOCKED -> dua start bersamaan untuk CV + role yang sama mendapat kandidat berbeda.
+        """
+        candidate = db.query(PregeneratedQuestion).filter(
+            PregeneratedQuestion.cv_id == cv_id,
+            PregeneratedQuestion.role_id == role_id,
+            PregeneratedQuestion.tgl_dibuat > self._cutoff()
+        ).order_by(PregeneratedQuestion.tgl_dibuat).with_for_update(skip_locked=True).first()
+
+        # Logic: DELETE per primary key dengan cek jumlah baris; tanpa SKIP LOCKED (mis. SQLite),
+        # pengambil yang kalah balapan mendapat 0 baris dan diperlakukan sebagai miss.
+        taken = candidate is not None and db.query(PregeneratedQuestion).filter(
+            PregeneratedQuestion.question_id == candidate.question_id
+        ).delete(synchronize_session=False) == 1
+
+        with self._lock:
+            if taken:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.inc("opening_bank_hits" if taken else "opening_bank_misses")
+        return candidate.pertanyaan_llm if taken else None
+
+    @staticmethod
+    def evict_role(db: Session, role_id: int) -> int:
+        """Menghapus semua kandidat sebuah role (prompt-nya berubah saat nama role diubah). Commit oleh pemanggil."""
+        return db.query(PregeneratedQuestion).filter(
+            PregeneratedQuestion.role_id == role_id
+        ).delete(synchronize_session=False)
+
+    # ----------------------------------------------------------------------
+    # PENGISIAN DI BACKGROUND
+    # ----------------------------------------------------------------------
+    def schedule_fill(self, cv_id: int, mahasiswa_id: int, role_ids: Optional[List[int]] = None):
+        """Menjadwalkan pengisian bank untuk satu CV (role_ids=None -> role terpopuler)."""
+        if not settings.OPENING_BANK_ENABLED:
+            return
+        task = asyncio.create_task(self._fill_cv(cv_id, mahasiswa_id, role_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _popular_role_ids(self) -> List[int]:
+        """Role dengan total sesi terbanyak; dilengkapi role lain (urutan cache) jika riwayat belum cukup."""
+        limit = settings.OPENING_BANK_ROLES_PER_CV
+        with SessionLocal() as db:
+            rows = db.query(StudentRoleStats.role_id).group_by(StudentRoleStats.role_id).order_by(
+                func.sum(StudentRoleStats.jumlah_sesi).desc()
+            ).limit(limit).all()
+            role_ids = [row[0] for row in rows]
+            if len(role_ids) < limit:
+                roles, _ = self.registry.job_roles.snapshot(db)
+                role_ids += [role.role_id for role in roles if role.role_id not in role_ids][:limit - len(role_ids)]
+        return role_ids
+
+    async def _fill_cv(self, cv_id: int, mahasiswa_id: int, role_ids: Optional[List[int]]):
+        try:
+            if role_ids is None:
+                role_ids = await asyncio.to_thread(self._popular_role_ids)
+            await asyncio.gather(*[self._fill_pair(cv_id, mahasiswa_id, role_id) for role_id in role_ids])
+        except Exception as e:
+            print(f"OpeningQuestionBank: Gagal mengisi bank untuk CV {cv_id}: {e}")
+
+    def _prepare_fill(self, cv_id: int, mahasiswa_id: int, role_id: int) -> Optional[Tuple[int, str, str]]:
+        """Membuang kandidat kedaluwarsa, lalu menghitung kekurangan. Mengembalikan (jumlah, nama mahasiswa, nama role)."""
+        with SessionLocal() as db:
+            evicted = db.query(PregeneratedQuestion).filter(
+                PregeneratedQuestion.cv_id == cv_id,
+                PregeneratedQuestion.role_id == role_id,
+                PregeneratedQuestion.tgl_dibuat <= self._cutoff()
+            ).delete(synchronize_session=False)
+            db.commit()
+            if evicted:
+                with self._lock:
+                    self.evicted += evicted
+                metrics.inc("opening_bank_evicted", evicted)
+
+            stocked = db.query(func.count(PregeneratedQuestion.question_id)).filter(
+                PregeneratedQuestion.cv_id == cv_id, PregeneratedQuestion.role_id == role_id
+            ).scalar()
+            missing = settings.OPENING_BANK_QUESTIONS_PER_ROLE - stocked
+            if missing <= 0:
+                return None
+            mahasiswa = db.get(Mahasiswa, mahasiswa_id)
+            job_role = self.registry.job_roles.get(db, role_id)
+            if mahasiswa is None or job_role is None:
+                return None
+            return missing, mahasiswa.nama, job_role.nama_role
+
+    @staticmethod
+    def _store(cv_id: int, role_id: int, questions: List[str]):
+        with SessionLocal() as db:
+            db.add_all([
+                PregeneratedQuestion(cv_id=cv_id, role_id=role_id, pertanyaan_llm=text, tgl_dibuat=datetime.now())
+                for text in questions
+            ])
+            db.commit()
+
+    async def _fill_pair(self, cv_id: int, mahasiswa_id: int, role_id: int):
+        """Melengkapi kandidat satu pasangan (CV, role) hingga OPENING_BANK_QUESTIONS_PER_ROLE."""
+        # Logic: Import lokal untuk menghindari import melingkar (interview_service memakai registry yang memegang bank ini).
+        from app.services.interview_service import InterviewService
+
+        key = (cv_id, role_id)
+        if key in self._filling:
+            return
+        self._filling.add(key)
+        try:
+            async with self._fill_slots:
+                plan = await asyncio.to_thread(self._prepare_fill, cv_id, mahasiswa_id, role_id)
+                if plan is None:
+                    return
+                missing, nama_mahasiswa, nama_role = plan
+
+                # 1. RAG (sama dengan jalur live, lihat InterviewService.retrieve_cv_context)
+                rag_service = RAGService(self.registry)
+                cv_context = await asyncio.to_thread(
+                    rag_service.retrieve_relevant_context,
+                    mahasiswa_id=mahasiswa_id, query_text=rag_service.build_role_query(nama_role), n_results=5, cv_id=cv_id
+                )
+
+                # 2. LLM: beberapa kandidat bersamaan
+                # Logic: Tanpa cache_use_case; kandidat harus bervariasi, bukan salinan respons yang sama.
+                system_instruction, user_prompt = InterviewService.build_opening_prompts(nama_mahasiswa, nama_role, cv_context)
+                llm_service = LLMService(self.registry)
+                results = await asyncio.gather(
+                    *[llm_service.generate_content(system_instruction, user_prompt) for _ in range(missing)],
+                    return_exceptions=True
+                )
+                questions = [text for text in results if isinstance(text, str)]
+                if not questions:
+                    return
+
+                # 3. Simpan
+                await asyncio.to_thread(self._store, cv_id, role_id, questions)
+                with self._lock:
+                    self.generated += len(questions)
+                metrics.inc("opening_bank_generated", len(questions))
+        except Exception as e:
+            print(f"OpeningQuestionBank: Gagal mengisi CV {cv_id} / role {role_id}: {e}")
+        finally:
+            self._filling.discard(key)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "generated": self.generated,
+                "evicted": self.evicted,
+                "filling": len(self._filling),
+            }
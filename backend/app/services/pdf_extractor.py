@@ -0,0 +1,81 @@
+# File: backend/app/services/pdf_extractor.py
+
+# Modul ini sengaja hanya bergantung pada PyMuPDF, karena dijalankan di dalam worker ProcessPool
+# (setiap worker meng-import modul ini sendiri; import model embedding/Chroma di sini akan sangat mahal).
+
+import fitz # PyMuPDF
+from typing import Iterator, List, NamedTuple
+
+# Batas default ekstraksi (CV normal hanya 1-3 halaman)
+DEFAULT_MAX_PAGES = 10
+DEFAULT_MAX_CHARS = 50000
+
+
+class PdfBlock(NamedTuple):
+    """Satu blok teks PDF beserta posisinya (halaman 1-based, offset karakter di teks gabungan)."""
+    page: int
+    offset: int
+    text: str
+
+
+def iter_pdf_blocks(file_content: bytes, max_pages: int = DEFAULT_MAX_PAGES, max_chars: int = DEFAULT_MAX_CHARS) -> Iterator[PdfBlock]:
+    """
+    Mengekstrak teks PDF secara streaming, blok demi blok.
+    Logic: Tidak ada penggabungan string berulang (text += ...), sehingga waktu dan memori linear
+    terhadap panjang dokumen. Halaman dan karakter dibatasi agar PDF raksasa tidak menghabiskan worker.
+    """
+    doc = fitz.open(stream=file_content, filetype="pdf")
+    try:
+        offset = 0
+        for page_number, page in enumerate(doc, start=1):
+            if page_number > max_pages:
+                return
+            # Format blok: (x0, y0, x1, y1, teks, nomor_blok, tipe_blok); tipe 0 = teks, 1 = gambar
+            for block in page.get_text("blocks", sort=True):
+                if block[6] != 0:
+                    continue
+                text = block[4].strip()
+                if not text:
+                    continue
+                remaining = max_chars - offset
+                if remaining <= 0:
+                    return
+                text = text[:remaining]
+                yield PdfBlock(page_number, offset, text)
+                offset += len(text) + 1 # +1 untuk pemisah baris di teks gabungan
+    finally:
+        doc.close()
+
+
+def extract_pdf_blocks(file_content: bytes, max_pages: int = DEFAULT_MAX_PAGES, max_chars: int = DEFAULT_MAX_CHARS) -> List[PdfBlock]:
+    """Versi list dari iter_pdf_blocks. Fungsi tingkat modul agar bisa dikirim (pickle) ke ProcessPool."""
+    try:
+        return list(iter_pdf_blocks(file_content, max_pages, max_chars))
+    except Exception as e:
+        print(f"Error extracting PDF: {e}")
+        return []
+
+
+def blocks_to_text(blocks: List[PdfBlock]) -> str:
+    """Menggabungkan blok menjadi teks mentah (sekali join, sesuai offset di PdfBlock)."""
+    return "\n".join(block.text for block in blocks)
+
+
+def blocks_from_text(raw_text: str) -> List[PdfBlock]:
+    """Membentuk blok dari teks mentah yang sudah tersimpan (halaman tidak diketahui = 0)."""
+    blocks = []
+    offset = 0
+    for paragraph in raw_text.split("\n"):
+        text = paragraph.strip()
+        if text:
+            blocks.append(PdfBlock(0, offset, text))
+        offset += len(paragraph) + 1
+    return blocks
+
+
+def extract_text_from_pdf(file_content: bytes) -> str:
+    """Mengekstrak teks dari file PDF. Fungsi tingkat modul agar bisa dikirim (pickle) ke ProcessPool."""
+    blocks = extract_pdf_blocks(file_content)
+    if not blocks:
+        return "Extraction Failed"
+    return blocks_to_text(blocks)
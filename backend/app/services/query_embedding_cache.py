@@ -0,0 +1,69 @@
+# File: backend/app/services/query_embedding_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.core.metrics import metrics
+
+
+class QueryEmbeddingCache:
+    """
+    Cache vektor kueri RAG yang dipakai bersama oleh seluruh request.
+    Tanggung jawab tunggal: menyimpan embedding kueri agar kueri yang sama tidak di-encode ulang.
+
+    Dua lapis:
+    - pinned: embedding template kueri per Job Role, dihitung saat startup dan tidak pernah di-evict.
+    - LRU: embedding kueri bebas, dibatasi max_entries (yang paling lama tidak dipakai dibuang).
+    """
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pinned: Dict[str, List[float]] = {}
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query_text: str) -> Optional[List[float]]:
+        """Mengembalikan embedding dari cache, atau None jika belum ada (miss)."""
+        with self._lock:
+            vector = self._pinned.get(query_text)
+            if vector is None:
+                vector = self._entries.get(query_text)
+                if vector is not None:
+                    self._entries.move_to_end(query_text)
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc("query_embedding_cache_hits" if vector is not None else "query_embedding_cache_misses")
+        return vector
+
+    def put(self, query_text: str, vector: List[float]):
+        """Menyimpan embedding kueri bebas ke LRU."""
+        with self._lock:
+            if query_text in self._pinned:
+                return
+            self._entries[query_text] = vector
+            self._entries.move_to_end(query_text)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pin(self, query_text: str, vector: List[float]):
+        """Menyimpan embedding permanen (template kueri Job Role)."""
+        with self._lock:
+            self._pinned[query_text] = vector
+            self._entries.pop(query_text, None)
+
+    def unpin(self, query_text: str):
+        """Menghapus embedding permanen (misalnya saat nama Job Role berubah)."""
+        with self._lock:
+            self._pinned.pop(query_text, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pinned": len(self._pinned),
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
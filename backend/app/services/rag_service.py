@@ -1,82 +1,193 @@
-from chromadb import PersistentClient
-from sentence_transformers import SentenceTransformer
-from typing import List
-import uuid
+from typing import List, Optional, Tuple
+import hashlib
 from app.core.config import settings
-import re # Untuk membersihkan teks
-import fitz # PyMuPDF (untuk demo chunking)
+from app.core.metrics import metrics
+from app.core.registry import ResourceRegistry
+from app.services.pdf_extractor import PdfBlock, blocks_from_text
+from app.services.cv_chunker import CvChunk, chunk_cv_blocks
+
+# Template kueri retrieval per Job Role (dipakai saat memulai sesi wawancara)
+# Logic: Kueri ini hanya bergantung pada nama role, sehingga embedding-nya bisa dihitung sekali saat startup.
+ROLE_QUERY_TEMPLATE = "Pengalaman atau kompetensi apa yang paling menonjol terkait peran {nama_role}?"
 
 class RAGService:
-    def __init__(self):
-        # 1. Inisialisasi ChromaDB Client
-        # Logic: Klien ini menghubungkan ke folder penyimpanan data vektor di disk.
-        self.client = PersistentClient(path=settings.CHROMA_DB_PATH)
-        self.collection_name = "cv_kompetensi_collection"
-        self.collection = self.client.get_or_create_collection(name=self.collection_name)
+    def __init__(self, registry: ResourceRegistry):
+        # 1. Koleksi ChromaDB (dibagikan oleh Registry)
+        # Logic: Klien Chroma dibuka sekali saat startup, bukan setiap request.
+        self.collection = registry.collection
         
-        # 2. Inisialisasi Model Embedding
-        # Logic: Model ini mengubah teks menjadi array angka (vektor).
-        self.model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        # 2. Eksekutor Embedding (dibagikan oleh Registry)
+        # Logic: Mengubah teks menjadi array angka (vektor). Panggilan encode dari banyak request
+        # digabung menjadi satu batch oleh EmbeddingExecutor.
+        self.embedder = registry.embedder
+
+        # 3. Cache Embedding Kueri (dibagikan oleh Registry)
+        # Logic: Kueri yang sama (terutama template per role) tidak perlu di-encode ulang.
+        self.query_cache = registry.query_cache
+
+        # 4. Indeks Vektor Exact per CV (opsional, lihat RAG_RETRIEVAL_BACKEND)
+        self.cv_index = registry.cv_index
+
+    # ----------------------------------------------------------------------
+    # CACHE EMBEDDING KUERI
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def build_role_query(nama_role: str) -> str:
+        """Menyusun kueri retrieval standar untuk sebuah Job Role."""
+        return ROLE_QUERY_TEMPLATE.format(nama_role=nama_role)
+
+    def precompute_role_queries(self, role_names: List[str]):
+        """Menghitung embedding template kueri untuk semua Job Role sekaligus (satu batch) dan menyimpannya permanen."""
+        queries = [self.build_role_query(nama_role) for nama_role in role_names]
+        if not queries:
+            return
+        vectors = self.embedder.encode(queries)
+        for query_text, vector in zip(queries, vectors):
+            self.query_cache.pin(query_text, vector)
+        print(f"RAGService: {len(queries)} embedding kueri Job Role dihitung di awal.")
 
-    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
-        """Memecah teks panjang menjadi potongan-potongan kecil (chunks) yang tumpang tindih."""
+    def embed_query(self, query_text: str) -> List[float]:
+        """Mengambil embedding kueri dari cache; model embedding hanya dipanggil saat cache miss."""
+        vector = self.query_cache.get(query_text)
+        if vector is None:
+            vector = self.embedder.encode([query_text])[0]
+            self.query_cache.put(query_text, vector)
+        return vector
+
+    def chunk_blocks(self, blocks: List[PdfBlock]) -> List[CvChunk]:
+        """Memecah blok CV menjadi chunk per bagian (Experience, Education, Skills, Projects, ...) dan per kalimat."""
         # Logic: LLM dan model embedding lebih baik memproses potongan kecil dengan konteks yang utuh.
+        # Batas kata di bawah batas input model embedding, sehingga tidak ada teks yang terpotong diam-diam.
+        return chunk_cv_blocks(blocks, max_words=settings.CV_CHUNK_MAX_WORDS)
         
-        # Sederhanakan teks untuk memecah berdasarkan spasi atau baris baru
-        text = re.sub(r'\s+', ' ', text).strip()
-        tokens = text.split(' ')
-        chunks = []
-        i = 0
-        while i < len(tokens):
-            chunk = ' '.join(tokens[i:i + chunk_size])
-            chunks.append(chunk)
-            i += (chunk_size - overlap)
-        return chunks
-        
-    def add_cv_to_vector_db(self, mahasiswa_id: int, cv_id: int, raw_text: str):
-        """Mengubah teks CV menjadi vektor dan menyimpannya di ChromaDB."""
-        
-        # 1. Chunking Teks
-        chunks = self.chunk_text(raw_text)
-        
-        # 2. Membuat Vektor (Embedding)
-        # Logic: Menggunakan model untuk mengodekan setiap chunk menjadi vektor.
-        embeddings = self.model.encode(chunks).tolist()
-        
-        # 3. Menyiapkan Metadata dan IDs
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """SHA-256 dari teks chunk (alamat konten untuk deduplikasi embedding)."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _get_existing_embeddings(self, chunk_hashes: List[str]) -> dict:
+        """Mengambil embedding yang sudah pernah dihitung untuk chunk dengan hash yang sama (CV mana pun)."""
+        results = self.collection.get(
+            where={"chunk_hash": {"$in": chunk_hashes}},
+            include=["embeddings", "metadatas"]
+        )
+        embeddings = results.get("embeddings")
+        if embeddings is None:
+            return {}
+        return {meta["chunk_hash"]: list(vector) for meta, vector in zip(results["metadatas"], embeddings)}
+
+    # ----------------------------------------------------------------------
+    # TAHAPAN INGESTION (dipakai terpisah oleh job ingestion, atau sekaligus oleh add_cv_to_vector_db)
+    # ----------------------------------------------------------------------
+    def prepare_chunks(self, blocks: List[PdfBlock]) -> Tuple[List[CvChunk], List[str]]:
+        """Tahap CHUNK: memecah blok CV dan menghitung hash setiap chunk."""
+        # Logic: Chunk identik di dalam satu CV cukup disimpan sekali.
+        unique = {}
+        for chunk in self.chunk_blocks(blocks):
+            unique.setdefault(chunk.text, chunk)
+        chunks = list(unique.values())
+        chunk_hashes = [self.hash_text(chunk.text) for chunk in chunks]
+        return chunks, chunk_hashes
+
+    def embed_chunks(self, chunks: List[str], chunk_hashes: List[str]) -> List[List[float]]:
+        """Tahap EMBED: membuat vektor untuk setiap chunk."""
+        # Logic: Chunk yang teksnya sudah pernah di-embed (dari CV lain/upload ulang) memakai ulang vektornya;
+        # model hanya dipanggil untuk chunk yang benar-benar baru.
+        known = self._get_existing_embeddings(chunk_hashes)
+        missing = [i for i, h in enumerate(chunk_hashes) if h not in known]
+        if missing:
+            new_vectors = self.embedder.encode([chunks[i] for i in missing])
+            for i, vector in zip(missing, new_vectors):
+                known[chunk_hashes[i]] = vector
+        metrics.inc("rag_chunks_embedded", len(missing))
+        metrics.inc("rag_chunks_embedding_reused", len(chunks) - len(missing))
+        return [known[h] for h in chunk_hashes]
+
+    def index_chunks(self, mahasiswa_id: int, cv_id: int, chunks: List[CvChunk], chunk_hashes: List[str],
+                     embeddings: List[List[float]], content_hash: Optional[str] = None):
+        """Tahap INDEX: menyimpan chunk beserta vektor dan metadata ke ChromaDB (idempoten)."""
+        # 1. Menyiapkan Metadata dan IDs
         # Logic: Metadata penting untuk filter pencarian (Hanya cari CV milik mahasiswa tertentu).
-        ids = [str(uuid.uuid4()) for _ in chunks]
+        # ID deterministik (cv_id + hash chunk) membuat ingestion berulang tidak menggandakan data.
+        ids = [f"cv{cv_id}-{h}" for h in chunk_hashes]
         metadatas = [
-            {"mahasiswa_id": mahasiswa_id, "cv_id": cv_id, "source": "cv_upload"} 
-            for _ in chunks
+            {
+                "mahasiswa_id": mahasiswa_id,
+                "cv_id": cv_id,
+                "source": "cv_upload",
+                "chunk_hash": h,
+                "content_hash": content_hash or "",
+                "section": chunk.section,
+                "page": chunk.page, # 0 = halaman tidak diketahui
+            }
+            for chunk, h in zip(chunks, chunk_hashes)
         ]
         
-        # 4. Menyimpan ke ChromaDB
-        self.collection.add(
+        # 2. Menyimpan ke ChromaDB
+        self.collection.upsert(
             embeddings=embeddings,
-            documents=chunks,
+            documents=[chunk.text for chunk in chunks],
             metadatas=metadatas,
             ids=ids
         )
+        # Logic: Matriks in-memory CV ini (jika ada) sudah basi, jadi dibuang agar dimuat ulang.
+        self.cv_index.invalidate((mahasiswa_id, cv_id))
         print(f"RAGService: Berhasil menambahkan {len(chunks)} chunks CV untuk Mahasiswa ID {mahasiswa_id}")
+
+    def add_cv_to_vector_db(self, mahasiswa_id: int, cv_id: int, raw_text: str, content_hash: Optional[str] = None):
+        """Mengubah teks CV menjadi vektor dan menyimpannya di ChromaDB (idempoten)."""
+        chunks, chunk_hashes = self.prepare_chunks(blocks_from_text(raw_text))
+        if not chunks:
+            return
+        embeddings = self.embed_chunks([chunk.text for chunk in chunks], chunk_hashes)
+        self.index_chunks(mahasiswa_id, cv_id, chunks, chunk_hashes, embeddings, content_hash)
         
-    def retrieve_relevant_context(self, mahasiswa_id: int, query_text: str, n_results: int = 3) -> str:
+    @staticmethod
+    def _build_where_filter(mahasiswa_id: int, cv_id: Optional[int]) -> dict:
+        """Filter metadata Chroma: selalu per mahasiswa, dan per CV jika cv_id diberikan."""
+        if cv_id is None:
+            return {"mahasiswa_id": mahasiswa_id}
+        return {"$and": [{"mahasiswa_id": mahasiswa_id}, {"cv_id": cv_id}]}
+
+    def _load_cv_chunks(self, mahasiswa_id: int, cv_id: int) -> Tuple[List[List[float]], List[str]]:
+        """Memuat semua embedding dan dokumen chunk satu CV dari ChromaDB (untuk indeks exact)."""
+        results = self.collection.get(
+            where=self._build_where_filter(mahasiswa_id, cv_id),
+            include=["embeddings", "documents"]
+        )
+        embeddings = results.get("embeddings")
+        return (embeddings if embeddings is not None else []), (results.get("documents") or [])
+
+    def retrieve_relevant_context(self, mahasiswa_id: int, query_text: str, n_results: int = 3, cv_id: Optional[int] = None) -> str:
         """Mencari potongan CV paling relevan berdasarkan kueri (pertanyaan/JD)."""
         
         # 1. Membuat Vektor dari Kueri (Pertanyaan LLM)
-        query_embedding = self.model.encode([query_text]).tolist()
+        # Logic: Template kueri role sudah ada di cache sejak startup, jadi model embedding biasanya dilewati.
+        query_vector = self.embed_query(query_text)
         
         # 2. Pencarian (Retrieval)
         # Logic: Mencari n_results chunks yang paling mirip dengan query, 
-        # TAPI HANYA dari CV milik mahasiswa_id yang sedang diwawancara.
-        results = self.collection.query(
-            query_embeddings=query_embedding,
-            n_results=n_results,
-            where={"mahasiswa_id": mahasiswa_id} 
-        )
+        # TAPI HANYA dari CV milik mahasiswa_id (dan cv_id jika dipilih) yang sedang diwawancara.
+        documents: List[str] = []
+        if cv_id is not None and settings.RAG_RETRIEVAL_BACKEND == "exact":
+            # 2a. Backend exact: satu perkalian matriks-vektor di memori, tanpa round trip ke Chroma.
+            entry = self.cv_index.get_or_load(
+                (mahasiswa_id, cv_id), lambda: self._load_cv_chunks(mahasiswa_id, cv_id)
+            )
+            if entry is not None:
+                documents = self.cv_index.search(entry, query_vector, n_results)
+        else:
+            # 2b. Backend Chroma: pencarian ANN dengan filter metadata.
+            results = self.collection.query(
+                query_embeddings=[query_vector],
+                n_results=n_results,
+                where=self._build_where_filter(mahasiswa_id, cv_id)
+            )
+            if results and results['documents'] and results['documents'][0]:
+                documents = results['documents'][0]
         
         # 3. Menggabungkan hasilnya
-        if results and results['documents'] and results['documents'][0]:
-            context = "\n---\n".join(results['documents'][0])
+        if documents:
+            context = "\n---\n".join(documents)
             return context
         return "Tidak ditemukan konteks CV yang relevan."
@@ -0,0 +1,102 @@
+# File: backend/app/services/transcript_export.py
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.db.models import InterviewSession, PerQuestions, EvaluationMetrics, Feedback, JobRole, EVALUATION_RUBRICS
+
+# Jumlah baris per fetch dari server-side cursor
+EXPORT_YIELD_PER = 500
+
+# Kolom CSV (satu baris per tanya-jawab)
+CSV_COLUMNS = [
+    "session_id", "mahasiswa_id", "nama_role", "tgl_mulai", "tgl_selesai", "skor_total_rata_rata",
+    "qa_id", "urutan_pertanyaan", "jenis_pertanyaan", "pertanyaan_llm", "jawaban_mahasiswa_bersih", "waktu_respon",
+    *EVALUATION_RUBRICS, "skor_gabungan", "label_kategori", "feedback_narasi_llm", "saran_perbaikan_utama",
+]
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+class TranscriptExportService:
+    """
+    Ekspor transkrip wawancara dalam jumlah besar (NDJSON / CSV).
+    Logic: Satu query datar (sesi + role + pertanyaan + skor + feedback) dibaca lewat server-side cursor
+    (yield_per), diurutkan per sesi, sehingga memori tetap konstan berapa pun jumlah sesi yang diekspor.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _iter_rows(self, mahasiswa_id: Optional[int] = None, role_id: Optional[int] = None,
+                   dari: Optional[datetime] = None, sampai: Optional[datetime] = None) -> Iterator[Tuple]:
+        columns = [
+            InterviewSession.session_id, InterviewSession.mahasiswa_id, JobRole.nama_role,
+            InterviewSession.tgl_mulai, InterviewSession.tgl_selesai, InterviewSession.skor_total_rata_rata,
+            PerQuestions.qa_id, PerQuestions.urutan_pertanyaan, PerQuestions.jenis_pertanyaan,
+            PerQuestions.pertanyaan_llm, PerQuestions.jawaban_mahasiswa_bersih, PerQuestions.waktu_respon,
+            *[getattr(EvaluationMetrics, rubric) for rubric in EVALUATION_RUBRICS],
+            EvaluationMetrics.skor_gabungan, EvaluationMetrics.label_kategori,
+            Feedback.feedback_narasi_llm, Feedback.saran_perbaikan_utama,
+        ]
+        query = self.db.query(*columns).join(
+            JobRole, JobRole.role_id == InterviewSession.role_id
+        ).join(
+            PerQuestions, PerQuestions.session_id == InterviewSession.session_id
+        ).outerjoin(
+            EvaluationMetrics, EvaluationMetrics.qa_id == PerQuestions.qa_id
+        ).outerjoin(
+            Feedback, Feedback.qa_id == PerQuestions.qa_id
+        )
+        if mahasiswa_id is not None:
+            query = query.filter(InterviewSession.mahasiswa_id == mahasiswa_id)
+        if role_id is not None:
+            query = query.filter(InterviewSession.role_id == role_id)
+        if dari is not None:
+            query = query.filter(InterviewSession.tgl_mulai >= dari)
+        if sampai is not None:
+            query = query.filter(InterviewSession.tgl_mulai < sampai)
+        query = query.order_by(InterviewSession.session_id, PerQuestions.urutan_pertanyaan)
+        # Logic: yield_per mengaktifkan stream_results (server-side cursor di PostgreSQL).
+        return iter(query.execution_options(yield_per=EXPORT_YIELD_PER))
+
+    def iter_csv(self, **filters) -> Iterator[str]:
+        """CSV datar: header, lalu satu baris per tanya-jawab."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        for row in self._iter_rows(**filters):
+            writer.writerow(["" if value is None else value for value in row])
+            # Logic: Buffer dikosongkan setiap baris agar tidak tumbuh bersama ekspor.
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def iter_ndjson(self, **filters) -> Iterator[str]:
+        """NDJSON: satu baris JSON per sesi, berisi daftar tanya-jawabnya (hanya satu sesi di memori)."""
+        current: Optional[Dict[str, Any]] = None
+        for row in self._iter_rows(**filters):
+            record = dict(zip(CSV_COLUMNS, row))
+            if current is None or current["session_id"] != record["session_id"]:
+                if current is not None:
+                    yield json.dumps(current, default=_json_default) + "\n"
+                current = {key: record[key] for key in CSV_COLUMNS[:6]}
+                current["questions"] = []
+            question: Dict[str, Any] = {key: record[key] for key in CSV_COLUMNS[6:12]}
+            question["metrics"] = (
+                {key: record[key] for key in (*EVALUATION_RUBRICS, "skor_gabungan", "label_kategori")}
+                if record["skor_gabungan"] is not None else None
+            )
+            question["feedback"] = (
+                {key: record[key] for key in ("feedback_narasi_llm", "saran_perbaikan_utama")}
+                if record["feedback_narasi_llm"] is not None else None
+            )
+            current["questions"].append(question)
+        if current is not None:
+            yield json.dumps(current, default=_json_default) + "\n"
@@ -1,20 +1,19 @@
 from sqlalchemy.orm import Session
 from app.db.models import Mahasiswa
 from app.schemas import MahasiswaCreate
-from passlib.context import CryptContext
+from app.core.registry import ResourceRegistry
 from typing import Optional
 
-# Konteks untuk Hashing Password (Menggunakan bcrypt)
-# Logic: Ini adalah guardrail keamanan. Jangan pernah menyimpan password mentah.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class UserService:
     """
     Modul Tingkat Rendah untuk Logika Bisnis Mahasiswa (User).
     Tanggung jawab tunggal: Interaksi DB dan Hashing Password.
     """
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, registry: ResourceRegistry):
         self.db = db
+        # Konteks untuk Hashing Password (Menggunakan bcrypt), dibagikan oleh Registry
+        # Logic: Ini adalah guardrail keamanan. Jangan pernah menyimpan password mentah.
+        self.pwd_context = registry.pwd_context
 
     def get_mahasiswa_by_email(self, email: str) -> Optional[Mahasiswa]:
         """Mencari mahasiswa berdasarkan email (digunakan untuk cek duplikasi saat register)."""
@@ -44,4 +43,4 @@ class UserService:
 
     def _hash_password(self, password: str) -> str:
         """Fungsi pembantu untuk hashing password."""
-        return pwd_context.hash(password)
\ No newline at end of file
+        return self.pwd_context.hash(password)
\ No newline at end of file
@@ -0,0 +1,11 @@
+-- migrate:no-transaction
+-- 0002: Indeks komposit untuk riwayat CV (GET /pipeline/cv-history/{mahasiswa_id}).
+-- Query: WHERE mahasiswa_id = ? [AND (tgl_upload, cv_id) < (?, ?)] ORDER BY tgl_upload DESC, cv_id DESC LIMIT n
+-- Logic: Satu indeks melayani filter, keyset, dan urutan (dipindai mundur), tanpa sort dan tanpa OFFSET.
+-- CONCURRENTLY agar tabel tetap bisa ditulis selama indeks dibangun (karena itu tanpa transaksi).
+-- Indeks ini juga melayani lookup (mahasiswa_id, tgl_upload) lain, mis. CV terbaru milik mahasiswa.
+-- check ix_cv_data_mahasiswa_tgl_upload: SELECT cv_id, file_name FROM cv_data WHERE mahasiswa_id = 1 ORDER BY tgl_upload DESC, cv_id DESC LIMIT 21
+-- check ix_cv_data_mahasiswa_tgl_upload: SELECT cv_id FROM cv_data WHERE mahasiswa_id = 1 AND (tgl_upload < NOW() OR (tgl_upload = NOW() AND cv_id < 100)) ORDER BY tgl_upload DESC, cv_id DESC LIMIT 21
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cv_data_mahasiswa_tgl_upload
+    ON cv_data (mahasiswa_id, tgl_upload, cv_id);
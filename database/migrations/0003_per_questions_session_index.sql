@@ -0,0 +1,10 @@
+-- migrate:no-transaction
+-- 0003: Indeks komposit pertanyaan per sesi.
+-- Query: selectinload InterviewSession.questions (WHERE session_id IN (...) ORDER BY urutan_pertanyaan),
+-- ekspor transkrip (JOIN per sesi, urut urutan_pertanyaan), dan JOIN per_questions -> evaluation_metrics
+-- untuk rata-rata / backfill sesi. Sebelumnya hanya ada primary key, sehingga semuanya Seq Scan.
+-- check ix_per_questions_session_urutan: SELECT qa_id, pertanyaan_llm FROM per_questions WHERE session_id = 1 ORDER BY urutan_pertanyaan
+-- check ix_per_questions_session_urutan: SELECT AVG(m.skor_gabungan) FROM per_questions q JOIN evaluation_metrics m ON m.qa_id = q.qa_id WHERE q.session_id = 1
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_per_questions_session_urutan
+    ON per_questions (session_id, urutan_pertanyaan);
@@ -0,0 +1,7 @@
+-- migrate:no-transaction
+-- 0004: Indeks komposit riwayat sesi per mahasiswa.
+-- Query: tren analitik (WHERE mahasiswa_id = ? ORDER BY tgl_mulai DESC LIMIT n) dan ekspor transkrip per mahasiswa.
+-- check ix_interview_sessions_mahasiswa_tgl_mulai: SELECT session_id FROM interview_sessions WHERE mahasiswa_id = 1 AND jumlah_terjawab > 0 ORDER BY tgl_mulai DESC LIMIT 20
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interview_sessions_mahasiswa_tgl_mulai
+    ON interview_sessions (mahasiswa_id, tgl_mulai);
@@ -0,0 +1,13 @@
+-- 0005: Bank pertanyaan pembuka yang dihasilkan di background setelah CV terindeks.
+-- Query: /interview/start (WHERE cv_id = ? AND role_id = ? AND tgl_dibuat > ? ORDER BY tgl_dibuat LIMIT 1 FOR UPDATE SKIP LOCKED).
+-- check ix_pregenerated_questions_cv_role_tgl: SELECT question_id FROM pregenerated_questions WHERE cv_id = 1 AND role_id = 1 AND tgl_dibuat > NOW() - INTERVAL '3 days' ORDER BY tgl_dibuat LIMIT 1
+
+CREATE TABLE IF NOT EXISTS pregenerated_questions (
+    question_id SERIAL PRIMARY KEY,
+    cv_id INTEGER NOT NULL REFERENCES cv_data (cv_id) ON DELETE CASCADE,
+    role_id INTEGER NOT NULL REFERENCES job_roles (role_id) ON DELETE CASCADE,
+    pertanyaan_llm TEXT NOT NULL,
+    tgl_dibuat TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pregenerated_questions_cv_role_tgl
+    ON pregenerated_questions (cv_id, role_id, tgl_dibuat);
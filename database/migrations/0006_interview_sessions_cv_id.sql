@@ -0,0 +1,5 @@
+-- 0006: CV yang dipakai sebuah sesi wawancara.
+-- Query: resume sesi live (RAG ulang hanya atas CV sesi tersebut, bukan CV terbaru/lain milik mahasiswa).
+
+ALTER TABLE interview_sessions
+    ADD COLUMN IF NOT EXISTS cv_id INTEGER REFERENCES cv_data (cv_id) ON DELETE SET NULL;
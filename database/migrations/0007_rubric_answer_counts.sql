@@ -0,0 +1,70 @@
+-- 0007: Jumlah jawaban yang BENAR-BENAR dinilai per rubrik (pembagi rata-rata rubrik).
+-- Jawaban lama tidak punya skor_conciseness (NULL); rata-rata rubrik dibagi jumlah ini, bukan jumlah_terjawab.
+-- Kolom diisi ulang dari evaluation_metrics (COUNT(kolom) mengabaikan NULL) di migrasi yang sama.
+
+ALTER TABLE interview_sessions
+    ADD COLUMN IF NOT EXISTS jumlah_skor_situation INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_task INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_action INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_result INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_relevance INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_clarity INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_confidence INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_conciseness INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE student_role_stats
+    ADD COLUMN IF NOT EXISTS jumlah_skor_situation INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_task INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_action INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_result INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_relevance INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_clarity INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_confidence INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_conciseness INTEGER NOT NULL DEFAULT 0;
+
+UPDATE interview_sessions s SET
+    jumlah_skor_situation = c.jumlah_skor_situation,
+    jumlah_skor_task = c.jumlah_skor_task,
+    jumlah_skor_action = c.jumlah_skor_action,
+    jumlah_skor_result = c.jumlah_skor_result,
+    jumlah_skor_relevance = c.jumlah_skor_relevance,
+    jumlah_skor_clarity = c.jumlah_skor_clarity,
+    jumlah_skor_confidence = c.jumlah_skor_confidence,
+    jumlah_skor_conciseness = c.jumlah_skor_conciseness
+FROM (
+    SELECT pq.session_id,
+        COUNT(em.skor_situation) AS jumlah_skor_situation,
+        COUNT(em.skor_task) AS jumlah_skor_task,
+        COUNT(em.skor_action) AS jumlah_skor_action,
+        COUNT(em.skor_result) AS jumlah_skor_result,
+        COUNT(em.skor_relevance) AS jumlah_skor_relevance,
+        COUNT(em.skor_clarity) AS jumlah_skor_clarity,
+        COUNT(em.skor_confidence) AS jumlah_skor_confidence,
+        COUNT(em.skor_conciseness) AS jumlah_skor_conciseness
+    FROM per_questions pq JOIN evaluation_metrics em ON em.qa_id = pq.qa_id
+    GROUP BY pq.session_id
+) c
+WHERE c.session_id = s.session_id;
+
+UPDATE student_role_stats st SET
+    jumlah_skor_situation = c.jumlah_skor_situation,
+    jumlah_skor_task = c.jumlah_skor_task,
+    jumlah_skor_action = c.jumlah_skor_action,
+    jumlah_skor_result = c.jumlah_skor_result,
+    jumlah_skor_relevance = c.jumlah_skor_relevance,
+    jumlah_skor_clarity = c.jumlah_skor_clarity,
+    jumlah_skor_confidence = c.jumlah_skor_confidence,
+    jumlah_skor_conciseness = c.jumlah_skor_conciseness
+FROM (
+    SELECT mahasiswa_id, role_id,
+        SUM(jumlah_skor_situation) AS jumlah_skor_situation,
+        SUM(jumlah_skor_task) AS jumlah_skor_task,
+        SUM(jumlah_skor_action) AS jumlah_skor_action,
+        SUM(jumlah_skor_result) AS jumlah_skor_result,
+        SUM(jumlah_skor_relevance) AS jumlah_skor_relevance,
+        SUM(jumlah_skor_clarity) AS jumlah_skor_clarity,
+        SUM(jumlah_skor_confidence) AS jumlah_skor_confidence,
+        SUM(jumlah_skor_conciseness) AS jumlah_skor_conciseness
+    FROM interview_sessions
+    GROUP BY mahasiswa_id, role_id
+) c
+WHERE c.mahasiswa_id = st.mahasiswa_id AND c.role_id = st.role_id;
@@ -0,0 +1,7 @@
+-- 0008: Klaim giliran dan klaim evaluasi tertunda per pertanyaan (idempotensi /answer lintas worker).
+-- tgl_klaim_jawaban: giliran sedang diproses sejak kapan (diisi SEBELUM panggilan LLM); duplikat menunggu lalu memutar ulang.
+-- tgl_klaim_evaluasi: evaluasi tertunda sedang dijalankan sejak kapan; dijadwalkan ulang hanya jika klaim kosong/basi.
+
+ALTER TABLE per_questions
+    ADD COLUMN IF NOT EXISTS tgl_klaim_jawaban TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS tgl_klaim_evaluasi TIMESTAMP WITH TIME ZONE;
@@ -0,0 +1,156 @@
+-- database/schema.sql
+-- Snapshot skema lengkap (hasil akhir semua revisi di database/migrations, sesuai backend/app/db/models.py).
+-- Hanya untuk referensi / membuat database kosong sekaligus; database yang berjalan diubah lewat revisi:
+--   cd backend && python -m app.db.migrate && python -m app.db.migrate --check
+-- Setiap revisi baru WAJIB juga dicerminkan di file ini.
+
+CREATE TABLE IF NOT EXISTS mahasiswa (
+    mahasiswa_id SERIAL PRIMARY KEY,
+    nama VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    no_hp VARCHAR(20),
+    tgl_registrasi TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS job_roles (
+    role_id SERIAL PRIMARY KEY,
+    nama_role VARCHAR(100) NOT NULL UNIQUE,
+    deskripsi TEXT
+);
+
+CREATE TABLE IF NOT EXISTS cv_data (
+    cv_id SERIAL PRIMARY KEY,
+    mahasiswa_id INTEGER NOT NULL REFERENCES mahasiswa (mahasiswa_id) ON DELETE CASCADE,
+    file_name VARCHAR(255),
+    raw_text TEXT NOT NULL,
+    parsed_kompetensi TEXT,
+    tgl_upload TIMESTAMP WITH TIME ZONE
+);
+ALTER TABLE cv_data ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE cv_data ADD COLUMN IF NOT EXISTS status_proses VARCHAR(20);
+CREATE INDEX IF NOT EXISTS ix_cv_data_content_hash ON cv_data (content_hash);
+
+CREATE TABLE IF NOT EXISTS interview_sessions (
+    session_id SERIAL PRIMARY KEY,
+    mahasiswa_id INTEGER NOT NULL REFERENCES mahasiswa (mahasiswa_id) ON DELETE CASCADE,
+    role_id INTEGER NOT NULL REFERENCES job_roles (role_id) ON DELETE RESTRICT,
+    tgl_mulai TIMESTAMP WITH TIME ZONE,
+    tgl_selesai TIMESTAMP WITH TIME ZONE,
+    skor_total_rata_rata NUMERIC(5, 2)
+);
+ALTER TABLE interview_sessions
+    ADD COLUMN IF NOT EXISTS jumlah_terjawab INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_gabungan NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_situation NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_task NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_action NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_result NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_relevance NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_clarity NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_confidence NUMERIC(8, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_skor_conciseness NUMERIC(8, 2) NOT NULL DEFAULT 0;
+ALTER TABLE interview_sessions
+    ADD COLUMN IF NOT EXISTS cv_id INTEGER REFERENCES cv_data (cv_id) ON DELETE SET NULL;
+-- 0007: jumlah jawaban yang dinilai per rubrik (pembagi rata-rata rubrik)
+ALTER TABLE interview_sessions
+    ADD COLUMN IF NOT EXISTS jumlah_skor_situation INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_task INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_action INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_result INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_relevance INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_clarity INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_confidence INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS jumlah_skor_conciseness INTEGER NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS per_questions (
+    qa_id SERIAL PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES interview_sessions (session_id) ON DELETE CASCADE,
+    urutan_pertanyaan INTEGER NOT NULL,
+    jenis_pertanyaan VARCHAR(50),
+    pertanyaan_llm TEXT NOT NULL,
+    jawaban_mahasiswa_mentah TEXT,
+    jawaban_mahasiswa_bersih TEXT,
+    waktu_respon INTEGER,
+    waktu_tanya TIMESTAMP WITH TIME ZONE
+);
+-- 0008: klaim giliran / evaluasi tertunda (idempotensi /answer lintas worker)
+ALTER TABLE per_questions
+    ADD COLUMN IF NOT EXISTS tgl_klaim_jawaban TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS tgl_klaim_evaluasi TIMESTAMP WITH TIME ZONE;
+
+CREATE TABLE IF NOT EXISTS evaluation_metrics (
+    metrics_id SERIAL PRIMARY KEY,
+    qa_id INTEGER NOT NULL UNIQUE REFERENCES per_questions (qa_id) ON DELETE CASCADE,
+    skor_situation NUMERIC(5, 2),
+    skor_task NUMERIC(5, 2),
+    skor_action NUMERIC(5, 2),
+    skor_result NUMERIC(5, 2),
+    skor_relevance NUMERIC(5, 2),
+    skor_clarity NUMERIC(5, 2),
+    skor_confidence NUMERIC(5, 2),
+    skor_conciseness NUMERIC(5, 2),
+    skor_gabungan NUMERIC(5, 2),
+    label_kategori VARCHAR(10)
+);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    feedback_id SERIAL PRIMARY KEY,
+    qa_id INTEGER NOT NULL UNIQUE REFERENCES per_questions (qa_id) ON DELETE CASCADE,
+    feedback_narasi_llm TEXT NOT NULL,
+    saran_perbaikan_utama TEXT
+);
+
+CREATE TABLE IF NOT EXISTS student_role_stats (
+    mahasiswa_id INTEGER NOT NULL REFERENCES mahasiswa (mahasiswa_id) ON DELETE CASCADE,
+    role_id INTEGER NOT NULL REFERENCES job_roles (role_id) ON DELETE CASCADE,
+    jumlah_sesi INTEGER NOT NULL DEFAULT 0,
+    jumlah_terjawab INTEGER NOT NULL DEFAULT 0,
+    total_skor_gabungan NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_situation NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_task NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_action NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_result NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_relevance NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_clarity NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_confidence NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    total_skor_conciseness NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    jumlah_skor_situation INTEGER NOT NULL DEFAULT 0,
+    jumlah_skor_task INTEGER NOT NULL DEFAULT 0,
+    jumlah_skor_action INTEGER NOT NULL DEFAULT 0,
+    jumlah_skor_result INTEGER NOT NULL DEFAULT 0,
+    jumlah_skor_relevance INTEGER NOT NULL DEFAULT 0,
+    jumlah_skor_clarity INTEGER NOT NULL DEFAULT 0,
+    jumlah_skor_confidence INTEGER NOT NULL DEFAULT 0,
+    jumlah_skor_conciseness INTEGER NOT NULL DEFAULT 0,
+    skor_rata_rata NUMERIC(5, 2),
+    tgl_terakhir TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (mahasiswa_id, role_id)
+);
+
+CREATE TABLE IF NOT EXISTS role_score_histogram (
+    role_id INTEGER NOT NULL REFERENCES job_roles (role_id) ON DELETE CASCADE,
+    bucket INTEGER NOT NULL,
+    jumlah_mahasiswa INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (role_id, bucket)
+);
+
+-- 0005: bank pertanyaan pembuka (pra-generate setelah CV terindeks)
+CREATE TABLE IF NOT EXISTS pregenerated_questions (
+    question_id SERIAL PRIMARY KEY,
+    cv_id INTEGER NOT NULL REFERENCES cv_data (cv_id) ON DELETE CASCADE,
+    role_id INTEGER NOT NULL REFERENCES job_roles (role_id) ON DELETE CASCADE,
+    pertanyaan_llm TEXT NOT NULL,
+    tgl_dibuat TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pregenerated_questions_cv_role_tgl ON pregenerated_questions (cv_id, role_id, tgl_dibuat);
+
+-- 0002-0004: indeks komposit jalur panas
+CREATE INDEX IF NOT EXISTS ix_cv_data_mahasiswa_tgl_upload ON cv_data (mahasiswa_id, tgl_upload, cv_id);
+CREATE INDEX IF NOT EXISTS ix_per_questions_session_urutan ON per_questions (session_id, urutan_pertanyaan);
+CREATE INDEX IF NOT EXISTS ix_interview_sessions_mahasiswa_tgl_mulai ON interview_sessions (mahasiswa_id, tgl_mulai);
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(16) PRIMARY KEY,
+    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);